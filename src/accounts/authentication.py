@@ -0,0 +1,114 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import router
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+
+from profiles.models import Profile
+
+PROFILE_ID_CLAIM = 'profile_id'
+
+USER_CLAIMS = ('id', 'username', 'first_name', 'last_name')
+
+
+class ClaimsUser(TokenUser):
+    """User built from the claims of a validated access token.
+
+    The profile and its user are built from the claims as well, with every
+    other field deferred, so they are only loaded from the database when
+    one of those fields is used.
+    """
+
+    @cached_property
+    def first_name(self):
+        return self.token.get('first_name', '')
+
+    @cached_property
+    def last_name(self):
+        return self.token.get('last_name', '')
+
+    @cached_property
+    def profile(self):
+        User = get_user_model()
+        user = User.from_db(
+            router.db_for_read(User), USER_CLAIMS,
+            [getattr(self, claim) for claim in USER_CLAIMS])
+        profile = Profile.from_db(
+            router.db_for_read(Profile), ('id', 'user_id'),
+            [self.token[PROFILE_ID_CLAIM], user.id])
+        profile.user = user
+        return profile
+
+    @cached_property
+    def user(self):
+        return get_user_model().objects.get(id=self.id)
+
+
+class ActiveUserCache:
+    """Process-wide LRU of users recently found to still be active.
+
+    Only active users are remembered, so a deleted or deactivated user is
+    rejected at most CLAIMS_AUTH_REVOCATION_TTL seconds after the change.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.entries = OrderedDict()
+
+    def is_active(self, user_id, ttl, size):
+        now = time.monotonic()
+        with self.lock:
+            checked = self.entries.get(user_id, None)
+            if checked is not None and now - checked < ttl:
+                self.entries.move_to_end(user_id)
+                return True
+
+        active = get_user_model().objects.filter(
+            id=user_id, is_active=True).exists()
+
+        with self.lock:
+            if active:
+                self.entries[user_id] = now
+                self.entries.move_to_end(user_id)
+                while len(self.entries) > size:
+                    self.entries.popitem(last=False)
+            else:
+                self.entries.pop(user_id, None)
+        return active
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+active_user_cache = ActiveUserCache()
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWT authentication that trusts the user data in the token instead of
+    loading the user and profile rows on every request.
+
+    Tokens issued without a profile_id claim fall back to loading the user.
+    """
+
+    def get_user(self, validated_token):
+        if PROFILE_ID_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+
+        user = ClaimsUser(validated_token)
+
+        ttl = getattr(settings, 'CLAIMS_AUTH_REVOCATION_TTL', 0)
+        if ttl:
+            size = getattr(settings, 'CLAIMS_AUTH_REVOCATION_CACHE_SIZE',
+                           10000)
+            if not active_user_cache.is_active(user.id, ttl, size):
+                raise AuthenticationFailed(_('User not found'),
+                                           code='user_not_found')
+        return user
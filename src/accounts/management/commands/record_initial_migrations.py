@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+
+
+class Command(BaseCommand):
+    help = 'Records as applied the initial migrations that applied ' \
+           'migrations depend on, when their tables exist. Databases ' \
+           'created with migrate --run-syncdb have the admin migrations ' \
+           'applied without the accounts one they depend on, which ' \
+           'migrate refuses. Run migrate --fake-initial afterwards.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Database to record the migrations in.')
+
+    def handle(self, *args, database, **options):
+        executor = MigrationExecutor(connections[database])
+        graph = executor.loader.graph
+        applied = executor.recorder.applied_migrations()
+
+        missing = sorted({parent.key for key in applied if key in graph.nodes
+                          for parent in graph.node_map[key].parents
+                          if parent.key not in applied})
+        for key in missing:
+            migration = graph.nodes[key]
+            if not migration.initial:
+                raise CommandError(f'{migration} is not an initial migration.')
+            # the same check migrate --fake-initial makes
+            exists, __ = executor.detect_soft_applied(None, migration)
+            if not exists:
+                raise CommandError(f'The tables of {migration} do not exist.')
+            executor.recorder.record_applied(*key)
+            self.stdout.write(f'Recorded {migration}.')
+
+        self.stdout.write(f'Recorded {len(missing)} migrations.')
@@ -0,0 +1,48 @@
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+)
+
+from .authentication import ClaimsJWTAuthentication
+
+TOKEN_QUERY_PARAM = 'token'
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """Sets scope['user'] of websocket connections from a simplejwt access
+    token, read from an Authorization header or, as browsers cannot set
+    headers on websockets, from the token query parameter."""
+
+    async def __call__(self, scope, receive, send):
+        scope = dict(scope, user=await get_user(scope))
+        return await super().__call__(scope, receive, send)
+
+
+def get_raw_token(scope, authentication):
+    for name, value in scope.get('headers', ()):
+        if name == b'authorization':
+            return authentication.get_raw_token(value)
+
+    query = parse_qs(scope.get('query_string', b'').decode())
+    tokens = query.get(TOKEN_QUERY_PARAM, None)
+    if tokens:
+        return tokens[0].encode()
+    return None
+
+
+@database_sync_to_async
+def get_user(scope):
+    authentication = ClaimsJWTAuthentication()
+    try:
+        raw_token = get_raw_token(scope, authentication)
+        if raw_token is None:
+            return AnonymousUser()
+        validated_token = authentication.get_validated_token(raw_token)
+        return authentication.get_user(validated_token)
+    except (InvalidToken, AuthenticationFailed):
+        return AnonymousUser()
@@ -0,0 +1,76 @@
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.authentication import (
+    PROFILE_ID_CLAIM,
+    ClaimsUser,
+    active_user_cache,
+)
+from profiles.cache import graph_cache
+from .test_http import PASSWORD, create_user
+
+
+class ClaimsAuthenticationTest(APITestCase):
+
+    def setUp(self):
+        active_user_cache.clear()
+        self.user = create_user()
+        response = self.client.post(reverse('accounts:login'), data={
+            'username': self.user.username,
+            'password': PASSWORD,
+        })
+        self.access = response.data['access']
+
+    def get_profile(self, access):
+        return self.client.get(
+            reverse('profiles:profile',
+                    kwargs={'username': self.user.username}),
+            HTTP_AUTHORIZATION=f'Bearer {access}'
+        )
+
+    def test_profile_id_claim(self):
+        token = AccessToken(self.access)
+        self.assertEqual(token[PROFILE_ID_CLAIM], self.user.profile.id)
+
+    def test_claims_principal(self):
+        user = ClaimsUser(AccessToken(self.access))
+        with self.assertNumQueries(0):
+            profile = user.profile
+            self.assertEqual(profile, self.user.profile)
+            self.assertEqual(profile.get_username(), self.user.username)
+            self.assertEqual(profile.user.first_name, self.user.first_name)
+        self.assertEqual(user.user, self.user)
+
+    @override_settings(CLAIMS_AUTH_REVOCATION_TTL=0)
+    def test_no_user_queries(self):
+        graph_cache.cache.clear()
+        with self.assertNumQueries(2):
+            # the profile lookup, with its graph version, and the
+            # relationships of its social graph
+            response = self.get_profile(self.access)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(response.data['username'], self.user.username)
+
+    def test_revocation_cache(self):
+        response = self.get_profile(self.access)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+
+        # still trusted within the TTL
+        self.user.delete()
+        response = self.get_profile(self.access)
+        self.assertEqual(status.HTTP_404_NOT_FOUND, response.status_code)
+
+        active_user_cache.clear()
+        response = self.get_profile(self.access)
+        self.assertEqual(status.HTTP_401_UNAUTHORIZED, response.status_code)
+
+    def test_token_without_profile_id(self):
+        token = AccessToken.for_user(self.user)
+        self.assertNotIn(PROFILE_ID_CLAIM, token)
+
+        response = self.get_profile(str(token))
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(response.data['username'], self.user.username)
@@ -0,0 +1,32 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.recorder import MigrationRecorder
+from django.test import TestCase
+
+
+class RecordInitialMigrationsTest(TestCase):
+
+    def setUp(self):
+        # as in a database created with migrate --run-syncdb, which
+        # records the admin migrations only
+        self.recorder = MigrationRecorder(connection)
+        self.recorder.record_unapplied('accounts', '0001_initial')
+
+    def record(self):
+        out = StringIO()
+        call_command('record_initial_migrations', stdout=out)
+        return out.getvalue()
+
+    def test_record(self):
+        output = self.record()
+
+        self.assertIn('Recorded accounts.0001_initial.', output)
+        self.assertIn(('accounts', '0001_initial'),
+                      self.recorder.applied_migrations())
+
+    def test_idempotent(self):
+        self.record()
+
+        self.assertIn('Recorded 0 migrations.', self.record())
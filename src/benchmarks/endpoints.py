@@ -0,0 +1,317 @@
+"""Measures the latency of every endpoint of profiles.urls and accounts.urls
+on seeded social graphs of growing sizes, along with the number of queries
+and the size of the responses, and prints the results as JSON.
+
+Run from the src directory with ``python -m benchmarks.endpoints``, see
+``--help`` for the options. Each size runs against a fresh test database
+filled by the seed_graph command, as seen by its most connected profile.
+"""
+import argparse
+import json
+import math
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from itertools import cycle, islice
+
+from .utils import setup, test_database
+
+PASSWORD = 'benchmark-password'
+
+BULK_SIZE = 10
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+class Scenario:
+    """A request to an endpoint, made once per iteration.
+
+    request(i) returns the path and data of the i-th request. before(i)
+    makes the state the request needs and after(i) undoes its effects, so
+    every request sees the same graph. Neither of them is timed.
+    """
+
+    def __init__(self, name, method, request, before=None, after=None,
+                 authenticated=True):
+        self.name = name
+        self.method = method
+        self.request = request
+        self.before = before
+        self.after = after
+        self.authenticated = authenticated
+
+
+class Dataset:
+    """Profiles of a seeded graph playing the roles the scenarios need."""
+
+    def __init__(self):
+        from django.db.models import Q
+        from profiles.models import Profile, Relationship, FriendRequest
+
+        # friendships are stored once, on either side
+        friend_counts = Counter()
+        for pair in Relationship.objects.filter(status=1).values_list(
+                'from_profile', 'to_profile'):
+            friend_counts.update(pair)
+        hub_id = min(friend_counts,
+                     key=lambda id: (-friend_counts[id], id))
+        self.hub = Profile.objects.select_related('user').get(id=hub_id)
+
+        friend_ids = list(self.hub.get_friend_ids())
+        self.friends = list(Profile.objects.select_related('user')
+                            .filter(id__in=friend_ids).order_by('id'))
+
+        # profiles with no relationship or request with the hub
+        related = set(friend_ids)
+        for model in (Relationship, FriendRequest):
+            for from_id, to_id in model.objects.filter(
+                    Q(from_profile=self.hub) | Q(to_profile=self.hub)
+            ).values_list('from_profile', 'to_profile'):
+                related.update((from_id, to_id))
+        self.strangers = list(Profile.objects.select_related('user')
+                              .exclude(id__in=related | {self.hub.id})
+                              .order_by('id')[:1000])
+        if not self.friends or not self.strangers:
+            raise ValueError('The hub needs friends and strangers, seed a '
+                             'larger or sparser graph.')
+
+        self.mutual_friend = max(
+            self.friends,
+            key=lambda friend: len(friend.get_friend_ids() & related))
+
+    def friend(self, i):
+        return self.friends[i % len(self.friends)]
+
+    def stranger(self, i):
+        return self.strangers[i % len(self.strangers)]
+
+    def bulk_strangers(self, i):
+        size = min(BULK_SIZE, len(self.strangers))
+        return list(islice(cycle(self.strangers), i * size, (i + 1) * size))
+
+
+def get_scenarios(data, refresh_token):
+    from django.urls import reverse
+
+    hub = data.hub
+    username = hub.get_username()
+
+    def url(name, profile=hub):
+        return reverse(name, kwargs={'username': profile.get_username()})
+
+    def usernames(profiles):
+        return [profile.get_username() for profile in profiles]
+
+    return [
+        Scenario('profiles:profile', 'get',
+                 lambda i: (url('profiles:profile', data.friend(i)), None)),
+        Scenario('profiles:profile', 'patch',
+                 lambda i: (url('profiles:profile'),
+                            {'first_name': f'first{i}'})),
+
+        Scenario('profiles:friends', 'get',
+                 lambda i: (url('profiles:friends'), None)),
+        Scenario('profiles:friends', 'post',
+                 lambda i: (url('profiles:friends'),
+                            {'username': data.stranger(i).get_username()}),
+                 after=lambda i: hub.cancel_request(data.stranger(i))),
+        Scenario('profiles:friends', 'delete',
+                 lambda i: (url('profiles:friends'),
+                            {'username': data.friend(i).get_username()}),
+                 after=lambda i: hub.add_friend(data.friend(i))),
+        Scenario('profiles:friends-mutual', 'get',
+                 lambda i: (url('profiles:friends-mutual',
+                                data.mutual_friend), None)),
+        Scenario('profiles:friends-suggestions', 'get',
+                 lambda i: (url('profiles:friends-suggestions'), None)),
+        Scenario('profiles:friends-bulk', 'post',
+                 lambda i: (url('profiles:friends-bulk'),
+                            {'usernames': usernames(data.bulk_strangers(i))}),
+                 after=lambda i: [hub.cancel_request(profile)
+                                  for profile in data.bulk_strangers(i)]),
+
+        Scenario('profiles:requests', 'get',
+                 lambda i: (url('profiles:requests'), None)),
+        Scenario('profiles:requests', 'post',
+                 lambda i: (url('profiles:requests'),
+                            {'username': data.stranger(i).get_username(),
+                             'accepted': True}),
+                 before=lambda i: data.stranger(i).send_request(hub),
+                 after=lambda i: hub.remove_friend(data.stranger(i))),
+        Scenario('profiles:requests', 'delete',
+                 lambda i: (url('profiles:requests'),
+                            {'username': data.stranger(i).get_username()}),
+                 before=lambda i: hub.send_request(data.stranger(i))),
+
+        Scenario('profiles:blocking', 'get',
+                 lambda i: (url('profiles:blocking'), None)),
+        Scenario('profiles:blocking', 'post',
+                 lambda i: (url('profiles:blocking'),
+                            {'username': data.stranger(i).get_username()}),
+                 after=lambda i: hub.unblock(data.stranger(i))),
+        Scenario('profiles:blocking', 'delete',
+                 lambda i: (url('profiles:blocking'),
+                            {'username': data.stranger(i).get_username()}),
+                 before=lambda i: hub.block(data.stranger(i))),
+        Scenario('profiles:blocking-bulk', 'post',
+                 lambda i: (url('profiles:blocking-bulk'),
+                            {'usernames': usernames(data.bulk_strangers(i))}),
+                 after=lambda i: hub.bulk_unblock(data.bulk_strangers(i))),
+        Scenario('profiles:blocking-bulk', 'delete',
+                 lambda i: (url('profiles:blocking-bulk'),
+                            {'usernames': usernames(data.bulk_strangers(i))}),
+                 before=lambda i: hub.bulk_block(data.bulk_strangers(i))),
+
+        Scenario('accounts:sign-up', 'post',
+                 lambda i: (reverse('accounts:sign-up'),
+                            {'username': f'signup{i}',
+                             'password1': PASSWORD, 'password2': PASSWORD,
+                             'first_name': 'first', 'last_name': 'last'}),
+                 authenticated=False),
+        Scenario('accounts:login', 'post',
+                 lambda i: (reverse('accounts:login'),
+                            {'username': username, 'password': PASSWORD}),
+                 authenticated=False),
+        Scenario('accounts:token-refresh', 'post',
+                 lambda i: (reverse('accounts:token-refresh'),
+                            {'refresh': refresh_token}),
+                 authenticated=False),
+    ]
+
+
+def check_coverage(scenarios):
+    # every named route of the benchmarked url modules has a scenario
+    import accounts.urls
+    import profiles.urls
+
+    routes = {f'{module.app_name}:{pattern.name}'
+              for module in (profiles.urls, accounts.urls)
+              for pattern in module.urlpatterns}
+    missing = routes - {scenario.name for scenario in scenarios}
+    if missing:
+        raise ValueError(f'No scenario for {", ".join(sorted(missing))}.')
+
+
+def run_scenario(scenario, requests, token):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    if scenario.authenticated:
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    send = getattr(client, scenario.method)
+
+    timings, queries, sizes, errors = [], [], [], 0
+    for i in range(requests):
+        if scenario.before is not None:
+            scenario.before(i)
+        path, data = scenario.request(i)
+
+        # the query log is capped, and the count is taken from its length
+        connection.queries_log.clear()
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            response = send(path, data, format='json') \
+                if scenario.method != 'get' else send(path)
+            timings.append(time.perf_counter() - start)
+
+        queries.append(len(captured.captured_queries))
+        sizes.append(len(response.content))
+        if response.status_code >= 400:
+            errors += 1
+        if scenario.after is not None:
+            scenario.after(i)
+
+    return {
+        'endpoint': scenario.name,
+        'method': scenario.method.upper(),
+        'requests': requests,
+        'errors': errors,
+        'p50_ms': round(statistics.median(timings) * 1000, 3),
+        'p99_ms': round(percentile(timings, 0.99) * 1000, 3),
+        'queries': max(queries),
+        'response_bytes': max(sizes),
+    }
+
+
+def run_size(users, requests, seed):
+    from io import StringIO
+
+    from django.core.cache import caches
+    from django.core.management import call_command
+
+    from accounts.authentication import active_user_cache
+    from accounts.serializers import LoginSerializer
+
+    # database ids are reused from one size to the next
+    for cache in caches.all():
+        cache.clear()
+    active_user_cache.clear()
+
+    out = StringIO()
+    call_command('seed_graph', users=users, seed=seed, password=PASSWORD,
+                 stdout=out)
+    call_command('suggest_friends', processes=1, stdout=out)
+
+    data = Dataset()
+    refresh = LoginSerializer.get_token(data.hub.user)
+    scenarios = get_scenarios(data, str(refresh))
+    check_coverage(scenarios)
+
+    results = []
+    for scenario in scenarios:
+        # access tokens are short lived, so each scenario gets a new one
+        token = str(LoginSerializer.get_token(data.hub.user).access_token)
+        result = run_scenario(scenario, requests, token)
+        result.update(users=users, friends=len(data.friends))
+        results.append(result)
+        print(f'{users:>8} {result["method"]:<6} {result["endpoint"]:<30} '
+              f'p50 {result["p50_ms"]:8.2f} ms  p99 {result["p99_ms"]:8.2f} '
+              f'ms  {result["queries"]:3} queries', file=sys.stderr)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=[100, 1000, 10000],
+        help='Numbers of users of the seeded graphs.')
+    parser.add_argument(
+        '--requests', type=int, default=30,
+        help='Number of requests per endpoint and size.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--output', default=None,
+        help='File the JSON results are written to, stdout by default.')
+    args = parser.parse_args(argv)
+
+    setup()
+    from django.db import connection
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for users in args.sizes:
+            name = None
+            if connection.vendor == 'sqlite':
+                name = os.path.join(directory, f'benchmark{users}.sqlite3')
+            with test_database(name):
+                results.extend(run_size(users, args.requests, args.seed))
+
+    report = json.dumps({'sizes': args.sizes, 'requests': args.requests,
+                         'seed': args.seed, 'results': results}, indent=2)
+    if args.output is None:
+        print(report)
+    else:
+        with open(args.output, 'w') as output:
+            output.write(report + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""Compares storing each friendship as a single row, from the profile with
+the lower id, with storing a row each way, on a seeded social graph.
+
+Run from the src directory with ``python -m benchmarks.friendships``, see
+``--help`` for the options. Storage is measured with SQLite's dbstat table,
+so the benchmark needs an SQLite database. The two-row layout is built by
+adding the mirrored rows with check constraints ignored, and its writes
+are replayed with the statements Profile.add_relationship and
+remove_relationship used to make.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+
+from .utils import setup, test_database
+
+
+def relationship_bytes(cursor, table):
+    # pages of the table and of every index on it
+    cursor.execute(
+        "SELECT SUM(pgsize) FROM dbstat WHERE name IN ("
+        "SELECT name FROM sqlite_master WHERE tbl_name = %s)", [table])
+    return cursor.fetchone()[0]
+
+
+def mirror_friendships(cursor, table, add):
+    if add:
+        cursor.execute('PRAGMA ignore_check_constraints = ON')
+        cursor.execute(
+            f'SELECT from_profile_id, to_profile_id, created FROM {table} '
+            f'WHERE status = 1')
+        cursor.executemany(
+            f'INSERT INTO {table} (id, created, from_profile_id, '
+            f'to_profile_id, status) VALUES (%s, %s, %s, %s, 1)',
+            [(uuid.uuid4().hex, created, to_id, from_id)
+             for from_id, to_id, created in cursor.fetchall()])
+    else:
+        cursor.execute(
+            f'DELETE FROM {table} WHERE status = 1 '
+            f'AND from_profile_id > to_profile_id')
+        cursor.execute('PRAGMA ignore_check_constraints = OFF')
+
+
+def legacy_add(profile, other):
+    from profiles.models import Profile, Relationship
+
+    for from_profile, to_profile in ((profile, other), (other, profile)):
+        __, created = Relationship.objects.get_or_create(
+            from_profile=from_profile, to_profile=to_profile, status=1)
+        if created:
+            Profile.bump_graph_versions(profile.id, other.id)
+
+
+def legacy_remove(profile, other):
+    from profiles.models import Profile, Relationship
+
+    for from_profile, to_profile in ((profile, other), (other, profile)):
+        deleted, __ = Relationship.objects.filter(
+            from_profile=from_profile, to_profile=to_profile,
+            status=1).delete()
+        if deleted:
+            Profile.bump_graph_versions(profile.id, other.id)
+
+
+def time_writes(pairs, add, remove):
+    from django.db import connection
+
+    # counted with a wrapper, as the query log is capped
+    queries = 0
+
+    def count(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(count):
+        start = time.perf_counter()
+        for profile, other in pairs:
+            add(profile, other)
+        added = time.perf_counter() - start
+        start = time.perf_counter()
+        for profile, other in pairs:
+            remove(profile, other)
+        removed = time.perf_counter() - start
+    return added, removed, queries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument(
+        '--writes', type=int, default=500,
+        help='Number of friendships added and removed in each layout.')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    setup()
+    from django.core.management import call_command
+    from django.db import connection
+    from profiles.models import Profile, Relationship
+
+    if connection.vendor != 'sqlite':
+        parser.error('The benchmark measures storage with SQLite.')
+
+    table = Relationship._meta.db_table
+    with tempfile.TemporaryDirectory() as directory, \
+            test_database(os.path.join(directory, 'friendships.sqlite3')):
+        call_command('seed_graph', users=args.users, seed=args.seed)
+
+        with connection.cursor() as cursor:
+            friendships = Relationship.objects.filter(status=1).count()
+            single = relationship_bytes(cursor, table)
+            mirror_friendships(cursor, table, add=True)
+            double = relationship_bytes(cursor, table)
+            mirror_friendships(cursor, table, add=False)
+
+        # pairs that are not friends, written in both layouts
+        rng = random.Random(args.seed)
+        profiles = list(Profile.objects.order_by('id'))
+        pairs = []
+        while len(pairs) < args.writes:
+            profile, other = rng.sample(profiles, 2)
+            if not profile.is_friends_with(other):
+                pairs.append((profile, other))
+
+        single_writes = time_writes(
+            pairs,
+            lambda profile, other: profile.add_relationship(other, 1),
+            lambda profile, other: profile.remove_relationship(other, 1))
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA ignore_check_constraints = ON')
+        double_writes = time_writes(pairs, legacy_add, legacy_remove)
+
+    print(f'{args.users} users, {friendships} friendships')
+    print(f'{"":<24}{"one row":>12}{"two rows":>12}{"saved":>8}')
+    for name, spec, one, two in (
+            ('relationship rows', ',.0f', friendships, 2 * friendships),
+            ('table and index MB', '.1f', single / 2 ** 20, double / 2 ** 20),
+            ('add friend ms', '.2f', single_writes[0] * 1000 / args.writes,
+             double_writes[0] * 1000 / args.writes),
+            ('remove friend ms', '.2f',
+             single_writes[1] * 1000 / args.writes,
+             double_writes[1] * 1000 / args.writes),
+            ('queries per add+remove', '.1f', single_writes[2] / args.writes,
+             double_writes[2] / args.writes)):
+        print(f'{name:<24}{one:>12{spec}}{two:>12{spec}}'
+              f'{1 - one / two:>8.0%}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""Compares ProfileSerializer with the .values() fast path on a list of
+10,000 friends.
+
+Run from the src directory with ``python -m benchmarks.serialization``.
+"""
+from .utils import setup, test_database, create_profiles, best_of
+
+ROWS = 10000
+
+
+def main():
+    setup()
+    from profiles.models import Relationship
+    from profiles.serializers import ProfileSerializer
+
+    with test_database():
+        hub = create_profiles(1, 'hub')[0]
+        friends = create_profiles(ROWS, 'friend')
+        Relationship.objects.bulk_create(
+            Relationship(from_profile=hub, to_profile=friend, status=1)
+            for friend in friends)
+        queryset = hub.get_friends()
+
+        def serializer():
+            return ProfileSerializer(
+                queryset.select_related('user'), many=True,
+                fields=ProfileSerializer.PUBLIC_FIELDS).data
+
+        def fast_path():
+            return ProfileSerializer.public_data(
+                ProfileSerializer.public_values(queryset))
+
+        assert serializer() == fast_path()
+
+        slow = best_of(serializer)
+        fast = best_of(fast_path)
+        print(f'{ROWS} rows')
+        print(f'ProfileSerializer:  {slow * 1000:8.1f} ms')
+        print(f'public_data:        {fast * 1000:8.1f} ms')
+        print(f'speedup:            {slow / fast:8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
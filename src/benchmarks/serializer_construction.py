@@ -0,0 +1,43 @@
+"""Compares building ProfileSerializer's fields by pruning the full field
+set, as DynamicModelSerializer used to, with the cached subset classes.
+
+Run from the src directory with
+``python -m benchmarks.serializer_construction``.
+"""
+from .utils import setup, best_of
+
+ITERATIONS = 10000
+
+
+def main():
+    setup()
+    from django.contrib.auth import get_user_model
+    from profiles.models import Profile
+    from profiles.serializers import ProfileSerializer
+
+    profile = Profile(user=get_user_model()(username='user1',
+                                            first_name='bob',
+                                            last_name='smith'))
+    fields = ProfileSerializer.PUBLIC_FIELDS
+
+    def pruned():
+        for __ in range(ITERATIONS):
+            serializer = ProfileSerializer(profile)
+            allowed = set(fields)
+            for field_name in set(serializer.fields) - allowed:
+                serializer.fields.pop(field_name)
+
+    def subset():
+        for __ in range(ITERATIONS):
+            ProfileSerializer(profile, fields=fields).fields
+
+    before = best_of(pruned)
+    after = best_of(subset)
+    print(f'{ITERATIONS} serializers')
+    print(f'pruned fields:  {before * 1e6 / ITERATIONS:8.1f} us each')
+    print(f'subset class:   {after * 1e6 / ITERATIONS:8.1f} us each')
+    print(f'speedup:        {before / after:8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+import os
+import time
+from contextlib import contextmanager
+
+
+def setup():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'messages.settings')
+    import django
+    django.setup()
+
+
+@contextmanager
+def test_database(name=None):
+    # Run against a throwaway test database, as the test runner does. An
+    # in-memory SQLite database lasts as long as the process, so giving a
+    # file name is the way to start from an empty one more than once.
+    from django.db import connection
+    from django.test.utils import (
+        setup_test_environment,
+        teardown_test_environment,
+    )
+
+    test_settings = connection.settings_dict['TEST']
+    old_test_name = test_settings['NAME']
+    if name is not None:
+        test_settings['NAME'] = name
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+        test_settings['NAME'] = old_test_name
+
+
+def create_profiles(count, prefix='user'):
+    # bulk_create skips the create_profile signal, so profiles are
+    # created separately
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import make_password
+    from profiles.models import Profile
+
+    User = get_user_model()
+    password = make_password(None)
+    User.objects.bulk_create(
+        User(username=f'{prefix}{i}', first_name=f'first{i}',
+             last_name=f'last{i}', password=password)
+        for i in range(count))
+    users = User.objects.filter(username__startswith=prefix) \
+        .values_list('id', flat=True)
+    Profile.objects.bulk_create(Profile(user_id=id) for id in users)
+    return list(Profile.objects.filter(user__username__startswith=prefix))
+
+
+def best_of(func, repeat=5):
+    timings = []
+    for __ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
@@ -0,0 +1,20 @@
+from django.contrib import admin
+
+from .models import Conversation, Membership
+
+
+# Register your models here.
+
+class MembershipInline(admin.TabularInline):
+    model = Membership
+    extra = 0
+    fields = ('profile', 'created')
+    readonly_fields = ('profile', 'created')
+
+
+class ConversationAdmin(admin.ModelAdmin):
+    inlines = (MembershipInline,)
+    list_display = ('id', 'created')
+
+
+admin.site.register(Conversation, ConversationAdmin)
@@ -0,0 +1,28 @@
+from rest_framework.exceptions import APIException
+
+
+class ParticipantsNotFriends(APIException):
+    status_code = 400
+    default_detail = 'You can only start conversations with users on your ' \
+                     'friends list.'
+    default_code = 'not_friends'
+
+
+class CannotSendMessage(APIException):
+    status_code = 403
+    default_detail = 'You can no longer send messages in this conversation.'
+    default_code = 'cannot_send'
+
+
+class ConflictingCursors(APIException):
+    status_code = 400
+    default_detail = 'Only one of the before and after cursors can be ' \
+                     'provided.'
+    default_code = 'invalid_cursor'
+
+
+class MessageDoesNotExist(APIException):
+    status_code = 400
+    default_detail = 'No message exists with the given id in this ' \
+                     'conversation.'
+    default_code = 'no_message'
@@ -0,0 +1,24 @@
+# Generated by Django 3.1.8 on 2026-10-18 20:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0002_membership_inbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='membership',
+            name='last_read',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='chat.message'),
+        ),
+        migrations.AddField(
+            model_name='membership',
+            name='read_created',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+    ]
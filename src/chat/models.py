@@ -0,0 +1,206 @@
+import uuid
+
+from django.db import models, transaction
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    OuterRef,
+    Q,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from profiles.models import Profile
+
+
+# Create your models here.
+
+class Conversation(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    created = models.DateTimeField(auto_now_add=True, editable=False)
+
+    participants = models.ManyToManyField(
+        Profile, through='Membership', related_name='conversations')
+
+    # Set on conversations between exactly two profiles, so there is at
+    # most one of them per pair
+    direct_key = models.CharField(max_length=64, unique=True, null=True,
+                                  editable=False)
+
+    @staticmethod
+    def get_direct_key(profile1, profile2):
+        return '{}:{}'.format(*sorted((profile1.id, profile2.id)))
+
+    @classmethod
+    def start(cls, profile, others):
+        # Conversations with a single other profile are reused
+        with transaction.atomic():
+            if len(others) == 1:
+                conversation, created = cls.objects.get_or_create(
+                    direct_key=cls.get_direct_key(profile, others[0]))
+                if not created:
+                    return conversation, False
+            else:
+                conversation = cls.objects.create()
+            Membership.objects.bulk_create(
+                Membership(conversation=conversation, profile=participant)
+                for participant in (profile, *others))
+        return conversation, True
+
+    @property
+    def is_direct(self):
+        return self.direct_key is not None
+
+    def get_other_participant_ids(self, profile):
+        return self.memberships.exclude(profile=profile) \
+            .values_list('profile_id', flat=True)
+
+    def send(self, profile, text):
+        # The memberships are updated in the same statement for every
+        # participant. Concurrent sends may commit out of order, so the last
+        # message only moves forward.
+        with transaction.atomic():
+            message = Message.objects.create(
+                conversation=self, sender=profile, text=text)
+            newer = Q(activity__lte=message.created)
+            sent = Q(profile=profile) & (
+                Q(read_created__isnull=True)
+                | Q(read_created__lte=message.created))
+            self.memberships.update(
+                last_message=Case(
+                    When(newer, then=Value(
+                        message.id, output_field=models.UUIDField())),
+                    default=F('last_message')),
+                activity=Greatest('activity', Value(
+                    message.created, output_field=models.DateTimeField())),
+                unread_count=Case(
+                    When(profile=profile, then=Value(0)),
+                    default=F('unread_count') + 1),
+                # the sender has read the conversation up to its message
+                last_read=Case(
+                    When(sent, then=Value(
+                        message.id, output_field=models.UUIDField())),
+                    default=F('last_read')),
+                read_created=Case(
+                    When(sent, then=Value(
+                        message.created,
+                        output_field=models.DateTimeField())),
+                    default=F('read_created')))
+        return message
+
+    def __str__(self):
+        return f'Conversation {self.id}'
+
+
+class Membership(models.Model):
+    created = models.DateTimeField(auto_now_add=True, editable=False)
+
+    conversation = models.ForeignKey(
+        Conversation, on_delete=models.CASCADE, related_name='memberships')
+
+    profile = models.ForeignKey(
+        Profile, on_delete=models.CASCADE, related_name='memberships')
+
+    # Denormalized from the conversation's messages by Conversation.send,
+    # so the inbox is read from the memberships alone. Activity is the time
+    # of the last message, or of joining the conversation before any.
+    last_message = models.ForeignKey(
+        'Message', on_delete=models.SET_NULL, null=True, editable=False,
+        related_name='+')
+
+    activity = models.DateTimeField(default=timezone.now, editable=False)
+
+    unread_count = models.PositiveIntegerField(default=0, editable=False)
+
+    # Read watermark: every message up to the last read one, in (created,
+    # id) order, has been read by the profile. Read receipts and unread
+    # counts are derived from it instead of being stored per message.
+    last_read = models.ForeignKey(
+        'Message', on_delete=models.SET_NULL, null=True, editable=False,
+        related_name='+')
+
+    read_created = models.DateTimeField(null=True, editable=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['conversation', 'profile'],
+                name='unique_membership'),
+        ]
+        indexes = [
+            models.Index(
+                fields=['profile', 'created', 'id'],
+                name='membership_profile_idx'),
+            models.Index(
+                fields=['profile', 'activity', 'id'],
+                name='membership_inbox_idx'),
+        ]
+
+    @staticmethod
+    def read_all(memberships):
+        # Moves the watermarks to the last messages, in a single statement
+        # however many memberships there are
+        return memberships.update(
+            last_read=F('last_message'),
+            read_created=Subquery(Message.objects.filter(
+                id=OuterRef('last_message')).values('created')),
+            unread_count=0)
+
+    def read_until(self, message):
+        # Moves the watermark forward to the message and recounts the
+        # unread messages after it
+        after = Message.objects.filter(
+            Q(created__gt=message.created)
+            | Q(created=message.created, id__gt=message.id),
+            conversation=OuterRef('conversation'))
+        unread = after.order_by().values('conversation').annotate(
+            count=Count('id')).values('count')
+        return Membership.objects.filter(
+            Q(read_created__isnull=True)
+            | Q(read_created__lt=message.created)
+            | Q(read_created=message.created, last_read__lt=message.id),
+            id=self.id,
+        ).update(
+            last_read=message,
+            read_created=message.created,
+            unread_count=Coalesce(Subquery(unread), 0))
+
+    def has_read(self, message):
+        if self.read_created is None:
+            return False
+        return (self.read_created, self.last_read_id) \
+            >= (message.created, message.id)
+
+    def __str__(self):
+        return 'Membership'
+
+
+class Message(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    created = models.DateTimeField(auto_now_add=True, editable=False)
+
+    conversation = models.ForeignKey(
+        Conversation, on_delete=models.CASCADE, related_name='messages')
+
+    sender = models.ForeignKey(
+        Profile, on_delete=models.CASCADE, related_name='sent_messages')
+
+    text = models.TextField()
+
+    class Meta:
+        indexes = [
+            # History is read in (created, id) order within a conversation,
+            # so every page is a range scan on this index
+            models.Index(
+                fields=['conversation', 'created', 'id'],
+                name='message_history_idx'),
+        ]
+
+    def __str__(self):
+        return 'Message'
@@ -0,0 +1,67 @@
+from profiles.pagination import KeysetPagination
+
+from .exceptions import ConflictingCursors
+
+
+class HistoryPagination(KeysetPagination):
+    """Paginates a conversation's history on its (created, id) ordering, in
+    both directions.
+
+    Without a cursor, the latest page is returned. The before and after
+    cursors return the page right before or after a message. Pages are
+    always in chronological order, and the cursors of the neighbouring
+    pages are sent in a Link header with rel="prev" and rel="next".
+    """
+    before_query_param = 'before'
+    after_query_param = 'after'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+
+        before = request.query_params.get(self.before_query_param, None)
+        after = request.query_params.get(self.after_query_param, None)
+        if before is not None and after is not None:
+            raise ConflictingCursors
+
+        if after is not None:
+            queryset = self.filter_cursor(queryset, after, 'gt')
+            rows = list(queryset.order_by(self.created, self.id)
+                        [:self.page_size + 1])
+            has_previous = True
+            has_next = len(rows) > self.page_size
+            rows = rows[:self.page_size]
+        else:
+            if before is not None:
+                queryset = self.filter_cursor(queryset, before, 'lt')
+            rows = list(queryset.order_by(f'-{self.created}', f'-{self.id}')
+                        [:self.page_size + 1])
+            has_previous = len(rows) > self.page_size
+            has_next = before is not None
+            rows = rows[:self.page_size][::-1]
+
+        self.previous_position = self.next_position = None
+        if rows and has_previous:
+            self.previous_position = self.get_position(rows[0])
+        if rows and has_next:
+            self.next_position = self.get_position(rows[-1])
+        return rows
+
+    def get_previous_link(self):
+        if self.previous_position is None:
+            return None
+        return self.get_link(self.before_query_param, self.previous_position,
+                             self.after_query_param)
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return self.get_link(self.after_query_param, self.next_position,
+                             self.before_query_param)
+
+    def get_links(self):
+        links = super().get_links()
+        previous_link = self.get_previous_link()
+        if previous_link is not None:
+            links.insert(0, f'<{previous_link}>; rel="prev"')
+        return links
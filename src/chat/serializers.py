@@ -0,0 +1,61 @@
+from rest_framework import serializers
+
+from .models import Conversation, Membership, Message
+
+
+class ConversationSerializer(serializers.ModelSerializer):
+
+    participants = serializers.StringRelatedField(many=True, read_only=True)
+
+    class Meta:
+        model = Conversation
+        fields = ('id', 'created', 'participants')
+
+
+class MessageSerializer(serializers.ModelSerializer):
+
+    sender = serializers.CharField(source='sender.get_username',
+                                   read_only=True)
+
+    class Meta:
+        model = Message
+        fields = ('id', 'created', 'sender', 'text')
+        read_only_fields = ('id', 'created')
+
+
+class InboxSerializer(serializers.ModelSerializer):
+
+    conversation = serializers.UUIDField(source='conversation_id',
+                                         read_only=True)
+
+    last_message = MessageSerializer(read_only=True)
+
+    class Meta:
+        model = Membership
+        fields = ('conversation', 'activity', 'unread_count', 'last_message')
+
+
+class HistorySerializer(MessageSerializer):
+    """Messages with the other participants who have read them, derived
+    from the read watermarks of their memberships, given in the context."""
+
+    read_by = serializers.SerializerMethodField()
+
+    class Meta(MessageSerializer.Meta):
+        fields = MessageSerializer.Meta.fields + ('read_by',)
+
+    def get_read_by(self, message):
+        return [membership.profile.get_username()
+                for membership in self.context['memberships']
+                if membership.has_read(message)]
+
+
+class ReadSerializer(serializers.Serializer):
+
+    message = serializers.UUIDField(required=False)
+
+
+class BulkReadSerializer(serializers.Serializer):
+
+    conversations = serializers.ListField(
+        child=serializers.UUIDField(), allow_empty=False, max_length=1000)
@@ -0,0 +1,49 @@
+from django.http import Http404
+
+from profiles.shortcuts import get_other_profiles_with_state
+
+from .exceptions import ParticipantsNotFriends, CannotSendMessage
+from .models import Membership
+
+MESSAGE_404 = "Conversation does not exist."
+
+
+def get_membership_or_404(profile, conversation_id):
+    # conversations are hidden from profiles outside of them
+    membership = Membership.objects.select_related('conversation') \
+        .filter(profile=profile, conversation_id=conversation_id).first()
+    if membership is None:
+        raise Http404(MESSAGE_404)
+    return membership
+
+
+def get_conversation_or_404(profile, conversation_id):
+    return get_membership_or_404(profile, conversation_id).conversation
+
+
+def get_participants(profile, usernames):
+    # conversations can only be started with friends
+    participants = []
+    for username, other, state in get_other_profiles_with_state(
+            profile, usernames):
+        if other is None:
+            raise Http404(f'Profile {username} does not exist.')
+        if not state.friends:
+            raise ParticipantsNotFriends
+        participants.append(other)
+    return participants
+
+
+def check_can_send(profile, conversation):
+    # Two profiles can only message each other while they are friends. In
+    # group conversations, profiles blocking each other cannot message.
+    # Every participant is checked against the sender's cached graph.
+    graph = profile.get_graph()
+    for other_id in conversation.get_other_participant_ids(profile):
+        if conversation.is_direct:
+            allowed = other_id in graph.friends
+        else:
+            allowed = other_id not in graph.blocking \
+                and other_id not in graph.blocked_by
+        if not allowed:
+            raise CannotSendMessage
@@ -0,0 +1,23 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from profiles.events import publish
+
+from .models import Membership, Message
+from .serializers import MessageSerializer
+
+
+# Events pushed to websockets, see profiles.events
+
+@receiver(post_save, sender=Message)
+def publish_created_message(sender, instance, created, **kwargs):
+    if created:
+        # every participant, including the sender's other connections
+        publish(
+            Membership.objects.filter(conversation_id=instance.conversation_id)
+            .values_list('profile_id', flat=True),
+            {
+                'type': 'message',
+                'conversation': instance.conversation_id,
+                'message': MessageSerializer(instance).data,
+            })
@@ -0,0 +1,56 @@
+from rest_framework.reverse import reverse
+
+from chat.models import Conversation
+from profiles.tests.mixins import QueryBudgetMixin
+from profiles.tests.test_http import create_user
+from .test_http import ConversationTestCase
+
+
+class HttpQueryBudgetTest(QueryBudgetMixin, ConversationTestCase):
+    query_budgets = {
+        ('chat:conversations', 'get'): 3,
+        ('chat:inbox', 'get'): 2,
+        ('chat:messages', 'get'): 4,
+        ('chat:messages', 'post'): 10,
+        ('chat:read-bulk', 'post'): 2,
+    }
+
+    def setUp(self):
+        super().setUp()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access1}')
+
+    def start_conversations(self, size):
+        # a conversation with each of size new friends of user1
+        conversations = []
+        for i in range(size):
+            profile = create_user(f'friend{i}', password=None).profile
+            self.profile1.add_friend(profile)
+            conversation, __ = Conversation.start(self.profile1, [profile])
+            conversation.send(profile, 'hello')
+            conversations.append(conversation)
+        return conversations
+
+    def make_budget_request(self, name, method, size):
+        if name == 'chat:messages' and method == 'post':
+            # a group of user1, user2 and size new friends of user1
+            friends = [create_user(f'friend{i}', password=None).profile
+                       for i in range(size)]
+            for profile in friends:
+                self.profile1.add_friend(profile)
+            group, __ = Conversation.start(
+                self.profile1, [self.profile2] + friends)
+            return self.messages_url(group), {'text': 'hello'}
+        if name == 'chat:messages':
+            group, __ = Conversation.start(
+                self.profile1, [self.profile2, self.profile3])
+            for i in range(size):
+                group.send(self.profile2 if i % 2 else self.profile3,
+                           f'message {i}')
+            return self.messages_url(group), None
+
+        conversations = self.start_conversations(size)
+        url = reverse(name, kwargs={'username': 'user1'})
+        if method == 'get':
+            return url, None
+        return url, {'conversations': [str(conversation.id)
+                                       for conversation in conversations]}
@@ -0,0 +1,31 @@
+from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
+
+from chat.models import Conversation
+from profiles.tests.test_events import EventsTestCase
+
+
+class MessageEventsTest(EventsTestCase):
+
+    def test_message(self):
+        self.profile1.add_friend(self.profile2)
+        conversation, _ = Conversation.start(self.profile1, [self.profile2])
+
+        async def test():
+            communicator1 = await self.connect(self.user1)
+            communicator2 = await self.connect(self.user2)
+
+            message = await database_sync_to_async(conversation.send)(
+                self.profile1, 'hello')
+
+            for communicator in (communicator1, communicator2):
+                event = await communicator.receive_json_from()
+                self.assertEqual(event['type'], 'message')
+                self.assertEqual(event['conversation'], str(conversation.id))
+                self.assertEqual(event['message']['id'], str(message.id))
+                self.assertEqual(event['message']['sender'], 'user1')
+                self.assertEqual(event['message']['text'], 'hello')
+
+            await communicator1.disconnect()
+            await communicator2.disconnect()
+        async_to_sync(test)()
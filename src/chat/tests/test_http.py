@@ -0,0 +1,214 @@
+import json
+import re
+
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from chat.models import Conversation
+from profiles.tests.test_http import PASSWORD, create_user
+from profiles.tests.test_pagination import next_link
+
+
+class ConversationTestCase(APITestCase):
+
+    def setUp(self):
+        self.user1 = create_user('user1', 'bob', 'smith')
+        response = self.client.post(
+            reverse('accounts:login'),
+            data=json.dumps({
+                'username': self.user1.username,
+                'password': PASSWORD,
+            }),
+            content_type='application/json'
+        )
+        self.access1 = response.data['access']
+
+        self.users = [create_user(f'user{i}') for i in range(2, 6)]
+        self.profile1 = self.user1.profile
+        self.profile2, self.profile3, self.profile4, self.profile5 = \
+            [user.profile for user in self.users]
+
+        # Setup Info
+        # user1 is friends with user2, user3 and user4.
+        # user5 is not friends with user1.
+        for profile in (self.profile2, self.profile3, self.profile4):
+            self.profile1.add_friend(profile)
+
+    def get(self, url, **params):
+        return self.client.get(
+            url, data=params, HTTP_AUTHORIZATION=f'Bearer {self.access1}')
+
+    def post(self, url, data):
+        return self.client.post(
+            url, data=json.dumps(data), content_type='application/json',
+            HTTP_AUTHORIZATION=f'Bearer {self.access1}')
+
+    def conversations_url(self, username='user1'):
+        return reverse('chat:conversations', kwargs={'username': username})
+
+    def messages_url(self, conversation, username='user1'):
+        return reverse('chat:messages', kwargs={
+            'username': username, 'conversation_id': conversation.id})
+
+
+class HttpConversationsTest(ConversationTestCase):
+
+    def test_start_conversation(self):
+        response = self.post(self.conversations_url(),
+                             {'usernames': ['user2']})
+
+        self.assertEqual(status.HTTP_201_CREATED, response.status_code)
+        self.assertEqual(sorted(response.data['participants']),
+                         ['user1', 'user2'])
+
+        # the direct conversation is reused
+        again = self.post(self.conversations_url(), {'usernames': ['user2']})
+        self.assertEqual(status.HTTP_200_OK, again.status_code)
+        self.assertEqual(response.data['id'], again.data['id'])
+
+    def test_start_group_conversation(self):
+        response = self.post(self.conversations_url(),
+                             {'usernames': ['user2', 'user3']})
+
+        self.assertEqual(status.HTTP_201_CREATED, response.status_code)
+        self.assertEqual(sorted(response.data['participants']),
+                         ['user1', 'user2', 'user3'])
+
+    def test_start_with_non_friend(self):
+        response = self.post(self.conversations_url(),
+                             {'usernames': ['user2', 'user5']})
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertEqual(response.data['detail'].code, 'not_friends')
+        self.assertFalse(Conversation.objects.exists())
+
+    def test_start_with_unknown_user(self):
+        response = self.post(self.conversations_url(),
+                             {'usernames': ['user9']})
+
+        self.assertEqual(status.HTTP_404_NOT_FOUND, response.status_code)
+
+    def test_other_profile(self):
+        response = self.get(self.conversations_url('user2'))
+
+        self.assertEqual(status.HTTP_403_FORBIDDEN, response.status_code)
+
+    def test_list_conversations(self):
+        Conversation.start(self.profile1, [self.profile2])
+        Conversation.start(self.profile1, [self.profile3, self.profile4])
+        Conversation.start(self.profile2, [self.profile3])
+
+        response = self.get(self.conversations_url(), page_size=1)
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(sorted(response.data[0]['participants']),
+                         ['user1', 'user2'])
+
+        response = self.get(next_link(response))
+        self.assertEqual(sorted(response.data[0]['participants']),
+                         ['user1', 'user3', 'user4'])
+        self.assertNotIn('Link', response)
+
+
+class HttpMessagesTest(ConversationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.conversation, _ = Conversation.start(
+            self.profile1, [self.profile2])
+
+    def link(self, response, rel):
+        links = re.findall(r'<([^>]+)>; rel="(\w+)"', response.get('Link', ''))
+        return {name: url for url, name in links}.get(rel, None)
+
+    def test_send_message(self):
+        response = self.post(self.messages_url(self.conversation),
+                             {'text': 'hello'})
+
+        self.assertEqual(status.HTTP_201_CREATED, response.status_code)
+        self.assertEqual(response.data['sender'], 'user1')
+        self.assertEqual(response.data['text'], 'hello')
+        self.assertEqual(self.conversation.messages.count(), 1)
+
+    def test_send_empty_message(self):
+        response = self.post(self.messages_url(self.conversation),
+                             {'text': ''})
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+
+    def test_send_after_unfriending(self):
+        self.profile1.remove_friend(self.profile2)
+        response = self.post(self.messages_url(self.conversation),
+                             {'text': 'hello'})
+
+        self.assertEqual(status.HTTP_403_FORBIDDEN, response.status_code)
+        self.assertEqual(response.data['detail'].code, 'cannot_send')
+
+    def test_send_in_group_with_blocker(self):
+        conversation, _ = Conversation.start(
+            self.profile1, [self.profile2, self.profile3])
+        self.profile3.block(self.profile1)
+        response = self.post(self.messages_url(conversation),
+                             {'text': 'hello'})
+
+        self.assertEqual(status.HTTP_403_FORBIDDEN, response.status_code)
+
+    def test_not_a_participant(self):
+        conversation, _ = Conversation.start(self.profile2, [self.profile3])
+        response = self.get(self.messages_url(conversation))
+
+        self.assertEqual(status.HTTP_404_NOT_FOUND, response.status_code)
+
+    def test_history(self):
+        for i in range(5):
+            self.conversation.send(self.profile1, f'message {i}')
+
+        # the latest page, in chronological order
+        response = self.get(self.messages_url(self.conversation), page_size=2)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual([message['text'] for message in response.data],
+                         ['message 3', 'message 4'])
+        self.assertIsNone(self.link(response, 'next'))
+
+        response = self.get(self.link(response, 'prev'))
+        self.assertEqual([message['text'] for message in response.data],
+                         ['message 1', 'message 2'])
+
+        response = self.get(self.link(response, 'prev'))
+        self.assertEqual([message['text'] for message in response.data],
+                         ['message 0'])
+        self.assertIsNone(self.link(response, 'prev'))
+
+        # and forward again
+        response = self.get(self.link(response, 'next'))
+        self.assertEqual([message['text'] for message in response.data],
+                         ['message 1', 'message 2'])
+
+        response = self.get(self.link(response, 'next'))
+        self.assertEqual([message['text'] for message in response.data],
+                         ['message 3', 'message 4'])
+        self.assertIsNone(self.link(response, 'next'))
+
+    def test_conflicting_cursors(self):
+        response = self.get(self.messages_url(self.conversation),
+                            before='a', after='b')
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+
+    def test_invalid_cursor(self):
+        response = self.get(self.messages_url(self.conversation),
+                            before='invalid')
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+
+    def test_history_query_count(self):
+        for i in range(5):
+            self.conversation.send(self.profile1, f'message {i}')
+        url = self.messages_url(self.conversation)
+        self.get(url)
+
+        # membership, the page of messages with their senders and the read
+        # watermarks of the other participants
+        with self.assertNumQueries(3):
+            self.get(url)
@@ -0,0 +1,106 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from chat.models import Conversation, Membership
+from profiles.tests.test_http import create_user
+from profiles.tests.test_pagination import next_link
+from .test_http import ConversationTestCase
+
+
+class HttpInboxTest(ConversationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.direct, _ = Conversation.start(self.profile1, [self.profile2])
+        self.group, _ = Conversation.start(
+            self.profile3, [self.profile1, self.profile4])
+
+    def inbox_url(self, username='user1'):
+        return reverse('chat:inbox', kwargs={'username': username})
+
+    def read_url(self, conversation, username='user1'):
+        return reverse('chat:read', kwargs={
+            'username': username, 'conversation_id': conversation.id})
+
+    def test_inbox(self):
+        self.direct.send(self.profile2, 'hello')
+        self.direct.send(self.profile2, 'are you there?')
+        self.group.send(self.profile3, 'hi all')
+
+        response = self.get(self.inbox_url())
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        # latest activity first
+        self.assertEqual(
+            [(item['conversation'], item['unread_count'],
+              item['last_message']['text']) for item in response.data],
+            [(str(self.group.id), 1, 'hi all'),
+             (str(self.direct.id), 2, 'are you there?')])
+
+    def test_inbox_without_messages(self):
+        response = self.get(self.inbox_url())
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual([item['last_message'] for item in response.data],
+                         [None, None])
+
+    def test_sending_resets_own_unread_count(self):
+        self.direct.send(self.profile2, 'hello')
+        self.direct.send(self.profile1, 'hi')
+
+        membership1 = Membership.objects.get(
+            conversation=self.direct, profile=self.profile1)
+        membership2 = Membership.objects.get(
+            conversation=self.direct, profile=self.profile2)
+        self.assertEqual(membership1.unread_count, 0)
+        self.assertEqual(membership2.unread_count, 1)
+        self.assertEqual(membership2.last_message.text, 'hi')
+
+    def test_read(self):
+        self.direct.send(self.profile2, 'hello')
+
+        response = self.post(self.read_url(self.direct), {})
+        self.assertEqual(status.HTTP_204_NO_CONTENT, response.status_code)
+
+        response = self.get(self.inbox_url())
+        self.assertEqual([item['unread_count'] for item in response.data],
+                         [0, 0])
+
+    def test_read_not_a_participant(self):
+        conversation, _ = Conversation.start(self.profile2, [self.profile3])
+        response = self.post(self.read_url(conversation), {})
+
+        self.assertEqual(status.HTTP_404_NOT_FOUND, response.status_code)
+
+    def test_inbox_pages(self):
+        self.direct.send(self.profile2, 'hello')
+
+        response = self.get(self.inbox_url(), page_size=1)
+        self.assertEqual(response.data[0]['conversation'],
+                         str(self.direct.id))
+
+        response = self.get(next_link(response))
+        self.assertEqual(response.data[0]['conversation'], str(self.group.id))
+        self.assertIsNone(next_link(response))
+
+    def test_inbox_query_count(self):
+        url = self.inbox_url()
+        self.direct.send(self.profile2, 'hello')
+
+        with CaptureQueriesContext(connection) as few:
+            self.get(url)
+
+        for i in range(5):
+            friend = create_user(f'friend{i}').profile
+            self.profile1.add_friend(friend)
+            conversation, _ = Conversation.start(self.profile1, [friend])
+            conversation.send(friend, 'hello')
+
+        with CaptureQueriesContext(connection) as many:
+            response = self.get(url)
+
+        self.assertEqual(len(response.data), 7)
+        self.assertEqual(len(few.captured_queries),
+                         len(many.captured_queries))
@@ -0,0 +1,51 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+
+from chat.models import Conversation
+from chat.pagination import HistoryPagination
+from profiles.pagination import encode_cursor
+from profiles.tests.test_http import create_user
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Query plans are SQLite specific')
+class IndexUsageTest(TestCase):
+
+    def setUp(self):
+        self.profile1 = create_user('user1', 'bob', 'smith').profile
+        self.profile2 = create_user('user2', 'jim', 'walsh').profile
+        self.profile1.add_friend(self.profile2)
+        self.conversation, _ = Conversation.start(
+            self.profile1, [self.profile2])
+        self.message = self.conversation.send(self.profile1, 'hello')
+
+    def assertUsesIndex(self, queryset, table, index):
+        plan = queryset.explain()
+        self.assertNotIn(f'SCAN {table}', plan)
+        self.assertIn(index, plan)
+        # rows come in index order, without sorting the conversation
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_latest_messages(self):
+        self.assertUsesIndex(
+            self.conversation.messages.order_by('-created', '-id'),
+            'chat_message', 'message_history_idx')
+
+    def test_messages_before(self):
+        self.assertUsesIndex(
+            HistoryPagination().filter_cursor(
+                self.conversation.messages,
+                encode_cursor(self.message.created, self.message.id),
+                'lt').order_by('-created', '-id'),
+            'chat_message', 'message_history_idx')
+
+    def test_memberships(self):
+        self.assertUsesIndex(
+            self.profile1.memberships.order_by('created', 'id'),
+            'chat_membership', 'membership_profile_idx')
+
+    def test_inbox(self):
+        self.assertUsesIndex(
+            self.profile1.memberships.order_by('-activity', '-id'),
+            'chat_membership', 'membership_inbox_idx')
@@ -0,0 +1,108 @@
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from chat.models import Conversation, Membership
+from .test_http import ConversationTestCase
+
+
+class HttpReadTest(ConversationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.group, _ = Conversation.start(
+            self.profile1, [self.profile2, self.profile3])
+        self.messages = [self.group.send(self.profile1, f'message {i}')
+                         for i in range(3)]
+
+    def read_url(self, conversation, username='user1'):
+        return reverse('chat:read', kwargs={
+            'username': username, 'conversation_id': conversation.id})
+
+    def membership(self, profile, conversation=None):
+        return Membership.objects.get(
+            conversation=conversation or self.group, profile=profile)
+
+    def read_by(self):
+        response = self.get(self.messages_url(self.group))
+        return [message['read_by'] for message in response.data]
+
+    def test_sender_has_read(self):
+        membership = self.membership(self.profile1)
+        self.assertEqual(membership.last_read_id, self.messages[2].id)
+        self.assertEqual(membership.unread_count, 0)
+        self.assertEqual(self.membership(self.profile2).unread_count, 3)
+
+    def test_read_until(self):
+        membership2 = self.membership(self.profile2)
+        membership2.read_until(self.messages[0])
+
+        membership2 = self.membership(self.profile2)
+        self.assertEqual(membership2.last_read_id, self.messages[0].id)
+        self.assertEqual(membership2.unread_count, 2)
+        self.assertEqual(self.read_by(), [['user2'], [], []])
+
+        self.membership(self.profile3).read_until(self.messages[1])
+        self.assertEqual(self.read_by(),
+                         [['user2', 'user3'], ['user3'], []])
+
+    def test_watermark_only_moves_forward(self):
+        membership2 = self.membership(self.profile2)
+        membership2.read_until(self.messages[2])
+        membership2.read_until(self.messages[0])
+
+        membership2 = self.membership(self.profile2)
+        self.assertEqual(membership2.last_read_id, self.messages[2].id)
+        self.assertEqual(membership2.unread_count, 0)
+
+    def test_read_message(self):
+        # user1 reads up to a message sent by user2
+        message = self.group.send(self.profile2, 'hello')
+        self.group.send(self.profile2, 'again')
+
+        response = self.post(self.read_url(self.group),
+                             {'message': str(message.id)})
+
+        self.assertEqual(status.HTTP_204_NO_CONTENT, response.status_code)
+        membership1 = self.membership(self.profile1)
+        self.assertEqual(membership1.last_read_id, message.id)
+        self.assertEqual(membership1.unread_count, 1)
+
+    def test_read_unknown_message(self):
+        other, _ = Conversation.start(self.profile1, [self.profile2])
+        message = other.send(self.profile2, 'hello')
+
+        response = self.post(self.read_url(self.group),
+                             {'message': str(message.id)})
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertEqual(response.data['detail'].code, 'no_message')
+
+    def test_bulk_read(self):
+        direct, _ = Conversation.start(self.profile1, [self.profile2])
+        direct.send(self.profile2, 'hello')
+        last = self.group.send(self.profile2, 'hello')
+        excluded, _ = Conversation.start(self.profile1, [self.profile3])
+        excluded.send(self.profile3, 'hello')
+        unrelated, _ = Conversation.start(self.profile2, [self.profile3])
+
+        response = self.post(
+            reverse('chat:read-bulk', kwargs={'username': 'user1'}),
+            {'conversations': [str(direct.id), str(self.group.id),
+                               str(unrelated.id)]})
+
+        self.assertEqual(status.HTTP_204_NO_CONTENT, response.status_code)
+        self.assertEqual(self.membership(self.profile1, direct).unread_count,
+                         0)
+        self.assertEqual(self.membership(self.profile1).unread_count, 0)
+        self.assertEqual(self.membership(self.profile1).last_read_id, last.id)
+        self.assertEqual(
+            self.membership(self.profile1, excluded).unread_count, 1)
+        self.assertEqual(
+            self.membership(self.profile2, unrelated).last_read_id, None)
+
+    def test_bulk_read_invalid(self):
+        response = self.post(
+            reverse('chat:read-bulk', kwargs={'username': 'user1'}),
+            {'conversations': ['not an id']})
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
@@ -0,0 +1,22 @@
+from django.urls import path
+from .views import (
+    ConversationsView,
+    InboxView,
+    ReadView,
+    BulkReadView,
+    MessagesView,
+)
+
+
+app_name = 'chat'
+urlpatterns = [
+    path('<str:username>/conversations/', ConversationsView.as_view(),
+         name='conversations'),
+    path('<str:username>/inbox/', InboxView.as_view(), name='inbox'),
+    path('<str:username>/conversations/read/', BulkReadView.as_view(),
+         name='read-bulk'),
+    path('<str:username>/conversations/<uuid:conversation_id>/read/',
+         ReadView.as_view(), name='read'),
+    path('<str:username>/conversations/<uuid:conversation_id>/messages/',
+         MessagesView.as_view(), name='messages'),
+]
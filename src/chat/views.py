@@ -0,0 +1,157 @@
+from django.db.models import Prefetch, prefetch_related_objects
+
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from rest_framework import status
+
+from profiles.models import Profile
+from profiles.pagination import KeysetPagination
+from profiles.shortcuts import check_my_profile
+
+from .exceptions import MessageDoesNotExist
+from .models import Conversation, Membership
+from .pagination import HistoryPagination
+from .serializers import (
+    ConversationSerializer,
+    InboxSerializer,
+    MessageSerializer,
+    HistorySerializer,
+    ReadSerializer,
+    BulkReadSerializer,
+)
+from .shortcuts import (
+    get_conversation_or_404,
+    get_membership_or_404,
+    get_participants,
+    check_can_send,
+)
+
+
+# Listing and starting conversations
+
+class ConversationsView(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request, username=None, format=None):
+        my_profile = check_my_profile(self.request.user.profile, username)
+
+        # in the order the profile joined them
+        paginator = KeysetPagination()
+        memberships = paginator.paginate_queryset(
+            my_profile.memberships.select_related('conversation'),
+            request, self)
+
+        conversations = [membership.conversation
+                         for membership in memberships]
+        prefetch_related_objects(conversations, Prefetch(
+            'participants', queryset=Profile.objects.select_related('user')))
+
+        serializer = ConversationSerializer(conversations, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    def post(self, request, username=None, format=None):
+        my_profile = check_my_profile(self.request.user.profile, username)
+        participants = get_participants(
+            my_profile, request.data.get('usernames', None))
+
+        conversation, created = Conversation.start(my_profile, participants)
+
+        serializer = ConversationSerializer(conversation)
+        return Response(serializer.data, status=status.HTTP_201_CREATED
+                        if created else status.HTTP_200_OK)
+
+
+class InboxView(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request, username=None, format=None):
+        my_profile = check_my_profile(self.request.user.profile, username)
+
+        # Latest activity first. The last messages and unread counts are
+        # stored on the memberships, so a page is a single query.
+        paginator = KeysetPagination('activity', 'id', descending=True)
+        page = paginator.paginate_queryset(
+            my_profile.memberships.select_related(
+                'last_message__sender__user'),
+            request, self)
+
+        serializer = InboxSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+
+class ReadView(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request, username=None, conversation_id=None, format=None):
+        my_profile = check_my_profile(self.request.user.profile, username)
+        membership = get_membership_or_404(my_profile, conversation_id)
+
+        serializer = ReadSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors,
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        message_id = serializer.validated_data.get('message', None)
+        if message_id is None:
+            Membership.read_all(
+                Membership.objects.filter(id=membership.id))
+        else:
+            message = membership.conversation.messages.filter(
+                id=message_id).first()
+            if message is None:
+                raise MessageDoesNotExist
+            membership.read_until(message)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class BulkReadView(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request, username=None, format=None):
+        my_profile = check_my_profile(self.request.user.profile, username)
+
+        serializer = BulkReadSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors,
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        # conversations the profile is not part of are ignored
+        Membership.read_all(my_profile.memberships.filter(
+            conversation__in=serializer.validated_data['conversations']))
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+# Reading and sending messages
+
+class MessagesView(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request, username=None, conversation_id=None, format=None):
+        my_profile = check_my_profile(self.request.user.profile, username)
+        conversation = get_conversation_or_404(my_profile, conversation_id)
+
+        paginator = HistoryPagination()
+        page = paginator.paginate_queryset(
+            conversation.messages.select_related('sender__user'),
+            request, self)
+
+        # the other participants' read watermarks
+        memberships = conversation.memberships.exclude(profile=my_profile) \
+            .select_related('profile__user')
+        serializer = HistorySerializer(
+            page, many=True, context={'memberships': memberships})
+        return paginator.get_paginated_response(serializer.data)
+
+    def post(self, request, username=None, conversation_id=None, format=None):
+        my_profile = check_my_profile(self.request.user.profile, username)
+        conversation = get_conversation_or_404(my_profile, conversation_id)
+        check_can_send(my_profile, conversation)
+
+        serializer = MessageSerializer(data=request.data)
+        if serializer.is_valid():
+            message = conversation.send(
+                my_profile, serializer.validated_data['text'])
+            return Response(MessageSerializer(message).data,
+                            status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
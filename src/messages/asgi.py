@@ -13,4 +13,15 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'messages.settings')
 
-application = get_asgi_application()
+# Django is set up before importing the websocket routes, which use models
+django_asgi_application = get_asgi_application()
+
+from channels.routing import ProtocolTypeRouter, URLRouter  # noqa: E402
+
+from accounts.middleware import JWTAuthMiddleware  # noqa: E402
+from profiles.routing import websocket_urlpatterns  # noqa: E402
+
+application = ProtocolTypeRouter({
+    'http': django_asgi_application,
+    'websocket': JWTAuthMiddleware(URLRouter(websocket_urlpatterns)),
+})
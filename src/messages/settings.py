@@ -41,10 +41,12 @@ INSTALLED_APPS = [
 
     # Third-Pary Apps
     'rest_framework',
+    'channels',
 
     # Local Apps
     'accounts',
     'profiles.apps.ProfileConfig',
+    'chat.apps.ChatConfig',
 ]
 
 MIDDLEWARE = [
@@ -55,6 +57,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'profiles.middleware.ProfileMemoMiddleware',
 ]
 
 ROOT_URLCONF = 'messages.urls'
@@ -77,6 +80,17 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'messages.wsgi.application'
 
+ASGI_APPLICATION = 'messages.asgi.application'
+
+# Channel layer carrying the events pushed to websockets. The in-memory
+# layer only reaches websockets connected to the same process, deployments
+# with several processes should use channels_redis.RedisChannelLayer.
+CHANNEL_LAYERS = {
+    'default': {
+        'BACKEND': 'channels.layers.InMemoryChannelLayer',
+    },
+}
+
 
 # Database
 # https://docs.djangoproject.com/en/3.0/ref/settings/#databases
@@ -89,6 +103,23 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.0/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Cache of the profiles' social graphs, see profiles.cache.GraphCache. It
+# must be shared between processes, such as Redis or Memcached, for the
+# graphs of every process to follow relationship writes right away.
+PROFILE_GRAPH_CACHE = 'default'
+
+PROFILE_GRAPH_CACHE_TIMEOUT = 300
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
 
@@ -132,15 +163,29 @@ AUTH_USER_MODEL = 'accounts.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.ClaimsJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     )
 }
 
+# Default and maximum page sizes of the paginated list endpoints
+PAGE_SIZE = 50
+
+MAX_PAGE_SIZE = 200
+
+# Maximum number of usernames accepted by the bulk endpoints
+BULK_MAX_USERNAMES = 5000
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': datetime.timedelta(minutes=5),
     'REFRESH_TOKEN_LIFETIME': datetime.timedelta(days=1),
     'USER_ID_CLAIM': 'id',
 }
 
+# Seconds for which a user authenticated from token claims is trusted to
+# still be active before the user row is checked again, 0 disables checks
+CLAIMS_AUTH_REVOCATION_TTL = 30
+
+CLAIMS_AUTH_REVOCATION_CACHE_SIZE = 10000
+
 
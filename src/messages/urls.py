@@ -18,6 +18,7 @@ from django.urls import path, include
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('', include('chat.urls')),
     path('', include('profiles.urls')),
     path('accounts/', include('accounts.urls')),
 ]
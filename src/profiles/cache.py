@@ -0,0 +1,105 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Q
+
+CACHE_KEY = 'profiles:graph:{}'
+
+
+class ProfileGraph:
+    """IDs of the profiles a profile is friends with, is blocking, and is
+    blocked by."""
+
+    __slots__ = ('friends', 'blocking', 'blocked_by')
+
+    def __init__(self, friends=frozenset(), blocking=frozenset(),
+                 blocked_by=frozenset()):
+        self.friends = friends
+        self.blocking = blocking
+        self.blocked_by = blocked_by
+
+
+class GraphCache:
+    """Per-profile social graph stored in Django's cache framework.
+
+    Entries hold the graph_version of the profile they were loaded at, and
+    are only served to profile instances loaded at the same version, which
+    the Profile methods writing relationships bump. A hit therefore costs
+    no query, and a profile loaded after a write commits never gets the
+    graph from before it, whichever process cached it.
+    The writes and the Relationship signals also drop the entries. Other
+    processes only see that with a cache shared between them, such as
+    Redis or Memcached; a per-process cache like LocMemCache keeps serving
+    their entries to instances loaded before the write.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, 'PROFILE_GRAPH_CACHE', 'default')]
+
+    @property
+    def timeout(self):
+        return getattr(settings, 'PROFILE_GRAPH_CACHE_TIMEOUT', 300)
+
+    def get(self, profile_id, version):
+        # The version is the one loaded with the profile, before the graph,
+        # so a graph loaded before a write commits is stored under the
+        # version the write replaces, and never served after it
+        key = CACHE_KEY.format(profile_id)
+        entry = self.cache.get(key)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            return ProfileGraph(*entry[1:])
+
+        self.misses += 1
+        graph = self.load(profile_id)
+        self.cache.set(key, (version, graph.friends, graph.blocking,
+                             graph.blocked_by),
+                       self.timeout)
+        return graph
+
+    def load(self, profile_id):
+        from .models import Relationship
+
+        friends = set()
+        blocking = set()
+        blocked_by = set()
+        rows = Relationship.objects.filter(
+            Q(from_profile=profile_id) | Q(to_profile=profile_id)
+        ).values_list('from_profile', 'to_profile', 'status')
+        for from_profile, to_profile, status in rows:
+            # friendships are stored once, on either side
+            if status == 1:
+                friends.add(to_profile if from_profile == profile_id
+                            else from_profile)
+            elif from_profile == profile_id:
+                blocking.add(to_profile)
+            else:
+                blocked_by.add(from_profile)
+        return ProfileGraph(frozenset(friends), frozenset(blocking),
+                            frozenset(blocked_by))
+
+    def invalidate(self, *profile_ids):
+        self.cache.delete_many(
+            [CACHE_KEY.format(profile_id) for profile_id in profile_ids])
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+
+graph_cache = GraphCache()
+
+
+def invalidate_graphs(*profile_ids):
+    # Drop the entries now and again on commit, so a concurrent request
+    # cannot re-cache the graph as it was before this transaction.
+    graph_cache.invalidate(*profile_ids)
+    transaction.on_commit(lambda: graph_cache.invalidate(*profile_ids))
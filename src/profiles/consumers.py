@@ -0,0 +1,31 @@
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncWebsocketConsumer
+
+from .events import profile_group
+
+
+class EventsConsumer(AsyncWebsocketConsumer):
+    """Pushes the events published for the authenticated profile, see
+    profiles.events. Connections without valid credentials are rejected."""
+
+    group_name = None
+
+    async def connect(self):
+        user = self.scope.get('user', None)
+        if user is None or not user.is_authenticated:
+            await self.close()
+            return
+
+        profile_id = await database_sync_to_async(
+            lambda: user.profile.id)()
+        self.group_name = profile_group(profile_id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, code):
+        if self.group_name is not None:
+            await self.channel_layer.group_discard(
+                self.group_name, self.channel_name)
+
+    async def profile_event(self, message):
+        await self.send(text_data=message['text'])
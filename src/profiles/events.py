@@ -0,0 +1,57 @@
+import json
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+from rest_framework.utils.encoders import JSONEncoder
+
+# Events pushed to the websockets of profiles, see profiles.consumers
+
+
+def profile_group(profile_id):
+    return f'profile.{profile_id}'
+
+
+def publish(profile_ids, event):
+    """Sends an event to every websocket of the given profiles once the
+    current transaction commits, so rolled back writes are never pushed.
+    The event is encoded once, whatever the number of recipients."""
+    text = json.dumps(event, cls=JSONEncoder)
+    profile_ids = set(profile_ids)
+
+    def send():
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            return
+        for profile_id in profile_ids:
+            async_to_sync(channel_layer.group_send)(
+                profile_group(profile_id),
+                {'type': 'profile.event', 'text': text})
+
+    transaction.on_commit(send)
+
+
+def publish_request(request):
+    # both sides of a friend request follow its status
+    from .serializers import RequestSerializer
+
+    publish((request.from_profile_id, request.to_profile_id), {
+        'type': 'friend_request',
+        'request': RequestSerializer(request).data,
+    })
+
+
+def publish_relationship(relationship, action):
+    # Blocks are only sent to the blocking profile, so blocked profiles are
+    # never told about them. Friendships are stored once per pair, and each
+    # side is sent the other's username.
+    sides = [(relationship.from_profile_id, relationship.to_profile)]
+    if relationship.status == 1:
+        sides.append((relationship.to_profile_id, relationship.from_profile))
+    for profile_id, other in sides:
+        publish((profile_id,), {
+            'type': 'relationship',
+            'action': action,
+            'username': other.get_username(),
+            'status': relationship.get_status_display().lower(),
+        })
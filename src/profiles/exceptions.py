@@ -8,6 +8,18 @@ class UsernameNotProvided(APIException):
     default_code = 'incomplete_request'
 
 
+class UsernamesNotProvided(APIException):
+    status_code = 400
+    default_detail = 'Must provide a non-empty list of usernames.'
+    default_code = 'incomplete_request'
+
+
+class TooManyUsernames(APIException):
+    status_code = 400
+    default_detail = 'Too many usernames were provided in a single request.'
+    default_code = 'too_many_usernames'
+
+
 class UsersNotFriends(APIException):
     status_code = 400
     default_detail = 'The user you are trying to unfriend is not on your ' \
@@ -22,6 +34,12 @@ class UsersAlreadyFriends(APIException):
     default_code = 'already_friends'
 
 
+class OwnProfile(APIException):
+    status_code = 400
+    default_detail = 'You cannot send a friend request to yourself.'
+    default_code = 'own_profile'
+
+
 class AlreadyPendingRequest(APIException):
     status_code = 400
     default_detail = 'There is already a pending friend request between you ' \
@@ -64,3 +82,9 @@ class InvalidURL(APIException):
     status_code = 400
     default_detail = 'The URL submitted in your request is invalid.'
     default_code = 'invalid_url'
+
+
+class InvalidCursor(APIException):
+    status_code = 400
+    default_detail = 'The pagination cursor in your request is invalid.'
+    default_code = 'invalid_cursor'
@@ -0,0 +1,132 @@
+"""Compressed sparse row (CSR) adjacency structures for the social graph,
+the friend-of-friend computation used by the suggest_friends command, and
+the random graphs generated by the seed_graph command.
+
+This module only depends on NumPy, so it can be imported by worker
+processes without setting up Django.
+"""
+import numpy as np
+
+
+class CSRGraph:
+    """Undirected graph over nodes 0..n-1, where the neighbors of node u
+    are indices[indptr[u]:indptr[u + 1]], sorted and without duplicates."""
+
+    def __init__(self, indptr, indices):
+        self.indptr = indptr
+        self.indices = indices
+
+    @property
+    def node_count(self):
+        return len(self.indptr) - 1
+
+    @classmethod
+    def from_edges(cls, node_count, sources, targets):
+        # both directions of every edge, without duplicates
+        sources, targets = (np.concatenate((sources, targets)),
+                            np.concatenate((targets, sources)))
+        keys = np.unique(sources.astype(np.int64) * node_count + targets)
+        sources, indices = np.divmod(keys, node_count)
+
+        indptr = np.zeros(node_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=node_count),
+                  out=indptr[1:])
+        return cls(indptr, indices.astype(np.int32))
+
+    def neighbors(self, node):
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    def gather(self, nodes):
+        # the neighbor lists of several nodes concatenated, without a Python
+        # loop over the nodes
+        starts = self.indptr[nodes]
+        lengths = self.indptr[nodes + 1] - starts
+        total = lengths.sum()
+        if total == 0:
+            return self.indices[:0]
+        offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        return self.indices[offsets + np.arange(total)]
+
+
+def friends_of_friends(friends, excluded, node, top):
+    """Returns the nodes with the most friends in common with node, and
+    their number of common friends, best first. Friends, node itself, and
+    its neighbors in the excluded graph are left out."""
+    neighbors = friends.neighbors(node)
+    candidates, counts = np.unique(friends.gather(neighbors),
+                                   return_counts=True)
+
+    keep = ~np.isin(candidates, neighbors, assume_unique=True) \
+        & ~np.isin(candidates, excluded.neighbors(node), assume_unique=True) \
+        & (candidates != node)
+    candidates, counts = candidates[keep], counts[keep]
+
+    # most common friends first, ties broken on the node for stable output,
+    # as candidates come sorted from np.unique
+    order = np.argsort(-counts, kind='stable')[:top]
+    return candidates[order], counts[order]
+
+
+_worker_graphs = None
+
+
+def init_worker(friends, excluded):
+    global _worker_graphs
+    _worker_graphs = (friends, excluded)
+
+
+def suggest_chunk(nodes, top):
+    """Suggestions for a chunk of nodes, using the graphs given to
+    init_worker. Returns (node, candidates, counts) tuples."""
+    friends, excluded = _worker_graphs
+    results = []
+    for node in nodes:
+        candidates, counts = friends_of_friends(friends, excluded, node, top)
+        if len(candidates):
+            results.append((node, candidates, counts))
+    return results
+
+
+def power_law_weights(rng, node_count, exponent):
+    """Zipf-like sampling probabilities, given to the nodes in a random
+    order so that popular nodes are spread over the ids."""
+    weights = np.arange(1, node_count + 1, dtype=np.float64) ** -exponent
+    weights = weights[rng.permutation(node_count)]
+    return weights / weights.sum()
+
+
+def pair_keys(sources, targets, node_count, directed=False):
+    if not directed:
+        sources, targets = (np.minimum(sources, targets),
+                            np.maximum(sources, targets))
+    return sources.astype(np.int64) * node_count + targets
+
+
+def sample_pairs(rng, node_count, count, weights=None, directed=False,
+                 exclude=(), max_rounds=50):
+    """Samples count distinct pairs of distinct nodes, with each end drawn
+    with the given probabilities, or uniformly. Pairs whose unordered key
+    is in one of the exclude arrays are skipped. Returns the pair keys,
+    see pair_keys, in the order they were drawn."""
+    keys = np.empty(0, dtype=np.int64)
+    for __ in range(max_rounds):
+        missing = count - len(keys)
+        if missing <= 0:
+            break
+        # oversample, as some pairs are dropped below
+        size = int(missing * 1.2) + 16
+        sources = rng.choice(node_count, size, p=weights)
+        targets = rng.choice(node_count, size, p=weights)
+        drawn = pair_keys(sources, targets, node_count, directed)
+        keep = sources != targets
+        unordered = pair_keys(sources, targets, node_count)
+        for excluded in exclude:
+            keep &= ~np.isin(unordered, excluded)
+        keys = np.concatenate((keys, drawn[keep]))
+
+        # first occurrence of each pair, in drawing order
+        __, first = np.unique(keys, return_index=True)
+        keys = keys[np.sort(first)]
+    if len(keys) < count:
+        raise ValueError(f'Could not sample {count} distinct pairs.')
+    return keys[:count]
@@ -0,0 +1,78 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from profiles.models import ArchivedFriendRequest, FriendRequest
+
+
+class Command(BaseCommand):
+    help = 'Moves resolved friend requests older than a threshold to the ' \
+           'archive table, or deletes them, oldest first.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than', type=int, default=30,
+            help='Age in days of the oldest requests kept.')
+        parser.add_argument(
+            '--delete', action='store_true',
+            help='Delete the requests instead of archiving them.')
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Number of requests moved in each transaction.')
+        parser.add_argument(
+            '--throttle', type=float, default=0,
+            help='Seconds to wait between chunks, to leave the database '
+                 'to other clients.')
+        parser.add_argument(
+            '--max-chunks', type=int, default=None,
+            help='Number of chunks after which to stop, all by default.')
+
+    def handle(self, *args, older_than, delete, chunk_size, throttle,
+               max_chunks, **options):
+        if older_than < 0 or chunk_size < 1 or throttle < 0 \
+                or (max_chunks is not None and max_chunks < 1):
+            raise CommandError('--chunk-size and --max-chunks must be '
+                               'positive, and the others not negative.')
+
+        # Every chunk is committed along with the removal of its requests,
+        # so an interrupted run resumes from the oldest request left
+        resolved = FriendRequest.objects.filter(
+            created__lt=timezone.now() - timedelta(days=older_than)
+        ).exclude(status=3).order_by('created', 'id')
+
+        chunks = compacted = 0
+        while max_chunks is None or chunks < max_chunks:
+            if chunks and throttle:
+                time.sleep(throttle)
+            with transaction.atomic():
+                count = self.compact(resolved[:chunk_size], delete)
+            if not count:
+                break
+            chunks += 1
+            compacted += count
+            if options['verbosity'] > 1:
+                self.stdout.write(f'Chunk {chunks}: {count} requests.')
+
+        self.stdout.write(
+            f'{"Deleted" if delete else "Archived"} {compacted} resolved '
+            f'requests older than {older_than} days in {chunks} chunks.')
+
+    def compact(self, requests, delete):
+        rows = list(requests.values_list(
+            'id', 'created', 'from_profile', 'to_profile', 'status'))
+        if not rows:
+            return 0
+        if not delete:
+            ArchivedFriendRequest.objects.bulk_create(
+                ArchivedFriendRequest(id=id, created=created,
+                                      from_profile_id=from_profile,
+                                      to_profile_id=to_profile,
+                                      status=status)
+                for id, created, from_profile, to_profile, status in rows)
+        # no signal is connected to deleted requests, so this is a single
+        # DELETE
+        FriendRequest.objects.filter(id__in=[row[0] for row in rows]).delete()
+        return len(rows)
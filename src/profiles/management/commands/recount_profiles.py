@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F, Q
+
+from profiles.models import Profile
+
+
+class Command(BaseCommand):
+    help = 'Sets the friend, blocking and pending request counters of ' \
+           'every profile to the counts of its relationships and requests, ' \
+           'in chunks of profiles.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Number of profiles recounted in each transaction.')
+
+    def handle(self, *args, chunk_size, **options):
+        if chunk_size < 1:
+            raise CommandError('--chunk-size must be positive.')
+
+        counted = Profile.get_counted()
+        # profiles with a counter off from the count
+        drifted = Q()
+        for name in Profile.COUNTERS:
+            drifted |= ~Q(**{name: F(f'counted_{name}')})
+
+        last_id = 0
+        recounted = total = 0
+        while True:
+            ids = list(Profile.objects.filter(id__gt=last_id).order_by('id')
+                       .values_list('id', flat=True)[:chunk_size])
+            if not ids:
+                break
+            last_id = ids[-1]
+            total += len(ids)
+            with transaction.atomic():
+                # the update counts again, rather than writing the counts
+                # read, so it holds the writes made in between
+                drifted_ids = list(Profile.objects.filter(id__in=ids).annotate(
+                    **{f'counted_{name}': expression
+                       for name, expression in counted.items()}
+                ).filter(drifted).values_list('id', flat=True))
+                if drifted_ids:
+                    Profile.objects.filter(id__in=drifted_ids).update(
+                        **counted)
+            recounted += len(drifted_ids)
+
+        self.stdout.write(f'Recounted {recounted} of {total} profiles.')
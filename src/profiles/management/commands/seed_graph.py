@@ -0,0 +1,223 @@
+import time
+import uuid
+import zlib
+from itertools import islice
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from profiles.cache import invalidate_graphs
+from profiles.graph import pair_keys, power_law_weights, sample_pairs
+from profiles.models import Profile, Relationship, FriendRequest
+
+
+class Command(BaseCommand):
+    help = 'Fills the database with a random social graph, for load and ' \
+           'performance testing. The same seed gives the same graph.'
+
+    batch_size = 5000
+
+    # relationships and requests are created over this many days up to now
+    history_days = 365
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users', type=int, default=1000,
+            help='Number of users, each with a profile.')
+        parser.add_argument(
+            '--friendships', type=int, default=None,
+            help='Number of pairs of friends, 10 per user by default.')
+        parser.add_argument(
+            '--blocks', type=int, default=None,
+            help='Number of blocks, 1 per 10 users by default.')
+        parser.add_argument(
+            '--requests', type=int, default=None,
+            help='Number of pending friend requests, 1 per user by default.')
+        parser.add_argument(
+            '--exponent', type=float, default=1.0,
+            help='Exponent of the power law of the number of friends.')
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Seed of the random generator.')
+        parser.add_argument(
+            '--prefix', default='seed',
+            help='Prefix of the generated usernames.')
+        parser.add_argument(
+            '--password', default=None,
+            help='Password of every generated user, unusable by default.')
+
+    def handle(self, *args, users, friendships, blocks, requests, exponent,
+               seed, prefix, password, **options):
+        if friendships is None:
+            friendships = users * 10
+        if blocks is None:
+            blocks = users // 10
+        if requests is None:
+            requests = users
+        if users < 2 or min(friendships, blocks, requests) < 0:
+            raise CommandError('At least 2 users are needed, and counts '
+                               'cannot be negative.')
+
+        User = get_user_model()
+        if User.objects.filter(username__startswith=prefix).exists():
+            raise CommandError(f'Users named {prefix}... already exist, '
+                               f'choose another --prefix.')
+
+        start = time.perf_counter()
+        rng = np.random.default_rng(seed)
+        # Row ids come from a generator of their own, seeded with the prefix
+        # as well, so graphs of the same seed under other prefixes can share
+        # a database
+        id_rng = np.random.default_rng([seed, zlib.crc32(prefix.encode())])
+        try:
+            friend_keys = sample_pairs(
+                rng, users, friendships,
+                power_law_weights(rng, users, exponent))
+            block_keys = sample_pairs(
+                rng, users, blocks, directed=True, exclude=(friend_keys,))
+            block_sources, block_targets = np.divmod(block_keys, users)
+            request_keys = sample_pairs(
+                rng, users, requests, exclude=(
+                    friend_keys,
+                    pair_keys(block_sources, block_targets, users)))
+        except ValueError as error:
+            raise CommandError(f'{error} Use fewer relationships or more '
+                               f'users.')
+
+        friend_sources, friend_targets = np.divmod(friend_keys, users)
+        # requests between a pair go one way, picked at random
+        sources, targets = np.divmod(request_keys, users)
+        swap = rng.random(len(request_keys)) < 0.5
+        request_sources, request_targets = (np.where(swap, targets, sources),
+                                            np.where(swap, sources, targets))
+        # the profiles are created with their counters set
+        counts = {
+            'friend_count':
+                np.bincount(friend_sources, minlength=users)
+                + np.bincount(friend_targets, minlength=users),
+            'blocking_count': np.bincount(block_sources, minlength=users),
+            'incoming_pending_count':
+                np.bincount(request_targets, minlength=users),
+            'outgoing_pending_count':
+                np.bincount(request_sources, minlength=users),
+        }
+
+        with transaction.atomic():
+            if connection.vendor == 'sqlite':
+                # the indexes of the relationships and requests tables
+                # hardly fit in the default page cache of 2MB
+                with connection.cursor() as cursor:
+                    cursor.execute('PRAGMA cache_size = -262144')
+            ids = self.create_profiles(User, users, prefix, password, counts)
+
+            # friendships are stored once, from the lower id
+            sources, targets = ids[friend_sources], ids[friend_targets]
+            self.create(Relationship, status=1,
+                        sources=np.minimum(sources, targets),
+                        targets=np.maximum(sources, targets),
+                        rng=rng, id_rng=id_rng)
+            self.create(Relationship, status=2,
+                        sources=ids[block_sources],
+                        targets=ids[block_targets],
+                        rng=rng, id_rng=id_rng)
+            self.create(FriendRequest, status=3,
+                        sources=ids[request_sources],
+                        targets=ids[request_targets],
+                        rng=rng, id_rng=id_rng)
+
+            # bulk_create skips the signals invalidating cached graphs
+            invalidate_graphs(*ids.tolist())
+
+        self.stdout.write(
+            f'Created {users} profiles, {friendships} friendships, '
+            f'{blocks} blocks and {requests} pending requests in '
+            f'{time.perf_counter() - start:.1f}s.')
+
+    def create_profiles(self, User, count, prefix, password, counts):
+        # bulk_create skips the create_profile signal, so profiles are
+        # created separately, and the user ids read back in order
+        password = make_password(password)
+        User.objects.bulk_create(
+            (User(username=f'{prefix}{i}', first_name=f'first{i}',
+                  last_name=f'last{i}', password=password)
+             for i in range(count)),
+            batch_size=self.batch_size)
+        user_ids = dict(User.objects.filter(username__startswith=prefix)
+                        .values_list('username', 'id'))
+        counts = {name: values.tolist() for name, values in counts.items()}
+        Profile.objects.bulk_create(
+            (Profile(user_id=user_ids[f'{prefix}{i}'],
+                     **{name: values[i] for name, values in counts.items()})
+             for i in range(count)),
+            batch_size=self.batch_size)
+        profile_ids = dict(Profile.objects.filter(
+            user__username__startswith=prefix).values_list('user_id', 'id'))
+        return np.array([profile_ids[user_ids[f'{prefix}{i}']]
+                         for i in range(count)], dtype=np.int64)
+
+    def create(self, model, status, sources, targets, rng, id_rng):
+        # Millions of rows are inserted with executemany rather than
+        # bulk_create, which spends most of its time building model
+        # instances and preparing their values one field at a time. Rows
+        # are sorted on the source profile so the indexes are filled in
+        # order.
+        if not len(sources):
+            return
+        order = np.lexsort((targets, sources))
+        names = ['id', 'created', 'from_profile', 'to_profile', 'status']
+        if model is FriendRequest:
+            names.append('pair')
+        fields = [model._meta.get_field(name) for name in names]
+        table = connection.ops.quote_name(model._meta.db_table)
+        columns = ', '.join(connection.ops.quote_name(field.column)
+                            for field in fields)
+        placeholders = ', '.join(['%s'] * len(fields))
+        sql = f'INSERT INTO {table} ({columns}) VALUES ({placeholders})'
+
+        rows = zip(self.random_uuids(id_rng, len(order)),
+                   self.random_times(rng, len(order)),
+                   sources[order].tolist(), targets[order].tolist())
+        with connection.cursor() as cursor:
+            while True:
+                batch = [(id, created, source, target, status)
+                         for id, created, source, target
+                         in islice(rows, self.batch_size)]
+                if model is FriendRequest:
+                    batch = [row + (FriendRequest.get_pair(*row[2:4]),)
+                             for row in batch]
+                if not batch:
+                    break
+                cursor.executemany(sql, batch)
+
+    def random_uuids(self, rng, count):
+        # in the database's own format, as get_db_prep_save is slow
+        native = connection.features.has_native_uuid_field
+        data = rng.bytes(16 * count)
+        for start in range(0, 16 * count, 16):
+            id = uuid.UUID(bytes=data[start:start + 16], version=4)
+            yield id if native else id.hex
+
+    def random_times(self, rng, count):
+        # Spread over the history, so (created, id) keyset pages differ on
+        # created. SQLite takes the UTC times as text, which NumPy formats
+        # much faster than get_db_prep_save.
+        if not count:
+            return []
+        now = timezone.now()
+        if timezone.is_aware(now):
+            now = timezone.make_naive(now, timezone.utc)
+        times = np.datetime64(now, 'us') - rng.integers(
+            0, self.history_days * 86400 * 10 ** 6, count
+        ).astype('timedelta64[us]')
+        if connection.vendor == 'sqlite':
+            return np.char.replace(np.datetime_as_string(times), 'T', ' ') \
+                .tolist()
+        times = times.tolist()
+        if settings.USE_TZ:
+            times = [value.replace(tzinfo=timezone.utc) for value in times]
+        return times
@@ -0,0 +1,117 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from itertools import islice, repeat
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from profiles.graph import CSRGraph, init_worker, suggest_chunk
+from profiles.models import (
+    Profile,
+    Relationship,
+    FriendRequest,
+    FriendSuggestion,
+)
+
+
+class Command(BaseCommand):
+    help = 'Precomputes friend-of-friend suggestions for every profile, ' \
+           'replacing the previous ones.'
+
+    batch_size = 5000
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top', type=int, default=20,
+            help='Number of suggestions kept per profile.')
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Number of profiles handed to a worker at a time.')
+        parser.add_argument(
+            '--processes', type=int, default=os.cpu_count(),
+            help='Number of worker processes, 1 to compute in-process.')
+
+    def handle(self, *args, top, chunk_size, processes, **options):
+        if min(top, chunk_size, processes) < 1:
+            raise CommandError(
+                '--top, --chunk-size and --processes must be positive.')
+
+        # Profiles are numbered by their position in the sorted ids, which
+        # maps database ids to graph nodes with a binary search. The reads
+        # share a transaction, a snapshot on SQLite.
+        with transaction.atomic():
+            ids = np.array(
+                Profile.objects.order_by('id').values_list('id', flat=True),
+                dtype=np.int64)
+            friends = self.load_graph(
+                ids, Relationship.objects.filter(status=1))
+            excluded = self.load_graph(
+                ids,
+                Relationship.objects.filter(status=2),
+                FriendRequest.objects.filter(status=3))
+
+        nodes = np.flatnonzero(np.diff(friends.indptr))
+        chunks = [nodes[start:start + chunk_size]
+                  for start in range(0, len(nodes), chunk_size)]
+
+        with ExitStack() as stack:
+            if processes > 1:
+                # Workers only run NumPy code and never use the database
+                pool = stack.enter_context(ProcessPoolExecutor(
+                    processes, initializer=init_worker,
+                    initargs=(friends, excluded)))
+                results = pool.map(suggest_chunk, chunks, repeat(top))
+            else:
+                init_worker(friends, excluded)
+                results = map(suggest_chunk, chunks, repeat(top))
+
+            profile_count, suggestion_count = self.write(ids, results)
+
+        self.stdout.write(
+            f'Wrote {suggestion_count} suggestions for {profile_count} '
+            f'profiles.')
+
+    def load_graph(self, ids, *querysets):
+        edges = np.concatenate([
+            np.array(list(queryset.values_list('from_profile', 'to_profile')),
+                     dtype=np.int64).reshape(-1, 2)
+            for queryset in querysets])
+        # Edges of profiles created after the ids were read, which other
+        # databases show within the transaction, are left out
+        nodes = np.searchsorted(ids, edges)
+        known = nodes < len(ids)
+        known[known] = ids[nodes[known]] == edges[known]
+        nodes = nodes[known.all(axis=1)]
+        return CSRGraph.from_edges(len(ids), nodes[:, 0], nodes[:, 1])
+
+    def write(self, ids, results):
+        # The suggestions are all computed before the transaction, which
+        # holds the write lock on SQLite only for the delete and inserts.
+        # They are kept as arrays until then, and written a batch at a time.
+        # The previous suggestions stay visible until the new ones are
+        # committed.
+        chunks = list(results)
+        suggestions = self.suggestions(ids, chunks)
+
+        suggestion_count = 0
+        with transaction.atomic():
+            FriendSuggestion.objects.all().delete()
+            while True:
+                batch = list(islice(suggestions, self.batch_size))
+                if not batch:
+                    break
+                FriendSuggestion.objects.bulk_create(batch)
+                suggestion_count += len(batch)
+        return sum(len(chunk) for chunk in chunks), suggestion_count
+
+    def suggestions(self, ids, chunks):
+        for chunk in chunks:
+            for node, candidates, counts in chunk:
+                profile_id = int(ids[node])
+                for suggested_id, count in zip(ids[candidates].tolist(),
+                                               counts.tolist()):
+                    yield FriendSuggestion(profile_id=profile_id,
+                                           suggested_profile_id=suggested_id,
+                                           mutual_friends=count)
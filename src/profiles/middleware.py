@@ -0,0 +1,15 @@
+from .shortcuts import profile_memo
+
+
+class ProfileMemoMiddleware:
+    """Memoizes profile lookups by username for the length of a request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = profile_memo.set({})
+        try:
+            return self.get_response(request)
+        finally:
+            profile_memo.reset(token)
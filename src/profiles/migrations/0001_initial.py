@@ -0,0 +1,54 @@
+# Generated by Django 3.1.8 on 2026-10-18 20:53
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Profile',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Relationship',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('status', models.IntegerField(choices=[(1, 'Friends'), (2, 'Blocked')])),
+                ('from_profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='from_profile', to='profiles.profile')),
+                ('to_profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='to_profile', to='profiles.profile')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='relationships',
+            field=models.ManyToManyField(related_name='related_to', through='profiles.Relationship', to='profiles.Profile'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='user',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='profile', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.CreateModel(
+            name='FriendRequest',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('status', models.IntegerField(choices=[(1, 'Accepted'), (2, 'Rejected'), (3, 'Pending'), (4, 'Canceled')])),
+                ('from_profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='outgoing_requests', to='profiles.profile')),
+                ('to_profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='incoming_requests', to='profiles.profile')),
+            ],
+        ),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations
+from django.db.models import Count
+
+
+def dedupe(apps, schema_editor):
+    # get_or_create let concurrent writes store a relationship or a pending
+    # request twice, which the constraints of the next migration reject.
+    # The first of each is kept, later pending requests are canceled.
+    Relationship = apps.get_model('profiles', 'Relationship')
+    FriendRequest = apps.get_model('profiles', 'FriendRequest')
+
+    for duplicate in Relationship.objects.values(
+            'from_profile', 'to_profile', 'status'
+    ).annotate(rows=Count('id')).filter(rows__gt=1).order_by():
+        del duplicate['rows']
+        ids = Relationship.objects.filter(**duplicate) \
+            .order_by('created', 'id').values_list('id', flat=True)
+        Relationship.objects.filter(id__in=list(ids[1:])).delete()
+
+    for duplicate in FriendRequest.objects.filter(status=3).values(
+            'from_profile', 'to_profile'
+    ).annotate(rows=Count('id')).filter(rows__gt=1).order_by():
+        del duplicate['rows']
+        ids = FriendRequest.objects.filter(status=3, **duplicate) \
+            .order_by('created', 'id').values_list('id', flat=True)
+        FriendRequest.objects.filter(id__in=list(ids[1:])).update(status=4)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 3.1.8 on 2026-10-18 20:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0002_dedupe_relationships_and_requests'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='friendrequest',
+            index=models.Index(condition=models.Q(status=3), fields=['to_profile', 'created'], name='request_incoming_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='friendrequest',
+            index=models.Index(condition=models.Q(status=3), fields=['from_profile', 'created'], name='request_outgoing_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='relationship',
+            index=models.Index(fields=['from_profile', 'status'], name='relationship_from_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='relationship',
+            index=models.Index(fields=['to_profile', 'status'], name='relationship_to_status_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='friendrequest',
+            constraint=models.UniqueConstraint(condition=models.Q(status=3), fields=('from_profile', 'to_profile'), name='unique_pending_request'),
+        ),
+        migrations.AddConstraint(
+            model_name='relationship',
+            constraint=models.UniqueConstraint(fields=('from_profile', 'to_profile', 'status'), name='unique_relationship'),
+        ),
+    ]
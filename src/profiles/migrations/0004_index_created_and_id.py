@@ -0,0 +1,45 @@
+# Generated by Django 3.1.8 on 2026-10-18 20:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0003_relationship_and_request_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='friendrequest',
+            name='request_incoming_pending_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='friendrequest',
+            name='request_outgoing_pending_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='relationship',
+            name='relationship_from_status_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='relationship',
+            name='relationship_to_status_idx',
+        ),
+        migrations.AddIndex(
+            model_name='friendrequest',
+            index=models.Index(condition=models.Q(status=3), fields=['to_profile', 'created', 'id'], name='request_incoming_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='friendrequest',
+            index=models.Index(condition=models.Q(status=3), fields=['from_profile', 'created', 'id'], name='request_outgoing_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='relationship',
+            index=models.Index(fields=['from_profile', 'status', 'created', 'id'], name='relationship_from_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='relationship',
+            index=models.Index(fields=['to_profile', 'status', 'created', 'id'], name='relationship_to_status_idx'),
+        ),
+    ]
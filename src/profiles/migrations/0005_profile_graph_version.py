@@ -0,0 +1,18 @@
+# Generated by Django 3.1.8 on 2026-10-18 20:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0004_index_created_and_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='graph_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 3.1.8 on 2026-10-18 20:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0005_profile_graph_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FriendSuggestion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mutual_friends', models.PositiveIntegerField()),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='suggestions', to='profiles.profile')),
+                ('suggested_profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='suggested_for', to='profiles.profile')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='friendsuggestion',
+            index=models.Index(fields=['profile', '-mutual_friends', 'suggested_profile'], name='suggestion_rank_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='friendsuggestion',
+            constraint=models.UniqueConstraint(fields=('profile', 'suggested_profile'), name='unique_friend_suggestion'),
+        ),
+    ]
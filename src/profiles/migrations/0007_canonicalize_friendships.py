@@ -0,0 +1,33 @@
+from django.db import migrations
+from django.db.models import Exists, F, OuterRef
+
+
+def canonicalize(apps, schema_editor):
+    # Friendships are stored once, from the profile with the lower id. The
+    # row from the higher id goes when both exist, the others are flipped,
+    # and the constraint of the next migration keeps them so.
+    Profile = apps.get_model('profiles', 'Profile')
+    Relationship = apps.get_model('profiles', 'Relationship')
+
+    reversed_friendships = Relationship.objects.filter(
+        status=1, from_profile__gt=F('to_profile'))
+    deleted, __ = reversed_friendships.filter(Exists(
+        Relationship.objects.filter(status=1,
+                                    from_profile=OuterRef('to_profile'),
+                                    to_profile=OuterRef('from_profile')))
+    ).delete()
+    flipped = reversed_friendships.update(from_profile=F('to_profile'),
+                                          to_profile=F('from_profile'))
+    if deleted or flipped:
+        Profile.objects.update(graph_version=F('graph_version') + 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0006_friendsuggestion'),
+    ]
+
+    operations = [
+        migrations.RunPython(canonicalize, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.1.8 on 2026-10-18 20:53
+
+from django.db import migrations, models
+import django.db.models.expressions
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0007_canonicalize_friendships'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='relationship',
+            constraint=models.CheckConstraint(check=models.Q(models.Q(_negated=True, status=1), ('from_profile__lt', django.db.models.expressions.F('to_profile')), _connector='OR'), name='canonical_friendship'),
+        ),
+    ]
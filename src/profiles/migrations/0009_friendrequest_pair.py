@@ -0,0 +1,17 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0008_relationship_canonical_friendship'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='friendrequest',
+            name='pair',
+            field=models.CharField(default='', editable=False, max_length=41),
+            preserve_default=False,
+        ),
+    ]
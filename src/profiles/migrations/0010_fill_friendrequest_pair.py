@@ -0,0 +1,43 @@
+from django.db import migrations
+from django.db.models import CharField, Count, F, Value
+from django.db.models.functions import Cast, Concat
+
+
+def fill_pair(apps, schema_editor):
+    Profile = apps.get_model('profiles', 'Profile')
+    FriendRequest = apps.get_model('profiles', 'FriendRequest')
+
+    # the pair is both profile ids, lower first
+    for low, high in (('from_profile', 'to_profile'),
+                      ('to_profile', 'from_profile')):
+        FriendRequest.objects.filter(**{f'{low}__lt': F(high)}).update(
+            pair=Concat(Cast(low, CharField()), Value(':'),
+                        Cast(high, CharField())))
+
+    # A pair may have a pending request each way, which the constraint of
+    # the next migration rejects. The first one is kept, as a request sent
+    # now is refused while the other is pending. The request lists of
+    # both profiles change, and so do their ETags.
+    profile_ids = set()
+    for duplicate in FriendRequest.objects.filter(status=3).values(
+            'pair').annotate(rows=Count('id')).filter(rows__gt=1).order_by():
+        ids = FriendRequest.objects.filter(status=3, pair=duplicate['pair']) \
+            .order_by('created', 'id').values_list('id', flat=True)
+        canceled = FriendRequest.objects.filter(id__in=list(ids[1:]))
+        for pair in canceled.values_list('from_profile', 'to_profile'):
+            profile_ids.update(pair)
+        canceled.update(status=4)
+    if profile_ids:
+        Profile.objects.filter(id__in=profile_ids).update(
+            graph_version=F('graph_version') + 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0009_friendrequest_pair'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_pair, migrations.RunPython.noop),
+    ]
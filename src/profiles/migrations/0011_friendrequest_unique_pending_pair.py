@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0010_fill_friendrequest_pair'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='friendrequest',
+            constraint=models.UniqueConstraint(condition=models.Q(status=3), fields=('pair',), name='unique_pending_pair'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.1.8 on 2026-10-18 20:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0011_friendrequest_unique_pending_pair'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedFriendRequest',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('created', models.DateTimeField(editable=False)),
+                ('archived', models.DateTimeField(auto_now_add=True)),
+                ('status', models.IntegerField(choices=[(1, 'Accepted'), (2, 'Rejected'), (3, 'Pending'), (4, 'Canceled')])),
+                ('from_profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='profiles.profile')),
+                ('to_profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='profiles.profile')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='friendrequest',
+            index=models.Index(condition=models.Q(_negated=True, status=3), fields=['created', 'id'], name='request_resolved_idx'),
+        ),
+    ]
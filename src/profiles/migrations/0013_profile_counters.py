@@ -0,0 +1,33 @@
+# Generated by Django 3.1.8 on 2026-10-18 20:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0012_archivedfriendrequest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='friend_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='blocking_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='incoming_pending_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='outgoing_pending_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+    ]
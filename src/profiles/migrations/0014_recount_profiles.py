@@ -0,0 +1,39 @@
+from django.db import migrations
+from django.db.models import F, Func, IntegerField, OuterRef, Subquery
+
+
+def recount(apps, schema_editor):
+    # the counters start from the counts, as set by the recount_profiles
+    # command
+    Profile = apps.get_model('profiles', 'Profile')
+    Relationship = apps.get_model('profiles', 'Relationship')
+    FriendRequest = apps.get_model('profiles', 'FriendRequest')
+
+    def count(queryset):
+        return Subquery(queryset.order_by().annotate(
+            count=Func(F('id'), function='COUNT')).values('count'),
+            output_field=IntegerField())
+
+    Profile.objects.update(
+        friend_count=count(Relationship.objects.filter(
+            from_profile=OuterRef('pk'), status=1))
+        + count(Relationship.objects.filter(
+            to_profile=OuterRef('pk'), status=1)),
+        blocking_count=count(Relationship.objects.filter(
+            from_profile=OuterRef('pk'), status=2)),
+        incoming_pending_count=count(FriendRequest.objects.filter(
+            to_profile=OuterRef('pk'), status=3)),
+        outgoing_pending_count=count(FriendRequest.objects.filter(
+            from_profile=OuterRef('pk'), status=3)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0013_profile_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(recount, migrations.RunPython.noop),
+    ]
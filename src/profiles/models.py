@@ -1,12 +1,41 @@
 import uuid
-
-from django.db import models
+from collections import Counter, defaultdict
+
+from django.db import models, transaction
+from django.db.models.deletion import Collector
+from django.db.models import (
+    Case, Exists, F, Func, IntegerField, OuterRef, Q, Subquery, Value, When,
+)
+from django.db.models.functions import Greatest, Least
 from django.conf import settings
 from django.shortcuts import reverse
 
+from .cache import graph_cache, invalidate_graphs
+from .events import publish_relationship, publish_request
+
 
 # Create your models here.
 
+class RelationshipState:
+    """Relationships and pending friend requests between two profiles, as
+    seen from the first one."""
+
+    __slots__ = ('friends', 'blocking', 'blocked_by', 'pending_to',
+                 'pending_from')
+
+    def __init__(self, friends=False, blocking=False, blocked_by=False,
+                 pending_to=False, pending_from=False):
+        self.friends = friends
+        self.blocking = blocking
+        self.blocked_by = blocked_by
+        self.pending_to = pending_to
+        self.pending_from = pending_from
+
+    @property
+    def has_pending_request(self):
+        return self.pending_to or self.pending_from
+
+
 class Profile(models.Model):
     user = models.OneToOneField(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
@@ -17,6 +46,24 @@ class Profile(models.Model):
         'self', through='Relationship', symmetrical=False,
         related_name='related_to')
 
+    # incremented by every write to the profile's relationships or friend
+    # requests, used for the ETags of the relationship lists
+    graph_version = models.PositiveIntegerField(default=0, editable=False)
+
+    # Counters kept by the methods writing relationships and friend
+    # requests, in the same UPDATE as the graph versions. The
+    # recount_profiles command repairs them.
+    friend_count = models.IntegerField(default=0, editable=False)
+
+    blocking_count = models.IntegerField(default=0, editable=False)
+
+    incoming_pending_count = models.IntegerField(default=0, editable=False)
+
+    outgoing_pending_count = models.IntegerField(default=0, editable=False)
+
+    COUNTERS = ('friend_count', 'blocking_count', 'incoming_pending_count',
+                'outgoing_pending_count')
+
     def __str__(self):
         return f'{self.user.username}'
 
@@ -24,6 +71,70 @@ class Profile(models.Model):
         return reverse('profiles:profiles-detail',
                        kwargs={'username': self.user.username})
 
+    @staticmethod
+    def bump_graph_versions(*profile_ids, **counts):
+        # counts maps counter names to the amounts added to them, keyed on
+        # profile id, for some of the profiles
+        updates = {'graph_version': F('graph_version') + 1}
+        for name, amounts in counts.items():
+            profiles_by_amount = defaultdict(list)
+            for profile_id, amount in amounts.items():
+                if amount:
+                    profiles_by_amount[amount].append(profile_id)
+            if profiles_by_amount:
+                updates[name] = F(name) + Case(
+                    *(When(id__in=ids, then=Value(amount))
+                      for amount, ids in profiles_by_amount.items()),
+                    default=Value(0), output_field=IntegerField())
+        Profile.objects.filter(id__in=profile_ids).update(**updates)
+
+    @staticmethod
+    def get_counted():
+        # The counters as counted from the relationships and requests, to
+        # annotate or update profiles with
+        def count(queryset):
+            return Subquery(queryset.order_by().annotate(
+                count=Func(F('id'), function='COUNT')).values('count'),
+                output_field=IntegerField())
+
+        return {
+            'friend_count':
+                count(Relationship.objects.filter(
+                    from_profile=OuterRef('pk'), status=1))
+                + count(Relationship.objects.filter(
+                    to_profile=OuterRef('pk'), status=1)),
+            'blocking_count': count(Relationship.objects.filter(
+                from_profile=OuterRef('pk'), status=2)),
+            'incoming_pending_count': count(FriendRequest.objects.filter(
+                to_profile=OuterRef('pk'), status=3)),
+            'outgoing_pending_count': count(FriendRequest.objects.filter(
+                from_profile=OuterRef('pk'), status=3)),
+        }
+
+    def uncount(self):
+        # Takes the relationships and pending requests of the profile, which
+        # are deleted with it without going through the methods below, out
+        # of the other profiles' counters
+        counts = defaultdict(Counter)
+        for from_id, to_id, status in Relationship.objects.filter(
+                Q(from_profile=self) | Q(to_profile=self)
+        ).values_list('from_profile', 'to_profile', 'status'):
+            if status == 1:
+                counts['friend_count'][
+                    to_id if from_id == self.id else from_id] -= 1
+            elif to_id == self.id:
+                counts['blocking_count'][from_id] -= 1
+        for from_id, to_id in FriendRequest.objects.filter(
+                Q(from_profile=self) | Q(to_profile=self), status=3
+        ).values_list('from_profile', 'to_profile'):
+            if from_id == self.id:
+                counts['incoming_pending_count'][to_id] -= 1
+            else:
+                counts['outgoing_pending_count'][from_id] -= 1
+        ids = set().union(*counts.values())
+        if ids:
+            Profile.bump_graph_versions(*ids, **counts)
+
     # GENERAL USER INFORMATION
 
     def get_username(self):
@@ -33,89 +144,268 @@ class Profile(models.Model):
 
     # Getting information about relationships
 
+    # The relationship's created and id are annotated as rel_created and
+    # rel_id, which the list views paginate on.
+
+    # Blocks are directional, friendships are stored once per pair, see
+    # Relationship.
+
     def get_relationships(self, status):
-        return self.relationships.filter(
+        return Profile.objects.filter(
             to_profile__status=status,
-            to_profile__from_profile=self)
+            to_profile__from_profile=self
+        ).annotate(
+            rel_created=F('to_profile__created'),
+            rel_id=F('to_profile__id'))
 
     def get_related_to(self, status):
-        return self.related_to.filter(
+        return Profile.objects.filter(
             from_profile__status=status,
-            from_profile__to_profile=self)
+            from_profile__to_profile=self
+        ).annotate(
+            rel_created=F('from_profile__created'),
+            rel_id=F('from_profile__id'))
 
     def get_friends(self):
-        return self.get_relationships(1)
+        return Profile.objects.filter(Relationship.friends_of(self))
+
+    def get_friendships(self):
+        # This profile's friends from each side of their friendships, as
+        # two querysets annotated like get_relationships. Each is ordered
+        # on (rel_created, rel_id) by its own index, so lists are
+        # paginated on both with KeysetPagination.paginate_querysets.
+        return [self.get_relationships(1), self.get_related_to(1)]
 
     def get_blocking(self):
         return self.get_relationships(2)
 
+    def get_mutual_friends(self, profile):
+        return self.get_friends().filter(Relationship.friends_of(profile))
+
+    def get_mutual_friendships(self, profile):
+        # get_friendships, keeping the friends that are also the other
+        # profile's, which is looked up by pair for each of them
+        mutual = Exists(Relationship.objects.filter(
+            Relationship.friendship_between(profile.id, OuterRef('pk'))))
+        return [queryset.filter(mutual)
+                for queryset in self.get_friendships()]
+
+    def get_suggestions(self):
+        # Suggestions precomputed by the suggest_friends command, leaving
+        # out the ones made stale by relationships or pending requests
+        # created since
+        between = Q(from_profile=self, to_profile=OuterRef('pk')) \
+            | Q(from_profile=OuterRef('pk'), to_profile=self)
+        related = Relationship.objects.filter(between)
+        pending = FriendRequest.objects.filter(between, status=3)
+        return Profile.objects.filter(suggested_for__profile=self) \
+            .filter(~Exists(related), ~Exists(pending)) \
+            .annotate(mutual_friends=F('suggested_for__mutual_friends')) \
+            .order_by('-mutual_friends', 'id')
+
+    # Cached relationship IDs, see profiles.cache
+
+    def get_graph(self):
+        # a deferred graph_version is loaded once, on the first lookup
+        return graph_cache.get(self.id, self.graph_version)
+
+    def get_friend_ids(self):
+        return self.get_graph().friends
+
+    def get_blocking_ids(self):
+        return self.get_graph().blocking
+
+    def get_blocked_by_ids(self):
+        return self.get_graph().blocked_by
+
     def is_blocked_by(self, profile):
-        if self.get_related_to(2).filter(id=profile.id).exists():
-            return True
-        return False
+        return profile.id in self.get_blocked_by_ids()
 
     def is_blocking(self, profile):
-        if self.get_relationships(2).filter(id=profile.id).exists():
-            return True
-        return False
+        return profile.id in self.get_blocking_ids()
 
     def is_friends_with(self, profile):
-        friends = self.get_friends()
-        if friends.filter(id=profile.id).exists():
-            return True
-        return False
+        return profile.id in self.get_friend_ids()
+
+    def get_relationship_state(self, profile):
+        return self.get_relationship_states([profile])[profile.id]
+
+    def get_relationship_states(self, profiles):
+        # Relationships and pending requests in both directions between
+        # this profile and every given profile are loaded with a single
+        # UNION query.
+        ids = [profile.id for profile in profiles]
+        between = Q(from_profile=self, to_profile__in=ids) \
+            | Q(from_profile__in=ids, to_profile=self)
+
+        relationships = Relationship.objects.filter(between).annotate(
+            is_request=Value(0, output_field=IntegerField())
+        ).values_list('is_request', 'from_profile', 'to_profile', 'status')
+
+        requests = FriendRequest.objects.filter(between, status=3).annotate(
+            is_request=Value(1, output_field=IntegerField())
+        ).values_list('is_request', 'from_profile', 'to_profile', 'status')
+
+        states = {id: RelationshipState() for id in ids}
+        for is_request, from_profile, to_profile, status in \
+                relationships.union(requests, all=True):
+            outgoing = from_profile == self.id
+            state = states[to_profile if outgoing else from_profile]
+            if is_request:
+                if outgoing:
+                    state.pending_to = True
+                else:
+                    state.pending_from = True
+            elif status == 1:
+                state.friends = True
+            elif outgoing:
+                state.blocking = True
+            else:
+                state.blocked_by = True
+        return states
 
     #
 
     # Creating, updating, or removing relationships relationships
 
-    def add_relationship(self, profile, status, symmetric=True):
+    def get_relationship_pair(self, profile, status):
+        # the single row of a friendship goes from the lower id
+        if status == 1 and profile.id < self.id:
+            return profile, self
+        return self, profile
+
+    def add_relationship(self, profile, status):
         if self == profile:
             return None
 
-        relationship, created = Relationship.objects.get_or_create(
-            from_profile=self,
-            to_profile=profile,
-            status=status
-        )
-        if symmetric:
-            profile.add_relationship(self, status, False)
+        from_profile, to_profile = self.get_relationship_pair(profile, status)
+        with transaction.atomic():
+            relationship, created = Relationship.objects.get_or_create(
+                from_profile=from_profile,
+                to_profile=to_profile,
+                status=status
+            )
+            if created:
+                Profile.bump_graph_versions(
+                    self.id, profile.id,
+                    **self.get_relationship_counts(profile, status, 1))
         return relationship
 
-    def remove_relationship(self, profile, status, symmetric=True):
-        Relationship.objects.filter(
-            from_profile=self,
-            to_profile=profile,
-            status=status).delete()
-        if symmetric:
-            profile.remove_relationship(self, status, False)
+    def remove_relationship(self, profile, status):
+        from_profile, to_profile = self.get_relationship_pair(profile, status)
+        with transaction.atomic():
+            deleted, __ = Relationship.objects.filter(
+                from_profile=from_profile,
+                to_profile=to_profile,
+                status=status).delete()
+            if deleted:
+                Profile.bump_graph_versions(
+                    self.id, profile.id,
+                    **self.get_relationship_counts(profile, status, -1))
         return
 
-    def block(self, profile):
-        if self.is_friends_with(profile):
+    def get_relationship_counts(self, profile, status, amount):
+        if status == 1:
+            return {'friend_count': {self.id: amount, profile.id: amount}}
+        return {'blocking_count': {self.id: amount}}
+
+    def block(self, profile, state=None):
+        if state is None:
+            state = self.get_relationship_state(profile)
+
+        if state.friends:
             self.remove_relationship(profile, 1)
 
-        if self.has_pending_request_to(profile):
+        if state.pending_to:
             self.cancel_request(profile)
 
-        if profile.has_pending_request_to(self):
+        if state.pending_from:
             self.deny_request(profile)
 
-        self.add_relationship(profile, 2, False)
+        self.add_relationship(profile, 2)
 
     def unblock(self, profile):
-        self.remove_relationship(profile, 2, False)
+        self.remove_relationship(profile, 2)
+
+    def bulk_block(self, profiles):
+        ids = [profile.id for profile in profiles]
+        counts = defaultdict(Counter)
+        with transaction.atomic():
+            friendships = Relationship.delete_all(Relationship.objects.filter(
+                Q(from_profile=self, to_profile__in=ids)
+                | Q(from_profile__in=ids, to_profile=self),
+                status=1))
+            for relationship in friendships:
+                counts['friend_count'][relationship.from_profile_id] -= 1
+                counts['friend_count'][relationship.to_profile_id] -= 1
+            # The updates skip signals, so the requests are read first to
+            # push their new status, and to uncount them. They are locked,
+            # on the databases that can, so none is resolved in between.
+            pending = list(FriendRequest.objects.filter(
+                Q(from_profile=self, to_profile__in=ids)
+                | Q(from_profile__in=ids, to_profile=self),
+                status=3).select_related('from_profile__user',
+                                         'to_profile__user')
+                .select_for_update(of=('self',)))
+            for request in pending:
+                counts['outgoing_pending_count'][request.from_profile_id] -= 1
+                counts['incoming_pending_count'][request.to_profile_id] -= 1
+            FriendRequest.objects.filter(
+                from_profile=self, to_profile__in=ids, status=3
+            ).update(status=4)
+            FriendRequest.objects.filter(
+                from_profile__in=ids, to_profile=self, status=3
+            ).update(status=2)
+            # Blocks created concurrently are skipped, and the blocks
+            # created read back by their ids, as for requests
+            blocks = [
+                Relationship(from_profile=self, to_profile=profile, status=2)
+                for profile in profiles
+            ]
+            Relationship.objects.bulk_create(blocks, ignore_conflicts=True)
+            created = set(Relationship.objects.filter(
+                id__in=[relationship.id for relationship in blocks]
+            ).values_list('id', flat=True))
+            blocks = [relationship for relationship in blocks
+                      if relationship.id in created]
+            counts['blocking_count'][self.id] += len(blocks)
+            Profile.bump_graph_versions(self.id, *ids, **counts)
+            for request in pending:
+                request.status = 4 if request.from_profile_id == self.id \
+                    else 2
+                publish_request(request)
+            for relationship in blocks:
+                publish_relationship(relationship, 'created')
+        invalidate_graphs(self.id, *ids)
+
+    def bulk_unblock(self, profiles):
+        ids = [profile.id for profile in profiles]
+        with transaction.atomic():
+            deleted = Relationship.delete_all(Relationship.objects.filter(
+                from_profile=self,
+                to_profile__in=ids,
+                status=2))
+            if deleted:
+                Profile.bump_graph_versions(
+                    self.id, *ids,
+                    blocking_count={self.id: -len(deleted)})
 
     def filter_blockers(self, queryset):
-        for profile in queryset:
-            if profile.is_blocking(self):
-                queryset = queryset.objects.exclude(id=profile.id)
-        return queryset
-
-    def add_friend(self, profile):
-        if not self.is_blocking(profile) \
-                and not self.is_blocked_by(profile) \
-                and not self.is_friends_with(profile):
+        # Anti-join against the blocking relationships pointing at this
+        # profile, so the filter costs no extra queries per row.
+        blocking_me = Relationship.objects.filter(
+            from_profile=OuterRef('pk'),
+            to_profile=self,
+            status=2)
+        return queryset.filter(~Exists(blocking_me))
+
+    def add_friend(self, profile, state=None):
+        if state is None:
+            state = self.get_relationship_state(profile)
+
+        if not state.blocking \
+                and not state.blocked_by \
+                and not state.friends:
             self.add_relationship(profile, 1)
 
     def remove_friend(self, profile):
@@ -156,54 +446,86 @@ class Profile(models.Model):
 
     # Interacting with friend requests
 
-    def send_request(self, profile):
+    def send_request(self, profile, state=None):
         if profile == self:
             return None
 
-        if not self.is_friends_with(profile) \
-                and not self.is_blocked_by(profile) \
-                and not self.is_blocking(profile) \
-                and not self.has_pending_request_to(profile)\
-                and not self.has_pending_request_from(profile):
-            request, created = FriendRequest.objects.get_or_create(
-                from_profile=self,
-                to_profile=profile,
-                status=3,
-            )
-            return request
+        if state is None:
+            state = self.get_relationship_state(profile)
+
+        if not state.friends \
+                and not state.blocked_by \
+                and not state.blocking \
+                and not state.has_pending_request:
+            requests = self.bulk_send_requests([profile])
+            if requests:
+                return requests[0]
 
         return None
 
+    def bulk_send_requests(self, profiles):
+        # A single INSERT that skips the profiles the pair of which already
+        # has a pending request, from either side, so concurrent requests
+        # between two profiles cannot both be created. Returns the requests
+        # created.
+        requests = [
+            FriendRequest(from_profile=self, to_profile=profile, status=3,
+                          pair=FriendRequest.get_pair(self.id, profile.id))
+            for profile in profiles
+        ]
+        if not requests:
+            return []
+        with transaction.atomic():
+            FriendRequest.objects.bulk_create(requests, ignore_conflicts=True)
+            created = set(FriendRequest.objects.filter(
+                id__in=[request.id for request in requests]
+            ).values_list('id', flat=True))
+            requests = [request for request in requests
+                        if request.id in created]
+            if requests:
+                to_ids = [request.to_profile_id for request in requests]
+                Profile.bump_graph_versions(
+                    self.id, *to_ids,
+                    outgoing_pending_count={self.id: len(requests)},
+                    incoming_pending_count=Counter(to_ids))
+            # bulk_create skips the signal publishing the requests
+            for request in requests:
+                publish_request(request)
+        return requests
+
+    def update_request(self, from_profile, to_profile, status):
+        # A single conditional UPDATE, so of concurrent approvals, denials
+        # and cancellations of a request only one finds it pending. Returns
+        # the number of requests updated, 0 or 1.
+        with transaction.atomic():
+            updated = FriendRequest.objects.filter(
+                from_profile=from_profile,
+                to_profile=to_profile,
+                status=3).update(status=status)
+            if updated:
+                Profile.bump_graph_versions(
+                    from_profile.id, to_profile.id,
+                    outgoing_pending_count={from_profile.id: -1},
+                    incoming_pending_count={to_profile.id: -1})
+                # The update skips the signal publishing the request. It
+                # is pushed once the writes made along with it, such as the
+                # friendship of an approval, have committed.
+                request = FriendRequest.get_latest(from_profile, to_profile)
+                transaction.on_commit(lambda: publish_request(request))
+        return updated
+
     def cancel_request(self, profile):
-        request = FriendRequest.objects.filter(
-            from_profile=self,
-            to_profile=profile,
-            status=3).first()
-        if request is not None:
-            request.status = 4
-            request.save()
-        return request
+        return self.update_request(self, profile, 4)
 
     def approve_request(self, profile):
-        request = FriendRequest.objects.filter(
-            from_profile=profile,
-            to_profile=self,
-            status=3).first()
-        if request is not None:
-            request.status = 1
-            request.save()
-            self.add_friend(profile)
-        return request
+        with transaction.atomic():
+            updated = self.update_request(profile, self, 1)
+            if updated:
+                self.add_relationship(profile, 1)
+        return updated
 
     def deny_request(self, profile):
-        request = FriendRequest.objects.filter(
-            from_profile=profile,
-            to_profile=self,
-            status=3).first()
-        if request is not None:
-            request.status = 2
-            request.save()
-        return request
+        return self.update_request(profile, self, 2)
 
 
 class Relationship(models.Model):
@@ -226,6 +548,56 @@ class Relationship(models.Model):
 
     status = models.IntegerField(choices=RELATIONSHIP_STATUSES)
 
+    # Blocks go from the blocking profile to the blocked one. Friendships
+    # are symmetric and stored once per pair, from the profile with the
+    # lower id, which friendship_between and friends_of query.
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['from_profile', 'to_profile', 'status'],
+                name='unique_relationship'),
+            models.CheckConstraint(
+                check=~Q(status=1) | Q(from_profile__lt=F('to_profile')),
+                name='canonical_friendship'),
+        ]
+        indexes = [
+            models.Index(
+                fields=['from_profile', 'status', 'created', 'id'],
+                name='relationship_from_status_idx'),
+            models.Index(
+                fields=['to_profile', 'status', 'created', 'id'],
+                name='relationship_to_status_idx'),
+        ]
+
+    @staticmethod
+    def friendship_between(profile_id, other_id):
+        # either id can be an expression, such as an OuterRef
+        return Q(from_profile=Least(profile_id, other_id),
+                 to_profile=Greatest(profile_id, other_id),
+                 status=1)
+
+    @staticmethod
+    def friends_of(profile):
+        # Q of the profiles friends with the given one, from both sides of
+        # its friendships
+        return Q(id__in=Relationship.objects.filter(
+            from_profile=profile, status=1).values('to_profile')) \
+            | Q(id__in=Relationship.objects.filter(
+                to_profile=profile, status=1).values('from_profile'))
+
+    @staticmethod
+    def delete_all(queryset):
+        # Deleting the queryset would fetch the rows again without their
+        # profiles, which the post_delete signals then query one by one to
+        # publish the username. Returns the relationships deleted.
+        relationships = list(queryset.select_related('from_profile__user',
+                                                     'to_profile__user'))
+        collector = Collector(using=queryset.db)
+        collector.collect(relationships)
+        collector.delete()
+        return relationships
+
     def __str__(self):
         if self.status == 1:
             return 'Friendship'
@@ -257,6 +629,109 @@ class FriendRequest(models.Model):
 
     status = models.IntegerField(choices=REQUEST_STATUSES)
 
+    # The ids of both profiles, lower first, so that a pair has a single
+    # pending request whichever profile sent it
+    pair = models.CharField(max_length=41, editable=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['from_profile', 'to_profile'],
+                condition=Q(status=3),
+                name='unique_pending_request'),
+            models.UniqueConstraint(
+                fields=['pair'],
+                condition=Q(status=3),
+                name='unique_pending_pair'),
+        ]
+        indexes = [
+            models.Index(
+                fields=['to_profile', 'created', 'id'],
+                condition=Q(status=3),
+                name='request_incoming_pending_idx'),
+            models.Index(
+                fields=['from_profile', 'created', 'id'],
+                condition=Q(status=3),
+                name='request_outgoing_pending_idx'),
+            # resolved requests, compacted oldest first by the
+            # compact_requests command
+            models.Index(
+                fields=['created', 'id'],
+                condition=~Q(status=3),
+                name='request_resolved_idx'),
+        ]
+
+    @staticmethod
+    def get_pair(profile_id, other_id):
+        return '{}:{}'.format(*sorted((profile_id, other_id)))
+
+    def save(self, *args, **kwargs):
+        self.pair = FriendRequest.get_pair(self.from_profile_id,
+                                           self.to_profile_id)
+        super(FriendRequest, self).save(*args, **kwargs)
+
+    @staticmethod
+    def get_latest(from_profile, to_profile):
+        # A pair has a single pending request at a time, so the latest one
+        # is the one pending or resolved last
+        return FriendRequest.objects.filter(
+            from_profile=from_profile,
+            to_profile=to_profile,
+        ).select_related('from_profile__user', 'to_profile__user') \
+            .order_by('-created').first()
+
     def __str__(self):
         return f'Friend request from {self.from_profile.user.username} to ' \
                f'{self.to_profile.user.username}.'
+
+
+class ArchivedFriendRequest(models.Model):
+    """Resolved friend request moved out of FriendRequest by the
+    compact_requests command, with its id, times and status."""
+
+    id = models.UUIDField(primary_key=True, editable=False)
+
+    created = models.DateTimeField(editable=False)
+
+    archived = models.DateTimeField(auto_now_add=True, editable=False)
+
+    from_profile = models.ForeignKey(
+        Profile, on_delete=models.CASCADE, related_name='+')
+
+    to_profile = models.ForeignKey(
+        Profile, on_delete=models.CASCADE, related_name='+')
+
+    status = models.IntegerField(choices=FriendRequest.REQUEST_STATUSES)
+
+    def __str__(self):
+        return f'Archived friend request from ' \
+               f'{self.from_profile.user.username} to ' \
+               f'{self.to_profile.user.username}.'
+
+
+class FriendSuggestion(models.Model):
+    """Friend-of-friend suggestion precomputed by the suggest_friends
+    command, ranked by the number of friends in common."""
+
+    profile = models.ForeignKey(
+        Profile, on_delete=models.CASCADE, related_name='suggestions')
+
+    suggested_profile = models.ForeignKey(
+        Profile, on_delete=models.CASCADE, related_name='suggested_for')
+
+    mutual_friends = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['profile', 'suggested_profile'],
+                name='unique_friend_suggestion'),
+        ]
+        indexes = [
+            models.Index(
+                fields=['profile', '-mutual_friends', 'suggested_profile'],
+                name='suggestion_rank_idx'),
+        ]
+
+    def __str__(self):
+        return 'Friend suggestion'
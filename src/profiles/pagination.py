@@ -0,0 +1,135 @@
+import base64
+import binascii
+import heapq
+import json
+from itertools import islice
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .exceptions import InvalidCursor
+
+
+def encode_cursor(created, id):
+    position = json.dumps([created.isoformat(), str(id)])
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        created, id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        created = parse_datetime(created)
+    except (TypeError, ValueError, binascii.Error):
+        raise InvalidCursor
+    if created is None:
+        raise InvalidCursor
+    return created, id
+
+
+class KeysetPagination(BasePagination):
+    """Paginates a queryset on its (created, id) ordering, or the reverse
+    one if descending.
+
+    Each page starts from the key of the last row of the previous page
+    rather than an offset, so deep pages cost the same as the first one.
+    The cursor for the next page is sent in a Link header, leaving the
+    response body a plain list.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+
+    def __init__(self, created='created', id='id', descending=False):
+        self.created = created
+        self.id = id
+        self.descending = descending
+
+    def get_page_size(self, request):
+        page_size = getattr(settings, 'PAGE_SIZE', 50)
+        max_page_size = getattr(settings, 'MAX_PAGE_SIZE', 200)
+        try:
+            requested = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return page_size
+        if requested <= 0:
+            return page_size
+        return min(requested, max_page_size)
+
+    def get_position(self, row):
+        if isinstance(row, dict):
+            return row[self.created], row[self.id]
+        return getattr(row, self.created), getattr(row, self.id)
+
+    def filter_cursor(self, queryset, cursor, lookup):
+        # Rows after (gt) or before (lt) the position in the cursor. The
+        # bound on created alone lets the index seek to the position.
+        created, id = decode_cursor(cursor)
+        try:
+            return queryset.filter(
+                Q(**{f'{self.created}__{lookup}e': created}),
+                Q(**{f'{self.created}__{lookup}': created})
+                | Q(**{self.created: created, f'{self.id}__{lookup}': id}))
+        except ValidationError:
+            raise InvalidCursor
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.paginate_querysets([queryset], request, view)
+
+    def paginate_querysets(self, querysets, request, view=None):
+        # Paginates the rows of several querysets, each ordered by an index
+        # of its own, as a page of each merged into one, the way a UNION
+        # ALL of limited queries limited again would
+        self.request = request
+        self.page_size = self.get_page_size(request)
+
+        cursor = request.query_params.get(self.cursor_query_param, None)
+        if self.descending:
+            ordering = (f'-{self.created}', f'-{self.id}')
+        else:
+            ordering = (self.created, self.id)
+
+        pages = []
+        for queryset in querysets:
+            if cursor is not None:
+                queryset = self.filter_cursor(
+                    queryset, cursor, 'lt' if self.descending else 'gt')
+            pages.append(
+                list(queryset.order_by(*ordering)[:self.page_size + 1]))
+        rows = list(islice(
+            heapq.merge(*pages, key=self.get_position,
+                        reverse=self.descending),
+            self.page_size + 1))
+
+        self.next_position = None
+        if len(rows) > self.page_size:
+            rows = rows[:self.page_size]
+            self.next_position = self.get_position(rows[-1])
+        return rows
+
+    def get_link(self, query_param, position, *other_params):
+        url = self.request.build_absolute_uri()
+        for param in other_params:
+            url = remove_query_param(url, param)
+        return replace_query_param(url, query_param, encode_cursor(*position))
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return self.get_link(self.cursor_query_param, self.next_position)
+
+    def get_links(self):
+        next_link = self.get_next_link()
+        if next_link is None:
+            return []
+        return [f'<{next_link}>; rel="next"']
+
+    def get_paginated_response(self, data):
+        headers = {}
+        links = self.get_links()
+        if links:
+            headers['Link'] = ', '.join(links)
+        return Response(data, headers=headers)
@@ -1,26 +1,77 @@
+import copy
+
 from rest_framework import serializers
 
 from .models import Profile, Relationship, FriendRequest
 
 
 class DynamicModelSerializer(serializers.ModelSerializer):
+    # Subclasses limited to a subset of the fields, keyed on (serializer
+    # class, fields). Their fields are built once, so instantiating them
+    # only copies the prebuilt fields.
+    _subset_classes = {}
+    _subset_fields = None
+
+    def __new__(cls, *args, **kwargs):
+        fields = kwargs.get('fields', None)
+        if fields is not None and not kwargs.get('many', False):
+            cls = cls.get_subset_class(fields)
+        return super(DynamicModelSerializer, cls).__new__(cls, *args, **kwargs)
 
     def __init__(self, *args, **kwargs):
 
-        fields = kwargs.pop('fields', None)
+        kwargs.pop('fields', None)
 
         super(DynamicModelSerializer, self).__init__(*args, **kwargs)
 
-        if fields is not None:
+    @classmethod
+    def get_subset_class(cls, fields):
+        if cls._subset_fields is not None:
+            # start from the serializer the subset class was made from
+            cls = cls.__base__
+
+        key = (cls, tuple(fields))
+        subset_class = cls._subset_classes.get(key, None)
+        if subset_class is None:
             allowed = set(fields)
-            existing = set(self.fields.keys())
-            for field_name in existing - allowed:
-                self.fields.pop(field_name)
+            subset_fields = {
+                name: field for name, field in cls().get_fields().items()
+                if name in allowed
+            }
+            subset_class = type(cls.__name__, (cls,), {
+                '__module__': cls.__module__,
+                '_subset_fields': subset_fields,
+            })
+            cls._subset_classes[key] = subset_class
+        return subset_class
+
+    def get_fields(self):
+        if self._subset_fields is None:
+            return super(DynamicModelSerializer, self).get_fields()
+        return copy.deepcopy(self._subset_fields)
 
 
 class ProfileSerializer(DynamicModelSerializer):
     PUBLIC_FIELDS = ('username', 'first_name', 'last_name',)
-    PRIVATE_FIELDS = PUBLIC_FIELDS
+    PRIVATE_FIELDS = PUBLIC_FIELDS + Profile.COUNTERS
+
+    # Columns holding the public fields, used to serialize lists of
+    # profiles straight from .values() rows
+    PUBLIC_COLUMNS = {
+        'username': 'user__username',
+        'first_name': 'user__first_name',
+        'last_name': 'user__last_name',
+    }
+
+    @classmethod
+    def public_values(cls, queryset, *extra):
+        return queryset.values(*cls.PUBLIC_COLUMNS.values(), *extra)
+
+    @classmethod
+    def public_data(cls, rows):
+        columns = cls.PUBLIC_COLUMNS.items()
+        return [{field: row[column] for field, column in columns}
+                for row in rows]
 
     username = serializers.CharField(source='get_username', read_only=True)
     first_name = serializers.CharField(source='user.first_name')
@@ -28,19 +79,19 @@ class ProfileSerializer(DynamicModelSerializer):
 
     def update(self, instance, validated_data):
         user = validated_data.get('user', None)
-        if user is not None:
-            first_name = user.pop('first_name', None)
-            last_name = user.pop('last_name', None)
-            if first_name is not None:
-                instance.user.first_name = first_name
-            if last_name is not None:
-                instance.user.last_name = last_name
-        instance.user.save(update_fields=('first_name', 'last_name',))
+        if user:
+            # only the fields given, so the others are never written back
+            for field in ('first_name', 'last_name'):
+                if field in user:
+                    setattr(instance.user, field, user[field])
+            instance.user.save(update_fields=[
+                field for field in ('first_name', 'last_name')
+                if field in user])
         return instance
 
     class Meta:
         model = Profile
-        fields = ('username', 'first_name', 'last_name', )
+        fields = ('username', 'first_name', 'last_name', ) + Profile.COUNTERS
 
 
 class RequestSerializer(serializers.ModelSerializer):
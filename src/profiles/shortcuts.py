@@ -1,17 +1,43 @@
-from django.contrib.auth import get_user_model
+from contextvars import ContextVar
+
+from django.conf import settings
 from django.http import Http404
 from django.core.exceptions import PermissionDenied
 
-from .exceptions import UsernameNotProvided
+from .exceptions import (
+    UsernameNotProvided,
+    UsernamesNotProvided,
+    TooManyUsernames,
+)
+from .models import Profile
 
 MESSAGE_404 = "Profile does not exist."
 
 
+# Profiles looked up during the current request, set by
+# profiles.middleware.ProfileMemoMiddleware
+profile_memo = ContextVar('profile_memo', default=None)
+
+
 def get_profile(username):
-    user = get_user_model().objects.filter(username=username).first()
-    if user is None:
-        return None
-    return user.profile
+    memo = profile_memo.get()
+    if memo is not None and username in memo:
+        return memo[username]
+
+    # a single query on the unique username index, which a cached id
+    # would only replace with a query on the primary key
+    profile = Profile.objects.select_related('user').filter(
+        user__username=username).first()
+
+    if memo is not None:
+        memo[username] = profile
+    return profile
+
+
+def get_profiles(usernames):
+    profiles = Profile.objects.select_related('user').filter(
+        user__username__in=usernames)
+    return {profile.user.username: profile for profile in profiles}
 
 
 def get_profile_or_404(username):
@@ -21,7 +47,15 @@ def get_profile_or_404(username):
     return profile
 
 
-def check_my_profile(auth_profile, username):
+def check_my_profile(auth_profile, username, write=False):
+    # The authenticated profile usually comes with its user loaded, in
+    # which case there is nothing to look up. Profiles built from token
+    # claims may hold stale names, so writes load the rows.
+    if Profile.user.is_cached(auth_profile) \
+            and auth_profile.user.username == username \
+            and not (write and auth_profile.user.get_deferred_fields()):
+        return auth_profile
+
     my_profile = get_profile_or_404(username)
 
     if auth_profile != my_profile:
@@ -41,3 +75,42 @@ def get_other_profile(authenticated_profile, other_username):
         raise Http404(MESSAGE_404)
 
     return requested_profile
+
+
+def get_other_profile_with_state(authenticated_profile, other_username):
+    # find requested profile
+    if other_username is None:
+        raise UsernameNotProvided
+    requested_profile = get_profile_or_404(other_username)
+
+    # check blocking, keeping the rest of the state for the caller
+    state = authenticated_profile.get_relationship_state(requested_profile)
+    if state.blocked_by:
+        raise Http404(MESSAGE_404)
+
+    return requested_profile, state
+
+
+def get_other_profiles_with_state(authenticated_profile, other_usernames):
+    if not isinstance(other_usernames, list) or not other_usernames \
+            or not all(isinstance(name, str) for name in other_usernames):
+        raise UsernamesNotProvided
+
+    # remove duplicates, keeping the order of the request
+    other_usernames = list(dict.fromkeys(other_usernames))
+    if len(other_usernames) > getattr(settings, 'BULK_MAX_USERNAMES', 5000):
+        raise TooManyUsernames
+
+    # find requested profiles and their state in two queries, treating
+    # profiles that block the authenticated one as missing
+    profiles = get_profiles(other_usernames)
+    states = authenticated_profile.get_relationship_states(profiles.values())
+
+    others = []
+    for username in other_usernames:
+        profile = profiles.get(username, None)
+        state = None if profile is None else states[profile.id]
+        if state is not None and state.blocked_by:
+            profile, state = None, None
+        others.append((username, profile, state))
+    return others
@@ -1,8 +1,10 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete, pre_delete
 from django.dispatch import receiver
 
 from django.conf import settings
-from .models import Profile
+from .cache import invalidate_graphs
+from .events import publish_relationship, publish_request
+from .models import Profile, Relationship, FriendRequest
 
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
@@ -14,4 +16,50 @@ def create_profile(sender, instance, created, **kwargs):
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
 def update_profile(sender, instance, created, **kwargs):
     if not created:
-        instance.profile.save()
+        # only the user column, so that a stale graph_version is never
+        # written back
+        instance.profile.save(update_fields=('user',))
+
+
+@receiver(pre_delete, sender=Profile)
+def uncount_deleted_profile(sender, instance, **kwargs):
+    # while its relationships and requests can still be read
+    instance.uncount()
+
+
+# Social graph cache invalidation
+
+@receiver(post_save, sender=Profile)
+def invalidate_created_profile_graph(sender, instance, created, **kwargs):
+    # IDs can be reused, so new profiles must not inherit a stale entry
+    if created:
+        invalidate_graphs(instance.id)
+
+
+@receiver(post_delete, sender=Profile)
+def invalidate_deleted_profile_graph(sender, instance, **kwargs):
+    invalidate_graphs(instance.id)
+
+
+@receiver(post_save, sender=Relationship)
+@receiver(post_delete, sender=Relationship)
+def invalidate_relationship_graphs(sender, instance, **kwargs):
+    invalidate_graphs(instance.from_profile_id, instance.to_profile_id)
+
+
+# Events pushed to websockets, see profiles.events
+
+@receiver(post_save, sender=FriendRequest)
+def publish_saved_request(sender, instance, **kwargs):
+    publish_request(instance)
+
+
+@receiver(post_save, sender=Relationship)
+def publish_created_relationship(sender, instance, created, **kwargs):
+    if created:
+        publish_relationship(instance, 'created')
+
+
+@receiver(post_delete, sender=Relationship)
+def publish_deleted_relationship(sender, instance, **kwargs):
+    publish_relationship(instance, 'deleted')
@@ -0,0 +1,81 @@
+import re
+from collections import Counter
+
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from accounts.authentication import active_user_cache
+
+LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def normalize_sql(sql):
+    # the same statement with other parameters, as an N+1 repeats it
+    return LITERAL.sub('?', sql)
+
+
+def clear_caches():
+    for cache in caches.all():
+        cache.clear()
+    active_user_cache.clear()
+
+
+class QueryBudgetMixin:
+    """Checks the number of queries views make against declared budgets.
+
+    query_budgets maps (url name, method) to the most queries a request may
+    make. For every fixture size, make_budget_request(name, method, size)
+    builds lists of that size and returns the path and data of a request
+    made with self.client, and the state is rolled back afterwards. The
+    count must not depend on the size, so a query per row fails the test
+    with the statements of the largest run listed.
+    """
+    fixture_sizes = (1, 5, 20)
+    query_budgets = {}
+
+    def make_budget_request(self, name, method, size):
+        raise NotImplementedError
+
+    def capture_budget_request(self, name, method, size):
+        with transaction.atomic():
+            path, data = self.make_budget_request(name, method, size)
+            # every run starts cold, as ids are reused once rolled back
+            clear_caches()
+            send = getattr(self.client, method)
+            with CaptureQueriesContext(connection) as captured:
+                if method == 'get':
+                    response = send(path, data)
+                else:
+                    response = send(path, data, format='json')
+            transaction.set_rollback(True)
+        clear_caches()
+
+        self.assertLess(response.status_code, 400, response.content)
+        return [query['sql'] for query in captured.captured_queries]
+
+    def format_queries(self, queries):
+        counts = Counter(normalize_sql(sql) for sql in queries)
+        return '\n'.join(f'{count:>4}x {sql}' for sql, count in sorted(
+            counts.items(), key=lambda item: -item[1]))
+
+    def assertQueryBudget(self, name, method, budget):
+        runs = [(size, self.capture_budget_request(name, method, size))
+                for size in self.fixture_sizes]
+        counts = ', '.join(f'{len(queries)} at size {size}'
+                           for size, queries in runs)
+        queries = runs[-1][1]
+
+        if len({len(run) for __, run in runs}) > 1:
+            self.fail(f'{method.upper()} {name} made {counts} queries, which '
+                      f'grows with the lists:\n'
+                      f'{self.format_queries(queries)}')
+        if len(queries) > budget:
+            self.fail(f'{method.upper()} {name} made {len(queries)} queries, '
+                      f'over its budget of {budget}:\n'
+                      f'{self.format_queries(queries)}')
+
+    def test_query_budgets(self):
+        for (name, method), budget in self.query_budgets.items():
+            with self.subTest(view=name, method=method):
+                self.assertQueryBudget(name, method, budget)
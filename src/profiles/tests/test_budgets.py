@@ -0,0 +1,80 @@
+import json
+
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from profiles.models import FriendSuggestion
+from .mixins import QueryBudgetMixin
+from .test_http import PASSWORD, create_user
+
+
+class HttpQueryBudgetTest(QueryBudgetMixin, APITestCase):
+    query_budgets = {
+        ('profiles:friends', 'get'): 6,
+        ('profiles:friends-mutual', 'get'): 6,
+        ('profiles:friends-suggestions', 'get'): 2,
+        ('profiles:requests', 'get'): 3,
+        ('profiles:blocking', 'get'): 3,
+        ('profiles:friends-bulk', 'post'): 8,
+        ('profiles:blocking-bulk', 'post'): 13,
+        ('profiles:blocking-bulk', 'delete'): 8,
+    }
+
+    def setUp(self):
+        self.user1 = create_user('user1', 'bob', 'smith')
+        self.profile1 = self.user1.profile
+        self.user2 = create_user('user2')
+        response = self.client.post(
+            reverse('accounts:login'),
+            data=json.dumps({
+                'username': self.user1.username,
+                'password': PASSWORD,
+            }),
+            content_type='application/json'
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
+
+    def create_profiles(self, size, prefix):
+        # no password, hashing it would dominate the test
+        return [create_user(f'{prefix}{i}', password=None).profile
+                for i in range(size)]
+
+    def make_budget_request(self, name, method, size):
+        profile1 = self.profile1
+        url = reverse(name, kwargs={'username': 'user1'})
+        others = self.create_profiles(size, 'other')
+        usernames = [profile.get_username() for profile in others]
+
+        if name == 'profiles:friends':
+            for profile in others:
+                profile1.add_friend(profile)
+        elif name == 'profiles:friends-mutual':
+            profile2 = self.user2.profile
+            for profile in others:
+                profile1.add_friend(profile)
+                profile2.add_friend(profile)
+            url = reverse(name, kwargs={'username': 'user2'})
+        elif name == 'profiles:friends-suggestions':
+            FriendSuggestion.objects.bulk_create([
+                FriendSuggestion(profile=profile1, suggested_profile=profile,
+                                 mutual_friends=1)
+                for profile in others])
+        elif name == 'profiles:requests':
+            for profile in others:
+                profile.send_request(profile1)
+        elif name == 'profiles:blocking':
+            profile1.bulk_block(others)
+        elif name == 'profiles:blocking-bulk' and method == 'post':
+            # blocking ends friendships and pending requests both ways
+            requesters = self.create_profiles(size, 'requester')
+            for friend, requester in zip(others, requesters):
+                profile1.add_friend(friend)
+                requester.send_request(profile1)
+            usernames += [profile.get_username() for profile in requesters]
+        elif name == 'profiles:blocking-bulk':
+            profile1.bulk_block(others)
+
+        if method == 'get':
+            return url, None
+        return url, {'usernames': usernames}
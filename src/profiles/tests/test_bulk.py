@@ -0,0 +1,149 @@
+import json
+from unittest import mock
+
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from profiles.models import FriendRequest, Profile, Relationship
+from .test_http import PASSWORD, create_user
+
+
+class HttpBulkTest(APITestCase):
+
+    def setUp(self):
+        self.user1 = create_user('user1', 'bob', 'smith')
+        response = self.client.post(
+            reverse('accounts:login'),
+            data=json.dumps({
+                'username': self.user1.username,
+                'password': PASSWORD,
+            }),
+            content_type='application/json'
+        )
+        self.access1 = response.data['access']
+
+        self.user2 = create_user('user2', 'jim', 'walsh')
+        self.user3 = create_user('user3', 'johnny', 'fisher')
+        self.user4 = create_user('user4', 'sam', 'jones')
+        self.user5 = create_user('user5', 'tom', 'brown')
+        self.user6 = create_user('user6', 'ann', 'green')
+
+        # Setup Info
+        # user1 and user2 are friends.
+        # user1 has a pending friend request to user3.
+        # user4 is blocking user1.
+        # user1 is blocking user5.
+        self.user1.profile.add_friend(self.user2.profile)
+        self.user1.profile.send_request(self.user3.profile)
+        self.user4.profile.block(self.user1.profile)
+        self.user1.profile.block(self.user5.profile)
+
+        self.all_usernames = [
+            'user1', 'user2', 'user3', 'user4', 'user5', 'user6', 'nobody',
+        ]
+
+    def bulk(self, method, name, usernames):
+        return getattr(self.client, method)(
+            reverse(name, kwargs={'username': self.user1.username}),
+            HTTP_AUTHORIZATION=f'Bearer {self.access1}',
+            data=json.dumps({'usernames': usernames}),
+            content_type='application/json'
+        )
+
+    def test_bulk_requests(self):
+        response = self.bulk('post', 'profiles:friends-bulk',
+                             self.all_usernames)
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(response.data, [
+            {'username': 'user1', 'status': 'own_profile'},
+            {'username': 'user2', 'status': 'already_friends'},
+            {'username': 'user3', 'status': 'already_request'},
+            {'username': 'user4', 'status': 'not_found'},
+            {'username': 'user5', 'status': 'blocking'},
+            {'username': 'user6', 'status': 'requested'},
+            {'username': 'nobody', 'status': 'not_found'},
+        ])
+        self.assertTrue(
+            self.user1.profile.has_pending_request_to(self.user6.profile))
+        self.assertEqual(
+            self.user1.profile.get_outgoing_pending().count(), 2)
+
+    def test_bulk_block(self):
+        response = self.bulk('post', 'profiles:blocking-bulk',
+                             self.all_usernames)
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(response.data, [
+            {'username': 'user1', 'status': 'own_profile'},
+            {'username': 'user2', 'status': 'blocked'},
+            {'username': 'user3', 'status': 'blocked'},
+            {'username': 'user4', 'status': 'not_found'},
+            {'username': 'user5', 'status': 'already_blocking'},
+            {'username': 'user6', 'status': 'blocked'},
+            {'username': 'nobody', 'status': 'not_found'},
+        ])
+
+        profile1 = self.user1.profile
+        self.assertEqual(
+            set(profile1.get_blocking().values_list('user__username',
+                                                    flat=True)),
+            {'user2', 'user3', 'user5', 'user6'})
+        self.assertFalse(profile1.is_friends_with(self.user2.profile))
+        self.assertFalse(self.user2.profile.is_friends_with(profile1))
+        self.assertTrue(self.user2.profile.is_blocked_by(profile1))
+        self.assertFalse(profile1.has_pending_request_to(self.user3.profile))
+        self.assertEqual(
+            FriendRequest.objects.get(to_profile=self.user3.profile).status,
+            4)
+
+    def test_bulk_block_concurrent(self):
+        # user2 was blocked by a concurrent request after the view read the
+        # state, the row written around the counters
+        profile1 = self.user1.profile
+        Relationship.objects.create(from_profile=profile1,
+                                    to_profile=self.user2.profile, status=2)
+        blocking_count = Profile.objects.get(id=profile1.id).blocking_count
+
+        with mock.patch('profiles.models.publish_relationship') as publish:
+            profile1.bulk_block([self.user2.profile, self.user3.profile])
+
+        self.assertEqual(
+            [call.args[0].to_profile for call in publish.call_args_list],
+            [self.user3.profile])
+        self.assertEqual(
+            Profile.objects.get(id=profile1.id).blocking_count,
+            blocking_count + 1)
+        self.assertEqual(Relationship.objects.filter(
+            from_profile=profile1, to_profile=self.user2.profile,
+            status=2).count(), 1)
+
+    def test_bulk_unblock(self):
+        response = self.bulk('delete', 'profiles:blocking-bulk',
+                             ['user5', 'user6', 'user4', 'user5'])
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(response.data, [
+            {'username': 'user5', 'status': 'unblocked'},
+            {'username': 'user6', 'status': 'not_blocking'},
+            {'username': 'user4', 'status': 'not_found'},
+        ])
+        self.assertFalse(self.user1.profile.get_blocking().exists())
+
+    def test_bulk_missing_usernames(self):
+        for usernames in (None, [], 'user2', [1, 2]):
+            response = self.bulk('post', 'profiles:blocking-bulk', usernames)
+            self.assertEqual(status.HTTP_400_BAD_REQUEST,
+                             response.status_code)
+
+    def test_bulk_other_profile(self):
+        response = self.client.post(
+            reverse('profiles:friends-bulk',
+                    kwargs={'username': self.user2.username}),
+            HTTP_AUTHORIZATION=f'Bearer {self.access1}',
+            data=json.dumps({'usernames': ['user6']}),
+            content_type='application/json'
+        )
+
+        self.assertEqual(status.HTTP_403_FORBIDDEN, response.status_code)
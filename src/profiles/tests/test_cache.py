@@ -0,0 +1,123 @@
+from django.contrib.auth import get_user_model
+from django.core.exceptions import PermissionDenied
+from django.http import Http404
+from django.test import TestCase
+
+from profiles.cache import CACHE_KEY, graph_cache
+from profiles.models import Profile
+from profiles.shortcuts import check_my_profile, get_profile, profile_memo
+from .test_http import create_user
+
+
+class GraphCacheTest(TestCase):
+
+    def setUp(self):
+        self.profile1 = create_user('user1', 'bob', 'smith').profile
+        self.profile2 = create_user('user2', 'jim', 'walsh').profile
+        self.profile3 = create_user('user3', 'johnny', 'fisher').profile
+
+        # Setup Info
+        # user1 and user2 are friends.
+        # user3 is blocking user1.
+        self.profile1.add_friend(self.profile2)
+        self.profile3.block(self.profile1)
+        graph_cache.reset_stats()
+
+    def test_hits_and_misses(self):
+        # the relationships, then only the cache
+        with self.assertNumQueries(1):
+            self.assertTrue(self.profile1.is_friends_with(self.profile2))
+        with self.assertNumQueries(0):
+            self.assertTrue(self.profile1.is_blocked_by(self.profile3))
+            self.assertFalse(self.profile1.is_blocking(self.profile3))
+        self.assertEqual(graph_cache.stats(), {'hits': 2, 'misses': 1})
+
+    def test_deferred_version(self):
+        # as for the profile built from the token claims
+        profile = Profile.objects.only('id').get(id=self.profile1.id)
+        with self.assertNumQueries(2):
+            self.assertTrue(profile.is_friends_with(self.profile2))
+        with self.assertNumQueries(0):
+            self.assertTrue(profile.is_blocked_by(self.profile3))
+        self.assertEqual(graph_cache.stats(), {'hits': 1, 'misses': 1})
+
+    def test_stale_entry(self):
+        # An entry cached by another process before a write, or stored
+        # after the write invalidated it, is not served to a profile loaded
+        # after the write
+        self.profile1.refresh_from_db()
+        stale = (self.profile1.graph_version, frozenset({self.profile2.id}),
+                 frozenset(), frozenset())
+        self.profile1.remove_friend(self.profile2)
+        graph_cache.cache.set(CACHE_KEY.format(self.profile1.id), stale)
+        self.profile1.refresh_from_db()
+
+        self.assertFalse(self.profile1.is_friends_with(self.profile2))
+        self.assertEqual(graph_cache.stats(), {'hits': 0, 'misses': 1})
+
+    def test_graph(self):
+        graph = self.profile1.get_graph()
+        self.assertEqual(graph.friends, {self.profile2.id})
+        self.assertEqual(graph.blocking, set())
+        self.assertEqual(graph.blocked_by, {self.profile3.id})
+        self.assertEqual(self.profile3.get_blocking_ids(), {self.profile1.id})
+
+    def test_invalidated_on_save(self):
+        self.assertFalse(self.profile2.is_friends_with(self.profile3))
+        self.profile2.add_friend(self.profile3)
+        self.assertTrue(self.profile2.is_friends_with(self.profile3))
+        self.assertTrue(self.profile3.is_friends_with(self.profile2))
+
+    def test_invalidated_on_delete(self):
+        self.assertTrue(self.profile3.is_blocking(self.profile1))
+        self.assertTrue(self.profile1.is_blocked_by(self.profile3))
+        self.profile3.unblock(self.profile1)
+        self.assertFalse(self.profile3.is_blocking(self.profile1))
+        self.assertFalse(self.profile1.is_blocked_by(self.profile3))
+
+
+class ProfileLookupTest(TestCase):
+
+    def setUp(self):
+        self.user1 = create_user('user1', 'bob', 'smith')
+        self.user2 = create_user('user2', 'jim', 'walsh')
+
+    def test_single_query(self):
+        with self.assertNumQueries(1):
+            profile = get_profile('user1')
+            self.assertEqual(profile.get_username(), 'user1')
+        self.assertIsNone(get_profile('nobody'))
+
+    def test_memo(self):
+        token = profile_memo.set({})
+        try:
+            with self.assertNumQueries(1):
+                self.assertEqual(get_profile('user2'), self.user2.profile)
+                self.assertEqual(get_profile('user2'), self.user2.profile)
+        finally:
+            profile_memo.reset(token)
+
+    def test_rename(self):
+        # a renamed user is found in one query, where a username to id
+        # cache made a second one for the stale entry
+        get_profile('user1')
+        self.user1.username = 'renamed'
+        self.user1.save()
+        with self.assertNumQueries(2):
+            self.assertIsNone(get_profile('user1'))
+            self.assertEqual(get_profile('renamed'), self.user1.profile)
+
+    def test_delete(self):
+        get_profile('user2')
+        self.user2.delete()
+        with self.assertNumQueries(1):
+            self.assertIsNone(get_profile('user2'))
+
+    def test_check_my_profile(self):
+        profile = get_user_model().objects.get(username='user1').profile
+        with self.assertNumQueries(0):
+            self.assertIs(check_my_profile(profile, 'user1'), profile)
+        with self.assertRaises(PermissionDenied):
+            check_my_profile(profile, 'user2')
+        with self.assertRaises(Http404):
+            check_my_profile(profile, 'nobody')
@@ -0,0 +1,80 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from profiles.models import ArchivedFriendRequest, FriendRequest
+from .test_http import create_user
+
+
+class CompactRequestsTest(TestCase):
+
+    def setUp(self):
+        self.profiles = [create_user(f'user{i}').profile for i in range(6)]
+        profile1 = self.profiles[0]
+
+        # Setup Info
+        # user1 sent a request to each other user. The ones to user2, user3
+        # and user4 were accepted, rejected and canceled 60 days ago, the
+        # one to user5 was rejected 10 days ago, and the one to user6 has
+        # been pending for 60 days.
+        old = timezone.now() - timedelta(days=60)
+        recent = timezone.now() - timedelta(days=10)
+        self.old = []
+        for profile, status, created in zip(
+                self.profiles[1:], (1, 2, 4, 2, 3),
+                (old, old, old, recent, old)):
+            request = FriendRequest.objects.create(
+                from_profile=profile1, to_profile=profile, status=status)
+            FriendRequest.objects.filter(id=request.id).update(
+                created=created)
+            if status != 3 and created == old:
+                self.old.append(request.id)
+
+    def compact(self, **options):
+        out = StringIO()
+        call_command('compact_requests', stdout=out, **options)
+        return out.getvalue()
+
+    def remaining(self):
+        return FriendRequest.objects.values_list('status', flat=True) \
+            .order_by('status')
+
+    def test_archive(self):
+        output = self.compact(chunk_size=2)
+
+        self.assertIn('Archived 3 resolved requests older than 30 days in '
+                      '2 chunks.', output)
+        self.assertEqual(list(self.remaining()), [2, 3])
+        self.assertCountEqual(
+            ArchivedFriendRequest.objects.values_list('id', 'status'),
+            zip(self.old, (1, 2, 4)))
+
+    def test_delete(self):
+        output = self.compact(delete=True)
+
+        self.assertIn('Deleted 3 resolved requests', output)
+        self.assertEqual(list(self.remaining()), [2, 3])
+        self.assertFalse(ArchivedFriendRequest.objects.exists())
+
+    def test_older_than(self):
+        self.compact(older_than=5)
+        self.assertEqual(list(self.remaining()), [3])
+
+    def test_resume(self):
+        # a run stopped after a chunk is picked up by the next one
+        self.compact(chunk_size=2, max_chunks=1)
+        self.assertEqual(ArchivedFriendRequest.objects.count(), 2)
+
+        output = self.compact(chunk_size=2)
+        self.assertIn('Archived 1 resolved requests', output)
+        self.assertEqual(ArchivedFriendRequest.objects.count(), 3)
+        self.assertEqual(list(self.remaining()), [2, 3])
+
+    def test_invalid_options(self):
+        with self.assertRaises(CommandError):
+            self.compact(chunk_size=0)
+        with self.assertRaises(CommandError):
+            self.compact(throttle=-1)
@@ -0,0 +1,132 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import combinations
+
+from django.db import OperationalError, connection
+from django.test import TransactionTestCase
+
+from profiles.models import FriendRequest, Relationship
+from .test_http import create_user
+
+THREADS = 8
+
+
+def retry_locked(action):
+    # SQLite fails writes to a table another connection is writing to
+    # instead of waiting, and the whole transaction is retried
+    while True:
+        try:
+            return action()
+        except OperationalError as error:
+            if 'locked' not in str(error):
+                raise
+            time.sleep(0.001)
+
+
+class RequestTransitionTest(TransactionTestCase):
+
+    def setUp(self):
+        self.profile1 = create_user('user1', 'bob', 'smith').profile
+        self.profile2 = create_user('user2', 'jim', 'walsh').profile
+
+    def hammer(self, actions):
+        # every action starts at once, each from its own connection
+        barrier = threading.Barrier(len(actions))
+
+        def run(action):
+            barrier.wait()
+            try:
+                return retry_locked(action)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(len(actions)) as executor:
+            return list(executor.map(run, actions))
+
+    def test_single_transition(self):
+        actions = {
+            1: lambda: self.profile2.approve_request(self.profile1),
+            2: lambda: self.profile2.deny_request(self.profile1),
+            4: lambda: self.profile1.cancel_request(self.profile2),
+        }
+        statuses = [status for status in actions
+                    for __ in range(THREADS // len(actions) + 1)]
+
+        for round in range(10):
+            with self.subTest(round=round):
+                self.profile1.send_request(self.profile2)
+                results = self.hammer([actions[status]
+                                       for status in statuses])
+
+                # one call resolves the request, and the others find it
+                # resolved
+                self.assertEqual(sorted(results),
+                                 [0] * (len(statuses) - 1) + [1])
+                winner = statuses[results.index(1)]
+                request = FriendRequest.get_latest(self.profile1,
+                                                   self.profile2)
+                self.assertEqual(request.status, winner)
+                self.assertEqual(
+                    Relationship.objects.filter(status=1).count(),
+                    1 if winner == 1 else 0)
+
+                self.profile1.remove_friend(self.profile2)
+
+    def test_approve_creates_one_friendship(self):
+        self.profile1.send_request(self.profile2)
+        results = self.hammer(
+            [lambda: self.profile2.approve_request(self.profile1)] * THREADS)
+
+        self.assertEqual(sum(results), 1)
+        self.assertEqual(Relationship.objects.filter(status=1).count(), 1)
+        self.assertTrue(self.profile1.is_friends_with(self.profile2))
+
+
+class RequestCreationStressTest(TransactionTestCase):
+
+    def setUp(self):
+        self.profiles = [create_user(f'user{i}').profile for i in range(8)]
+        self.pairs = list(combinations(self.profiles, 2))
+
+    def send_all(self, rng):
+        # Both profiles of every pair send a request to the other, twice
+        # over, as clients retrying would
+        sends = [(profile, other) for pair in self.pairs
+                 for profile, other in (pair, pair[::-1])] * 2
+        rng.shuffle(sends)
+
+        def send(profiles):
+            profile, other = profiles
+            try:
+                return retry_locked(lambda: profile.send_request(other))
+            finally:
+                connection.close()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(THREADS) as executor:
+            requests = list(executor.map(send, sends))
+        return requests, time.perf_counter() - start
+
+    def test_one_pending_request_per_pair(self):
+        rng = random.Random(0)
+        timings = []
+        for round in range(4):
+            with self.subTest(round=round):
+                requests, duration = self.send_all(rng)
+                timings.append(duration)
+
+                created = [request for request in requests if request]
+                self.assertEqual(len(created), len(self.pairs))
+                pending = FriendRequest.objects.filter(status=3)
+                self.assertEqual(
+                    sorted(pending.values_list('pair', flat=True)),
+                    sorted(FriendRequest.get_pair(profile.id, other.id)
+                           for profile, other in self.pairs))
+
+                # the next round starts over
+                pending.update(status=4)
+
+        # conflicts are handled by the insert, not by piling up retries
+        self.assertLess(max(timings), 5 * min(timings), timings)
@@ -0,0 +1,122 @@
+import json
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from .test_http import PASSWORD, create_user
+
+
+class HttpETagTest(APITestCase):
+
+    def setUp(self):
+        self.user1 = create_user('user1', 'bob', 'smith')
+        self.access1 = self.login(self.user1)
+        self.user2 = create_user('user2', 'jim', 'walsh')
+        self.access2 = self.login(self.user2)
+        self.user3 = create_user('user3', 'johnny', 'fisher')
+
+        # Setup Info
+        # user1 and user2 are friends.
+        self.user1.profile.add_friend(self.user2.profile)
+
+    def login(self, user):
+        response = self.client.post(
+            reverse('accounts:login'),
+            data=json.dumps({
+                'username': user.username,
+                'password': PASSWORD,
+            }),
+            content_type='application/json'
+        )
+        return response.data['access']
+
+    def get(self, name, username, access, etag=None, **params):
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {access}'}
+        if etag is not None:
+            headers['HTTP_IF_NONE_MATCH'] = etag
+        return self.client.get(
+            reverse(name, kwargs={'username': username}), data=params,
+            **headers)
+
+    def assertNotModified(self, name, username, access, etag, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get(name, username, access, etag, **params)
+
+        self.assertEqual(status.HTTP_304_NOT_MODIFIED, response.status_code)
+        for query in queries.captured_queries:
+            self.assertNotIn('profiles_relationship', query['sql'])
+            self.assertNotIn('profiles_friendrequest', query['sql'])
+
+    def test_friends_not_modified(self):
+        response = self.get('profiles:friends', 'user2', self.access1)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        etag = response['ETag']
+
+        self.assertNotModified('profiles:friends', 'user2', self.access1,
+                               etag)
+
+        # other viewers and other pages have other ETags
+        response = self.get('profiles:friends', 'user2', self.access2, etag)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertNotEqual(etag, response['ETag'])
+        response = self.get('profiles:friends', 'user2', self.access1, etag,
+                            page_size=1)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+
+    def test_friends_modified(self):
+        etag = self.get('profiles:friends', 'user2', self.access1)['ETag']
+
+        self.user2.profile.add_friend(self.user3.profile)
+
+        response = self.get('profiles:friends', 'user2', self.access1, etag)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(len(response.data), 2)
+        self.assertNotEqual(etag, response['ETag'])
+
+    def test_friend_renamed(self):
+        etag = self.get('profiles:friends', 'user2', self.access2)['ETag']
+
+        response = self.client.patch(
+            reverse('profiles:profile', kwargs={'username': 'user1'}),
+            HTTP_AUTHORIZATION=f'Bearer {self.access1}',
+            data=json.dumps({'first_name': 'robert'}),
+            content_type='application/json'
+        )
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+
+        response = self.get('profiles:friends', 'user2', self.access2, etag)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(response.data[0]['first_name'], 'robert')
+
+    def test_requests(self):
+        etag = self.get('profiles:requests', 'user1', self.access1)['ETag']
+        self.assertNotModified('profiles:requests', 'user1', self.access1,
+                               etag)
+
+        self.user3.profile.send_request(self.user1.profile)
+
+        response = self.get('profiles:requests', 'user1', self.access1, etag)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(len(response.data), 1)
+
+    def test_blocking(self):
+        etag = self.get('profiles:blocking', 'user1', self.access1)['ETag']
+        self.assertNotModified('profiles:blocking', 'user1', self.access1,
+                               etag)
+
+        self.user1.profile.block(self.user3.profile)
+
+        response = self.get('profiles:blocking', 'user1', self.access1, etag)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(len(response.data), 1)
+
+    def test_blocked_viewer(self):
+        etag = self.get('profiles:friends', 'user2', self.access1)['ETag']
+
+        self.user2.profile.block(self.user1.profile)
+
+        response = self.get('profiles:friends', 'user2', self.access1, etag)
+        self.assertEqual(status.HTTP_404_NOT_FOUND, response.status_code)
@@ -0,0 +1,145 @@
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.db import IntegrityError
+from django.test import TransactionTestCase
+
+from accounts.serializers import LoginSerializer
+from messages.asgi import application
+from profiles.models import FriendRequest, Profile
+from .test_http import create_user
+
+
+def access_token(user):
+    return str(LoginSerializer.get_token(user).access_token)
+
+
+class EventsTestCase(TransactionTestCase):
+    # Events are only pushed once transactions commit
+
+    def setUp(self):
+        self.user1 = create_user('user1', 'bob', 'smith')
+        self.user2 = create_user('user2', 'jim', 'walsh')
+        self.profile1 = self.user1.profile
+        self.profile2 = self.user2.profile
+
+    async def connect(self, user, path='/ws/events/?token={}'):
+        communicator = WebsocketCommunicator(
+            application, path.format(access_token(user)))
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+
+class WebsocketEventsTest(EventsTestCase):
+
+    def test_rejects_anonymous(self):
+        async def test():
+            communicator = WebsocketCommunicator(application, '/ws/events/')
+            connected, _ = await communicator.connect()
+            self.assertFalse(connected)
+        async_to_sync(test)()
+
+    def test_rejects_invalid_token(self):
+        async def test():
+            communicator = WebsocketCommunicator(
+                application, '/ws/events/?token=invalid')
+            connected, _ = await communicator.connect()
+            self.assertFalse(connected)
+        async_to_sync(test)()
+
+    def test_authorization_header(self):
+        async def test():
+            communicator = WebsocketCommunicator(
+                application, '/ws/events/', headers=[(
+                    b'authorization',
+                    f'Bearer {access_token(self.user1)}'.encode())])
+            connected, _ = await communicator.connect()
+            self.assertTrue(connected)
+            await communicator.disconnect()
+        async_to_sync(test)()
+
+    def test_friend_request(self):
+        async def test():
+            communicator1 = await self.connect(self.user1)
+            communicator2 = await self.connect(self.user2)
+
+            await database_sync_to_async(self.profile1.send_request)(
+                self.profile2)
+
+            for communicator in (communicator1, communicator2):
+                event = await communicator.receive_json_from()
+                self.assertEqual(event['type'], 'friend_request')
+                self.assertEqual(event['request']['from_user'], 'user1')
+                self.assertEqual(event['request']['to_user'], 'user2')
+                self.assertEqual(event['request']['status'], 3)
+
+            await communicator1.disconnect()
+            await communicator2.disconnect()
+        async_to_sync(test)()
+
+    def test_friendship(self):
+        self.profile1.send_request(self.profile2)
+
+        async def test():
+            communicator1 = await self.connect(self.user1)
+
+            await database_sync_to_async(self.profile2.approve_request)(
+                self.profile1)
+
+            event = await communicator1.receive_json_from()
+            self.assertEqual(event['type'], 'friend_request')
+            self.assertEqual(event['request']['status'], 1)
+
+            event = await communicator1.receive_json_from()
+            self.assertEqual(event, {
+                'type': 'relationship',
+                'action': 'created',
+                'username': 'user2',
+                'status': 'friends',
+            })
+            self.assertTrue(await communicator1.receive_nothing())
+
+            await communicator1.disconnect()
+        async_to_sync(test)()
+
+    def test_rolled_back_approval(self):
+        self.profile1.send_request(self.profile2)
+
+        def approve():
+            with mock.patch.object(Profile, 'add_relationship',
+                                   side_effect=IntegrityError):
+                with self.assertRaises(IntegrityError):
+                    self.profile2.approve_request(self.profile1)
+
+        async def test():
+            communicator1 = await self.connect(self.user1)
+
+            # the acceptance is rolled back with the friendship, and never
+            # pushed
+            await database_sync_to_async(approve)()
+            self.assertTrue(await communicator1.receive_nothing())
+
+            await communicator1.disconnect()
+        async_to_sync(test)()
+
+        self.assertEqual(
+            FriendRequest.get_latest(self.profile1, self.profile2).status, 3)
+
+    def test_blocks_are_not_pushed_to_blocked(self):
+        async def test():
+            communicator1 = await self.connect(self.user1)
+            communicator2 = await self.connect(self.user2)
+
+            await database_sync_to_async(self.profile1.bulk_block)(
+                [self.profile2])
+
+            event = await communicator1.receive_json_from()
+            self.assertEqual(event['status'], 'blocked')
+            self.assertTrue(await communicator2.receive_nothing())
+
+            await communicator1.disconnect()
+            await communicator2.disconnect()
+        async_to_sync(test)()
@@ -2,7 +2,10 @@ import json
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework.reverse import reverse
+from profiles.models import FriendRequest
 
 PASSWORD = 'password1'
 
@@ -58,6 +61,8 @@ class HttpProfileTest(APITestCase):
         self.assertEqual(response.data['username'], self.user1.username)
         self.assertEqual(response.data['first_name'], self.user1.first_name)
         self.assertEqual(response.data['last_name'], self.user1.last_name)
+        self.assertEqual(response.data['friend_count'], 0)
+        self.assertEqual(response.data['incoming_pending_count'], 0)
 
     def test_get_other_profile(self):
         response = self.client.get(
@@ -70,6 +75,7 @@ class HttpProfileTest(APITestCase):
         self.assertEqual(response.data['username'], self.user2.username)
         self.assertEqual(response.data['first_name'], self.user2.first_name)
         self.assertEqual(response.data['last_name'], self.user2.last_name)
+        self.assertNotIn('friend_count', response.data)
 
     def test_update_my_profile(self):
         new_first_name = "jimmy"
@@ -91,6 +97,23 @@ class HttpProfileTest(APITestCase):
         self.assertEqual(response.data['first_name'], new_first_name)
         self.assertEqual(response.data['last_name'], new_last_name)
 
+    def test_update_my_profile_twice(self):
+        # the names in the token are those of the login, and are not
+        # written back over the first update
+        url = reverse('profiles:profile',
+                      kwargs={'username': self.user1.username})
+        for data in ({'last_name': 'wallace'}, {'first_name': 'jimmy'}):
+            response = self.client.patch(
+                url, HTTP_AUTHORIZATION=f'Bearer {self.access1}',
+                data=json.dumps(data), content_type='application/json')
+            self.assertEqual(status.HTTP_200_OK, response.status_code)
+
+        self.assertEqual(response.data['first_name'], 'jimmy')
+        self.assertEqual(response.data['last_name'], 'wallace')
+        self.user1.refresh_from_db()
+        self.assertEqual(self.user1.first_name, 'jimmy')
+        self.assertEqual(self.user1.last_name, 'wallace')
+
     def test_update_other_profile(self):
         new_first_name = "jimmy"
         new_last_name = "wallace"
@@ -216,6 +239,24 @@ class HttpFriendsTest(APITestCase):
         self.assertEqual(outgoing_requests[0]['to_user'], self.user3.username)
         self.assertEqual(outgoing_requests[0]['status'], 3)
 
+    # Testing user1 sending a friend request to themselves
+    def test_send_request_to_self(self):
+        response = self.client.post(
+            reverse('profiles:friends',
+                    kwargs={'username': self.user1.username}),
+            HTTP_AUTHORIZATION=f'Bearer {self.access1}',
+            data=json.dumps({
+                "username": f"{self.user1.username}"
+            }),
+            content_type='application/json'
+        )
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertEqual(response.data['detail'].code, 'own_profile')
+        self.assertFalse(FriendRequest.objects.filter(
+            from_profile=self.user1.profile,
+            to_profile=self.user1.profile).exists())
+
     # Check that user2 has an outgoing request to user3
     def test_get_outgoing_requests(self):
         response = self.client.get(
@@ -713,3 +754,49 @@ class HttpBlockingTest(APITestCase):
         self.assertEqual(response.data['username'], self.user3.username)
         self.assertEqual(response.data['first_name'], self.user3.first_name)
         self.assertEqual(response.data['last_name'], self.user3.last_name)
+
+    def test_friends_hide_blockers(self):
+        # user2 and user3 become friends, but user3 is blocking user1, so
+        # user1 should not see user3 in user2's friends list
+        self.user3.profile.approve_request(self.user2.profile)
+
+        response = self.client.get(
+            reverse('profiles:friends',
+                    kwargs={'username': self.user2.username}),
+            HTTP_AUTHORIZATION=f'Bearer {self.access1}'
+        )
+
+        friends = response.data
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(len(friends), 1)
+        self.assertEqual(friends[0]['username'], self.user1.username)
+
+        # user2 still sees both friends
+        response2 = self.client.get(
+            reverse('profiles:friends',
+                    kwargs={'username': self.user2.username}),
+            HTTP_AUTHORIZATION=f'Bearer {self.access2}'
+        )
+
+        self.assertEqual(status.HTTP_200_OK, response2.status_code)
+        self.assertEqual(len(response2.data), 2)
+
+    def test_friends_query_count(self):
+        url = reverse('profiles:friends',
+                      kwargs={'username': self.user2.username})
+
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {self.access1}')
+
+        for i in range(5):
+            friend = create_user(f'friend{i}')
+            self.user2.profile.add_friend(friend.profile)
+            friend.profile.block(self.user1.profile)
+
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(
+                url, HTTP_AUTHORIZATION=f'Bearer {self.access1}')
+
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(few.captured_queries),
+                         len(many.captured_queries))
@@ -0,0 +1,133 @@
+from unittest import skipUnless
+
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+from django.utils import timezone
+
+from profiles.models import Relationship, FriendRequest
+from .test_http import create_user
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Query plans are SQLite specific')
+class IndexUsageTest(TestCase):
+
+    def setUp(self):
+        self.profile1 = create_user('user1', 'bob', 'smith').profile
+        self.profile2 = create_user('user2', 'jim', 'walsh').profile
+        self.profile1.add_friend(self.profile2)
+        self.profile2.send_request(create_user('user3').profile)
+
+    def assertUsesIndex(self, queryset, table, index=None):
+        plan = queryset.explain()
+        self.assertNotIn(f'SCAN {table}', plan)
+        self.assertIn(f'SEARCH {table} USING', plan)
+        if index is not None:
+            self.assertIn(index, plan)
+
+    def test_relationship_pair(self):
+        self.assertUsesIndex(
+            Relationship.objects.filter(from_profile=self.profile1,
+                                        to_profile=self.profile2,
+                                        status=2),
+            'profiles_relationship')
+
+    # List queries are checked in the (created, id) order they are
+    # paginated in
+
+    def assertFriendsUseIndexes(self, querysets):
+        # Each side of the friendships is read in order from its own index,
+        # without sorting the profile's whole friend list
+        for queryset, index in zip(querysets,
+                                   ('relationship_from_status_idx',
+                                    'relationship_to_status_idx')):
+            plan = queryset.order_by('rel_created', 'rel_id')[:51].explain()
+            self.assertNotIn('SCAN', plan)
+            self.assertNotIn('USE TEMP B-TREE', plan)
+            self.assertIn(index, plan)
+
+    def test_relationships(self):
+        self.assertUsesIndex(
+            self.profile1.get_blocking().order_by('rel_created', 'rel_id'),
+            'profiles_relationship',
+            'relationship_from_status_idx')
+
+    def test_friends(self):
+        self.assertFriendsUseIndexes(self.profile1.get_friendships())
+
+    def test_related_to(self):
+        self.assertUsesIndex(
+            self.profile1.get_related_to(2).order_by('rel_created', 'rel_id'),
+            'profiles_relationship',
+            'relationship_to_status_idx')
+
+    def test_mutual_friends(self):
+        self.assertFriendsUseIndexes(
+            self.profile1.get_mutual_friendships(self.profile2))
+
+    def test_incoming_pending(self):
+        self.assertUsesIndex(
+            self.profile1.get_incoming_pending().order_by('created', 'id'),
+            'profiles_friendrequest',
+            'request_incoming_pending_idx')
+
+    def test_outgoing_pending(self):
+        self.assertUsesIndex(
+            self.profile1.get_outgoing_pending().order_by('created', 'id'),
+            'profiles_friendrequest',
+            'request_outgoing_pending_idx')
+
+    def test_resolved_requests(self):
+        self.assertUsesIndex(
+            FriendRequest.objects.filter(created__lt=timezone.now())
+            .exclude(status=3).order_by('created', 'id'),
+            'profiles_friendrequest',
+            'request_resolved_idx')
+
+    def test_pending_pair(self):
+        self.assertUsesIndex(
+            self.profile1.get_outgoing_pending().filter(
+                to_profile=self.profile2),
+            'profiles_friendrequest',
+            'unique_pending_request')
+
+
+class ConstraintTest(TestCase):
+
+    def setUp(self):
+        self.profile1 = create_user('user1', 'bob', 'smith').profile
+        self.profile2 = create_user('user2', 'jim', 'walsh').profile
+
+    def test_duplicate_relationship(self):
+        Relationship.objects.create(from_profile=self.profile1,
+                                    to_profile=self.profile2, status=2)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Relationship.objects.create(from_profile=self.profile1,
+                                        to_profile=self.profile2, status=2)
+
+    def test_duplicate_pending_request(self):
+        FriendRequest.objects.create(from_profile=self.profile1,
+                                     to_profile=self.profile2, status=3)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            FriendRequest.objects.create(from_profile=self.profile1,
+                                         to_profile=self.profile2, status=3)
+
+        # resolved requests are not constrained
+        FriendRequest.objects.create(from_profile=self.profile1,
+                                     to_profile=self.profile2, status=4)
+        FriendRequest.objects.create(from_profile=self.profile1,
+                                     to_profile=self.profile2, status=4)
+
+    def test_pending_request_each_way(self):
+        FriendRequest.objects.create(from_profile=self.profile1,
+                                     to_profile=self.profile2, status=3)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            FriendRequest.objects.create(from_profile=self.profile2,
+                                         to_profile=self.profile1, status=3)
+
+    def test_conflicting_send_request(self):
+        # the insert skips the pair's pending request, from either side
+        request = self.profile1.send_request(self.profile2)
+        state = self.profile2.get_relationship_state(self.profile1)
+        state.pending_from = False
+        self.assertIsNone(self.profile2.send_request(self.profile1, state))
+        self.assertEqual(list(FriendRequest.objects.all()), [request])
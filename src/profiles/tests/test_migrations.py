@@ -0,0 +1,94 @@
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+from profiles.models import FriendRequest, Profile, Relationship
+from .test_http import create_user
+
+
+class DataMigrationsTest(TransactionTestCase):
+    before = [('profiles', '0006_friendsuggestion')]
+
+    def setUp(self):
+        # the users are created with the current models, as the signal
+        # creating their profiles uses them
+        self.profile1, self.profile2, self.profile3 = [
+            create_user(f'user{i}').profile for i in range(1, 4)]
+
+        self.migrate(self.before)
+        apps = self.executor.loader.project_state(self.before).apps
+        self.profiles = apps.get_model('profiles', 'Profile')
+        self.relationships = apps.get_model('profiles', 'Relationship')
+        self.requests = apps.get_model('profiles', 'FriendRequest')
+
+    def tearDown(self):
+        self.migrate(self.executor.loader.graph.leaf_nodes())
+
+    def migrate(self, targets):
+        self.executor = MigrationExecutor(connection)
+        self.executor.migrate(targets)
+        self.executor.loader.build_graph()
+
+    def test_canonicalize_and_recount(self):
+        # Setup Info
+        # user1 and user2 are friends, stored both ways.
+        # user2 and user3 are friends, stored from user3 only.
+        # user3 is blocking user1.
+        for from_id, to_id, status in (
+                (self.profile1.id, self.profile2.id, 1),
+                (self.profile2.id, self.profile1.id, 1),
+                (self.profile3.id, self.profile2.id, 1),
+                (self.profile3.id, self.profile1.id, 2)):
+            self.relationships.objects.create(
+                from_profile_id=from_id, to_profile_id=to_id, status=status)
+
+        self.migrate(self.executor.loader.graph.leaf_nodes())
+
+        self.assertCountEqual(
+            Relationship.objects.values_list(
+                'from_profile', 'to_profile', 'status'),
+            [(self.profile1.id, self.profile2.id, 1),
+             (self.profile2.id, self.profile3.id, 1),
+             (self.profile3.id, self.profile1.id, 2)])
+        self.assertEqual(
+            list(Profile.objects.order_by('id').values_list(
+                *Profile.COUNTERS)),
+            [(1, 0, 0, 0), (2, 0, 0, 0), (1, 1, 0, 0)])
+
+    def test_pending_pairs(self):
+        # Setup Info
+        # user1 and user2 have sent each other a request, user2's first.
+        # user1 has a pending request to user3, who had a request to user1
+        # rejected.
+        for from_id, to_id, status in (
+                (self.profile2.id, self.profile1.id, 3),
+                (self.profile1.id, self.profile2.id, 3),
+                (self.profile1.id, self.profile3.id, 3),
+                (self.profile3.id, self.profile1.id, 2)):
+            self.requests.objects.create(
+                from_profile_id=from_id, to_profile_id=to_id, status=status)
+        versions = dict(self.profiles.objects.values_list(
+            'id', 'graph_version'))
+
+        self.migrate(self.executor.loader.graph.leaf_nodes())
+
+        self.assertCountEqual(
+            FriendRequest.objects.values_list(
+                'from_profile', 'to_profile', 'status', 'pair'),
+            [(self.profile2.id, self.profile1.id, 3,
+              f'{self.profile1.id}:{self.profile2.id}'),
+             (self.profile1.id, self.profile2.id, 4,
+              f'{self.profile1.id}:{self.profile2.id}'),
+             (self.profile1.id, self.profile3.id, 3,
+              f'{self.profile1.id}:{self.profile3.id}'),
+             (self.profile3.id, self.profile1.id, 2,
+              f'{self.profile1.id}:{self.profile3.id}')])
+        self.assertEqual(
+            Profile.objects.get(id=self.profile1.id).outgoing_pending_count,
+            1)
+        # the request lists of user1 and user2 changed
+        self.assertEqual(
+            dict(Profile.objects.values_list('id', 'graph_version')),
+            {self.profile1.id: versions[self.profile1.id] + 1,
+             self.profile2.id: versions[self.profile2.id] + 1,
+             self.profile3.id: versions[self.profile3.id]})
@@ -0,0 +1,193 @@
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+
+from profiles.models import Relationship
+from .test_http import create_user
+
+
+class RelationshipStateTest(TestCase):
+
+    def setUp(self):
+        self.profile1 = create_user('user1', 'bob', 'smith').profile
+        self.profile2 = create_user('user2', 'jim', 'walsh').profile
+        self.profile3 = create_user('user3', 'johnny', 'fisher').profile
+
+        # Setup Info
+        # user1 and user2 are friends.
+        # user2 has a pending friend request to user3.
+        # user3 is blocking user1.
+        self.profile1.add_friend(self.profile2)
+        self.profile2.send_request(self.profile3)
+        self.profile3.block(self.profile1)
+
+    def test_single_query(self):
+        with self.assertNumQueries(1):
+            self.profile1.get_relationship_state(self.profile2)
+
+    def test_friends(self):
+        state = self.profile1.get_relationship_state(self.profile2)
+        self.assertTrue(state.friends)
+        self.assertFalse(state.blocking)
+        self.assertFalse(state.blocked_by)
+        self.assertFalse(state.has_pending_request)
+
+    def test_pending(self):
+        state = self.profile2.get_relationship_state(self.profile3)
+        self.assertTrue(state.pending_to)
+        self.assertFalse(state.pending_from)
+        self.assertFalse(state.friends)
+
+        state = self.profile3.get_relationship_state(self.profile2)
+        self.assertFalse(state.pending_to)
+        self.assertTrue(state.pending_from)
+
+    def test_blocking(self):
+        state = self.profile3.get_relationship_state(self.profile1)
+        self.assertTrue(state.blocking)
+        self.assertFalse(state.blocked_by)
+
+        state = self.profile1.get_relationship_state(self.profile3)
+        self.assertFalse(state.blocking)
+        self.assertTrue(state.blocked_by)
+
+
+class FriendshipStorageTest(TestCase):
+
+    def setUp(self):
+        self.profile1 = create_user('user1', 'bob', 'smith').profile
+        self.profile2 = create_user('user2', 'jim', 'walsh').profile
+        self.profile3 = create_user('user3', 'johnny', 'fisher').profile
+
+    def friendships(self):
+        return list(Relationship.objects.filter(status=1).values_list(
+            'from_profile', 'to_profile'))
+
+    def test_single_row(self):
+        # added from the higher id, stored from the lower one
+        self.profile2.add_friend(self.profile1)
+        self.profile3.add_friend(self.profile2)
+
+        self.assertCountEqual(self.friendships(), [
+            (self.profile1.id, self.profile2.id),
+            (self.profile2.id, self.profile3.id),
+        ])
+
+    def test_read_from_both_sides(self):
+        self.profile2.add_friend(self.profile1)
+        self.profile2.add_friend(self.profile3)
+
+        self.assertCountEqual(self.profile2.get_friends(),
+                              [self.profile1, self.profile3])
+        self.assertEqual(list(self.profile1.get_friends()), [self.profile2])
+        self.assertEqual(list(self.profile3.get_friends()), [self.profile2])
+        self.assertTrue(self.profile1.is_friends_with(self.profile2))
+        self.assertTrue(self.profile3.is_friends_with(self.profile2))
+        self.assertFalse(self.profile1.is_friends_with(self.profile3))
+        self.assertEqual(
+            list(self.profile1.get_mutual_friends(self.profile3)),
+            [self.profile2])
+
+        # the friendship's row is paginated on from both sides
+        friendship = Relationship.objects.get(
+            from_profile=self.profile1, to_profile=self.profile2)
+        for profile, friend in ((self.profile1, self.profile2),
+                                (self.profile2, self.profile1)):
+            row, = [row for queryset in profile.get_friendships()
+                    for row in queryset.filter(id=friend.id)]
+            self.assertEqual((row.rel_created, row.rel_id),
+                             (friendship.created, friendship.id))
+
+    def test_remove_from_either_side(self):
+        self.profile1.add_friend(self.profile2)
+        self.profile2.remove_friend(self.profile1)
+        self.assertEqual(self.friendships(), [])
+        self.assertFalse(self.profile1.is_friends_with(self.profile2))
+
+    def test_blocks_are_directional(self):
+        self.profile2.block(self.profile1)
+        self.assertTrue(self.profile2.is_blocking(self.profile1))
+        self.assertTrue(self.profile1.is_blocked_by(self.profile2))
+        self.assertFalse(self.profile1.is_blocking(self.profile2))
+
+    def test_canonical_constraint(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Relationship.objects.create(from_profile=self.profile2,
+                                        to_profile=self.profile1, status=1)
+
+
+class ProfileCountersTest(TestCase):
+
+    def setUp(self):
+        self.profile1 = create_user('user1', 'bob', 'smith').profile
+        self.profile2 = create_user('user2', 'jim', 'walsh').profile
+        self.profile3 = create_user('user3', 'johnny', 'fisher').profile
+        self.profile4 = create_user('user4', 'mary', 'jones').profile
+
+    def assertCounters(self, profile, friends=0, blocking=0, incoming=0,
+                       outgoing=0):
+        profile.refresh_from_db()
+        self.assertEqual(
+            (profile.friend_count, profile.blocking_count,
+             profile.incoming_pending_count, profile.outgoing_pending_count),
+            (friends, blocking, incoming, outgoing))
+
+    def test_requests(self):
+        self.profile1.send_request(self.profile2)
+        self.profile1.bulk_send_requests([self.profile3, self.profile4])
+        self.assertCounters(self.profile1, outgoing=3)
+        self.assertCounters(self.profile2, incoming=1)
+
+        # a request that is not created is not counted
+        self.profile2.send_request(self.profile1)
+        self.assertCounters(self.profile2, incoming=1)
+
+        self.profile2.approve_request(self.profile1)
+        self.profile3.deny_request(self.profile1)
+        self.profile1.cancel_request(self.profile4)
+        self.assertCounters(self.profile1, friends=1)
+        self.assertCounters(self.profile2, friends=1)
+        self.assertCounters(self.profile3)
+        self.assertCounters(self.profile4)
+
+        # resolved requests are not resolved twice
+        self.profile1.cancel_request(self.profile4)
+        self.assertCounters(self.profile4)
+
+    def test_relationships(self):
+        self.profile1.add_friend(self.profile2)
+        self.profile1.add_friend(self.profile2)
+        self.profile3.add_friend(self.profile1)
+        self.profile4.block(self.profile1)
+        self.assertCounters(self.profile1, friends=2)
+        self.assertCounters(self.profile2, friends=1)
+        self.assertCounters(self.profile4, blocking=1)
+
+        self.profile2.remove_friend(self.profile1)
+        self.profile4.unblock(self.profile1)
+        self.assertCounters(self.profile1, friends=1)
+        self.assertCounters(self.profile2)
+        self.assertCounters(self.profile4)
+
+    def test_bulk_block(self):
+        self.profile1.add_friend(self.profile2)
+        self.profile1.send_request(self.profile3)
+        self.profile4.send_request(self.profile1)
+
+        self.profile1.bulk_block([self.profile2, self.profile3,
+                                  self.profile4])
+        self.assertCounters(self.profile1, blocking=3)
+        for profile in (self.profile2, self.profile3, self.profile4):
+            self.assertCounters(profile)
+
+        self.profile1.bulk_unblock([self.profile2, self.profile3])
+        self.assertCounters(self.profile1, blocking=1)
+
+    def test_deleted_profile(self):
+        self.profile1.add_friend(self.profile2)
+        self.profile3.block(self.profile1)
+        self.profile1.send_request(self.profile4)
+
+        self.profile1.user.delete()
+        self.assertCounters(self.profile2)
+        self.assertCounters(self.profile3)
+        self.assertCounters(self.profile4)
@@ -0,0 +1,78 @@
+import json
+
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from .test_http import PASSWORD, create_user
+
+
+class HttpMutualFriendsTest(APITestCase):
+
+    def setUp(self):
+        self.user1 = create_user('user1', 'bob', 'smith')
+        response = self.client.post(
+            reverse('accounts:login'),
+            data=json.dumps({
+                'username': self.user1.username,
+                'password': PASSWORD,
+            }),
+            content_type='application/json'
+        )
+        self.access1 = response.data['access']
+
+        self.users = [create_user(f'user{i}') for i in range(2, 8)]
+        user2, user3, user4, user5, user6, user7 = \
+            [user.profile for user in self.users]
+
+        # Setup Info
+        # user1 is friends with user3, user4, user5 and user2.
+        # user2 is friends with user5, user4, user3 and user6.
+        # user7 is blocking user1.
+        profile1 = self.user1.profile
+        for profile in (user3, user4, user5, user2):
+            profile1.add_friend(profile)
+        for profile in (user5, user4, user3, user6):
+            user2.add_friend(profile)
+        user7.block(profile1)
+
+    def get(self, username, **params):
+        return self.client.get(
+            reverse('profiles:friends-mutual',
+                    kwargs={'username': username}),
+            data=params,
+            HTTP_AUTHORIZATION=f'Bearer {self.access1}'
+        )
+
+    def test_mutual_friends(self):
+        response = self.get('user2')
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        # in the order user1 became friends with them
+        self.assertEqual([friend['username'] for friend in response.data],
+                         ['user3', 'user4', 'user5'])
+
+    def test_mutual_friends_pages(self):
+        response = self.get('user2', page_size=2)
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual([friend['username'] for friend in response.data],
+                         ['user3', 'user4'])
+        self.assertIn('rel="next"', response['Link'])
+
+    def test_mutual_friends_count(self):
+        response = self.get('user2', count='1')
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(response.data, {'count': 3})
+
+        response = self.get('user6', count='1')
+        self.assertEqual(response.data, {'count': 1})
+
+    def test_blocking_profile(self):
+        response = self.get('user7')
+        self.assertEqual(status.HTTP_404_NOT_FOUND, response.status_code)
+
+    def test_invalid_count(self):
+        response = self.get('user2', count='yes')
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
@@ -0,0 +1,131 @@
+import json
+import re
+
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from .test_http import PASSWORD, create_user
+
+
+def next_link(response):
+    match = re.match(r'<(.+)>; rel="next"', response.get('Link', ''))
+    if match is None:
+        return None
+    return match.group(1)
+
+
+class HttpPaginationTest(APITestCase):
+
+    def setUp(self):
+        self.user1 = create_user('user1', 'bob', 'smith')
+        response = self.client.post(
+            reverse('accounts:login'),
+            data=json.dumps({
+                'username': self.user1.username,
+                'password': PASSWORD,
+            }),
+            content_type='application/json'
+        )
+        self.access1 = response.data['access']
+
+        # Setup Info
+        # user1 is friends with, blocking, and has pending requests from
+        # five users each.
+        self.friends = []
+        self.blocked = []
+        self.requesters = []
+        for i in range(5):
+            friend = create_user(f'friend{i}')
+            self.user1.profile.add_friend(friend.profile)
+            self.friends.append(friend.username)
+
+            blocked = create_user(f'blocked{i}')
+            self.user1.profile.block(blocked.profile)
+            self.blocked.append(blocked.username)
+
+            requester = create_user(f'requester{i}')
+            requester.profile.send_request(self.user1.profile)
+            self.requesters.append(requester.username)
+
+    def get_all_pages(self, url, page_size):
+        pages = []
+        url = f'{url}?page_size={page_size}'
+        while url is not None:
+            response = self.client.get(
+                url, HTTP_AUTHORIZATION=f'Bearer {self.access1}')
+            self.assertEqual(status.HTTP_200_OK, response.status_code)
+            self.assertLessEqual(len(response.data), page_size)
+            pages.append(response.data)
+            url = next_link(response)
+        return pages
+
+    def test_friends_pages(self):
+        pages = self.get_all_pages(
+            reverse('profiles:friends',
+                    kwargs={'username': self.user1.username}), 2)
+
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual(
+            [friend['username'] for page in pages for friend in page],
+            self.friends)
+
+    def test_friends_pages_from_both_sides(self):
+        # friend2's friendships are stored from friend2 with friend3 and
+        # friend4, and from the other profile with user1 and friend1
+        profiles = {user.username: user.profile for user in
+                    get_user_model().objects.filter(
+                        username__startswith='friend')}
+        friend2 = profiles['friend2']
+        for username in ('friend3', 'friend1', 'friend4'):
+            friend2.add_friend(profiles[username])
+
+        for page_size in (1, 3):
+            pages = self.get_all_pages(
+                reverse('profiles:friends', kwargs={'username': 'friend2'}),
+                page_size)
+            self.assertEqual(
+                [friend['username'] for page in pages for friend in page],
+                ['user1', 'friend3', 'friend1', 'friend4'])
+
+    def test_blocking_pages(self):
+        pages = self.get_all_pages(
+            reverse('profiles:blocking',
+                    kwargs={'username': self.user1.username}), 3)
+
+        self.assertEqual([len(page) for page in pages], [3, 2])
+        self.assertEqual(
+            [blocked['username'] for page in pages for blocked in page],
+            self.blocked)
+
+    def test_requests_pages(self):
+        pages = self.get_all_pages(
+            reverse('profiles:requests',
+                    kwargs={'username': self.user1.username}), 5)
+
+        self.assertEqual([len(page) for page in pages], [5])
+        self.assertEqual(
+            [request['from_user'] for page in pages for request in page],
+            self.requesters)
+
+    def test_default_page_size(self):
+        response = self.client.get(
+            reverse('profiles:friends',
+                    kwargs={'username': self.user1.username}),
+            HTTP_AUTHORIZATION=f'Bearer {self.access1}'
+        )
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(len(response.data), 5)
+        self.assertIsNone(next_link(response))
+
+    def test_invalid_cursor(self):
+        response = self.client.get(
+            reverse('profiles:friends',
+                    kwargs={'username': self.user1.username}),
+            data={'cursor': 'not-a-cursor'},
+            HTTP_AUTHORIZATION=f'Bearer {self.access1}'
+        )
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
@@ -0,0 +1,54 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from profiles.models import FriendRequest, Profile, Relationship
+from .test_http import create_user
+
+
+class RecountProfilesTest(TestCase):
+
+    def setUp(self):
+        self.profiles = [create_user(f'user{i}').profile for i in range(5)]
+        profile1, profile2, profile3, profile4, __ = self.profiles
+
+        # Setup Info
+        # user1 and user2 are friends, user3 is blocking user1 and user4
+        # has a pending request to user1, written around the model methods
+        # so the counters are left at 0.
+        Relationship.objects.create(from_profile=profile1,
+                                    to_profile=profile2, status=1)
+        Relationship.objects.create(from_profile=profile3,
+                                    to_profile=profile1, status=2)
+        FriendRequest.objects.create(from_profile=profile4,
+                                     to_profile=profile1, status=3)
+
+    def recount(self, **options):
+        out = StringIO()
+        call_command('recount_profiles', stdout=out, **options)
+        return out.getvalue()
+
+    def counters(self):
+        return list(Profile.objects.order_by('id').values_list(
+            *Profile.COUNTERS))
+
+    def test_recount(self):
+        output = self.recount(chunk_size=2)
+
+        self.assertIn('Recounted 4 of 5 profiles.', output)
+        self.assertEqual(self.counters(), [
+            (1, 0, 1, 0),
+            (1, 0, 0, 0),
+            (0, 1, 0, 0),
+            (0, 0, 0, 1),
+            (0, 0, 0, 0),
+        ])
+
+        # counters kept up to date are left alone
+        self.profiles[1].remove_friend(self.profiles[0])
+        self.assertIn('Recounted 0 of 5 profiles.', self.recount())
+
+    def test_invalid_chunk_size(self):
+        with self.assertRaises(CommandError):
+            self.recount(chunk_size=0)
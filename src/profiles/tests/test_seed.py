@@ -0,0 +1,110 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from profiles.models import Profile, Relationship, FriendRequest
+
+
+class SeedGraphTest(TestCase):
+
+    def seed(self, **options):
+        options = {'users': 50, 'friendships': 100, 'blocks': 5,
+                   'requests': 10, 'seed': 3, **options}
+        call_command('seed_graph', stdout=StringIO(), **options)
+
+    def edges(self, model, prefix, status):
+        # pairs of user numbers, so graphs of different prefixes compare
+        rows = model.objects.filter(
+            from_profile__user__username__startswith=prefix,
+            status=status,
+        ).values_list('from_profile__user__username',
+                      'to_profile__user__username')
+        return {(int(source[len(prefix):]), int(target[len(prefix):]))
+                for source, target in rows}
+
+    def test_counts(self):
+        self.seed()
+
+        self.assertEqual(Profile.objects.count(), 50)
+        self.assertEqual(Relationship.objects.filter(status=1).count(), 100)
+        self.assertEqual(Relationship.objects.filter(status=2).count(), 5)
+        self.assertEqual(FriendRequest.objects.filter(status=3).count(), 10)
+
+    def test_zero_counts(self):
+        self.seed(users=5, friendships=0, requests=0, blocks=None)
+
+        self.assertEqual(Profile.objects.count(), 5)
+        self.assertFalse(Relationship.objects.exists())
+        self.assertFalse(FriendRequest.objects.exists())
+
+    def test_counters(self):
+        self.seed()
+
+        counted = Profile.objects.annotate(**{
+            f'counted_{name}': expression
+            for name, expression in Profile.get_counted().items()})
+        for profile in counted:
+            for name in Profile.COUNTERS:
+                self.assertEqual(getattr(profile, name),
+                                 getattr(profile, f'counted_{name}'))
+        self.assertEqual(sum(profile.friend_count for profile in counted),
+                         200)
+
+    def test_consistent_graph(self):
+        self.seed()
+        friends = self.edges(Relationship, 'seed', 1)
+        blocks = self.edges(Relationship, 'seed', 2)
+        requests = self.edges(FriendRequest, 'seed', 3)
+
+        # friendships are stored once from the lower id, and pairs have at
+        # most one of a friendship, a block or a pending request
+        self.assertTrue(all(a < b for a, b in friends))
+        unordered = [frozenset(pair) for pair in requests] \
+            + [frozenset(pair) for pair in friends]
+        self.assertEqual(len(unordered), len(set(unordered)))
+        self.assertFalse({frozenset(pair) for pair in blocks}
+                         & set(unordered))
+        self.assertFalse(any(a == b for a, b in friends | blocks | requests))
+
+    def test_deterministic(self):
+        self.seed(prefix='first')
+        self.seed(prefix='second')
+        self.seed(prefix='other', seed=4)
+
+        for model, status in ((Relationship, 1), (Relationship, 2),
+                              (FriendRequest, 3)):
+            self.assertEqual(self.edges(model, 'first', status),
+                             self.edges(model, 'second', status))
+            self.assertNotEqual(self.edges(model, 'first', status),
+                                self.edges(model, 'other', status))
+
+    def test_keyset_order(self):
+        # the same seed gives rows the same ids, under a prefix, and the
+        # same order on (created, id)
+        def rows(prefix):
+            return list(Relationship.objects.filter(
+                from_profile__user__username__startswith=prefix,
+            ).order_by('created', 'id').values_list(
+                'id', 'from_profile__user__username',
+                'to_profile__user__username'))
+
+        self.seed(prefix='first')
+        first = rows('first')
+        get_user_model().objects.filter(
+            username__startswith='first').delete()
+        self.seed(prefix='first')
+
+        self.assertEqual(rows('first'), first)
+        self.assertGreater(len(set(Relationship.objects.values_list(
+            'created', flat=True))), 1)
+
+    def test_existing_prefix(self):
+        self.seed()
+        with self.assertRaises(CommandError):
+            self.seed()
+
+    def test_too_many_friendships(self):
+        with self.assertRaises(CommandError):
+            self.seed(users=5, friendships=11)
@@ -0,0 +1,76 @@
+import copy
+from unittest import mock
+
+from django.test import TestCase
+
+from profiles.models import Profile
+from profiles.serializers import ProfileSerializer
+from .test_http import create_user
+
+
+class PublicDataTest(TestCase):
+
+    def setUp(self):
+        self.profile = create_user('user1', 'bob', 'smith').profile
+        for i in range(5):
+            friend = create_user(f'friend{i}', f'first{i}', f'last{i}')
+            self.profile.add_friend(friend.profile)
+        create_user('blank', '', '')
+
+    def test_parity(self):
+        for queryset in (self.profile.get_friends(), Profile.objects.all()):
+            queryset = queryset.order_by('id')
+            serializer = ProfileSerializer(
+                queryset, many=True, fields=ProfileSerializer.PUBLIC_FIELDS)
+
+            self.assertEqual(
+                ProfileSerializer.public_data(
+                    ProfileSerializer.public_values(queryset)),
+                serializer.data)
+
+    def test_single_query(self):
+        with self.assertNumQueries(1):
+            data = ProfileSerializer.public_data(
+                ProfileSerializer.public_values(self.profile.get_friends()))
+        self.assertEqual(len(data), 5)
+
+
+class SubsetSerializerTest(TestCase):
+
+    def setUp(self):
+        self.profile = create_user('user1', 'bob', 'smith').profile
+
+    def test_subset_class(self):
+        fields = ('username', 'last_name')
+        serializer = ProfileSerializer(self.profile, fields=fields)
+
+        self.assertIsInstance(serializer, ProfileSerializer)
+        self.assertIs(type(serializer),
+                      type(ProfileSerializer(self.profile, fields=fields)))
+        self.assertEqual(tuple(serializer.fields), fields)
+        self.assertEqual(serializer.data,
+                         {'username': 'user1', 'last_name': 'smith'})
+
+    def test_no_introspection(self):
+        fields = ProfileSerializer.PUBLIC_FIELDS
+        ProfileSerializer(self.profile, fields=fields).data
+
+        with mock.patch('rest_framework.serializers.model_meta.'
+                        'get_field_info', side_effect=AssertionError):
+            data = ProfileSerializer(self.profile, fields=fields).data
+            many_data = ProfileSerializer([self.profile], many=True,
+                                          fields=fields).data
+
+        self.assertEqual(data['first_name'], 'bob')
+        self.assertEqual(many_data, [data])
+
+    def test_copy(self):
+        serializer = ProfileSerializer(
+            fields=ProfileSerializer.PUBLIC_FIELDS)
+        self.assertIs(type(copy.deepcopy(serializer)), type(serializer))
+
+    def test_all_fields(self):
+        serializer = ProfileSerializer(self.profile)
+        self.assertIs(type(serializer), ProfileSerializer)
+        self.assertEqual(tuple(serializer.fields),
+                         ProfileSerializer.Meta.fields)
@@ -0,0 +1,183 @@
+import json
+from io import StringIO
+from unittest import mock
+
+import numpy as np
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from profiles.graph import CSRGraph, friends_of_friends, suggest_chunk
+from profiles.management.commands.suggest_friends import Command
+from profiles.models import FriendSuggestion, Profile, Relationship
+from .test_http import PASSWORD, create_user
+
+
+class FriendsOfFriendsTest(SimpleTestCase):
+
+    def setUp(self):
+        # 0 is friends with 1 and 2, who are both friends with 3 and 4.
+        # 1 is also friends with 5, which 0 has a pending request with.
+        self.friends = CSRGraph.from_edges(
+            6, np.array([0, 0, 1, 1, 2, 2, 1]), np.array([1, 2, 3, 4, 3, 4, 5]))
+        self.excluded = CSRGraph.from_edges(6, np.array([5]), np.array([0]))
+
+    def test_csr(self):
+        self.assertEqual(list(self.friends.neighbors(0)), [1, 2])
+        self.assertEqual(list(self.friends.neighbors(3)), [1, 2])
+        self.assertEqual(list(self.friends.gather(np.array([0, 5]))),
+                         [1, 2, 1])
+
+    def test_friends_of_friends(self):
+        candidates, counts = friends_of_friends(
+            self.friends, self.excluded, 0, 10)
+        self.assertEqual(list(candidates), [3, 4])
+        self.assertEqual(list(counts), [2, 2])
+
+        candidates, counts = friends_of_friends(
+            self.friends, self.excluded, 3, 10)
+        self.assertEqual(list(candidates), [0, 4, 5])
+        self.assertEqual(list(counts), [2, 2, 1])
+
+    def test_top(self):
+        candidates, counts = friends_of_friends(
+            self.friends, self.excluded, 3, 2)
+        self.assertEqual(list(candidates), [0, 4])
+
+
+class HttpSuggestionsTest(APITestCase):
+
+    def setUp(self):
+        self.user1 = create_user('user1', 'bob', 'smith')
+        response = self.client.post(
+            reverse('accounts:login'),
+            data=json.dumps({
+                'username': self.user1.username,
+                'password': PASSWORD,
+            }),
+            content_type='application/json'
+        )
+        self.access1 = response.data['access']
+
+        self.users = [create_user(f'user{i}') for i in range(2, 10)]
+        user2, user3, user4, user5, user6, user7, user8, user9 = \
+            [user.profile for user in self.users]
+
+        # Setup Info
+        # user1 is friends with user2, user3 and user4.
+        # user2 is friends with user5 and user6.
+        # user3 is friends with user5, user6 and user7.
+        # user4 is friends with user8 and user9.
+        # user1 sent a friend request to user7.
+        # user1 is blocking user8.
+        profile1 = self.user1.profile
+        for profile in (user2, user3, user4):
+            profile1.add_friend(profile)
+        for profile in (user5, user6):
+            user2.add_friend(profile)
+        for profile in (user5, user6, user7):
+            user3.add_friend(profile)
+        for profile in (user8, user9):
+            user4.add_friend(profile)
+        profile1.send_request(user7)
+        profile1.block(user8)
+
+    def suggest(self, **options):
+        call_command('suggest_friends', stdout=StringIO(), **options)
+
+    def get(self, username='user1'):
+        return self.client.get(
+            reverse('profiles:friends-suggestions',
+                    kwargs={'username': username}),
+            HTTP_AUTHORIZATION=f'Bearer {self.access1}'
+        )
+
+    def test_suggestions(self):
+        self.suggest(processes=1)
+        response = self.get()
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(
+            [(item['username'], item['mutual_friends'])
+             for item in response.data],
+            [('user5', 2), ('user6', 2), ('user9', 1)])
+
+    def test_worker_processes(self):
+        self.suggest(processes=1)
+        expected = set(FriendSuggestion.objects.values_list(
+            'profile', 'suggested_profile', 'mutual_friends'))
+
+        self.suggest(processes=2, chunk_size=2)
+        self.assertEqual(expected, set(FriendSuggestion.objects.values_list(
+            'profile', 'suggested_profile', 'mutual_friends')))
+
+    def test_batches(self):
+        self.suggest(processes=1)
+        expected = set(FriendSuggestion.objects.values_list(
+            'profile', 'suggested_profile', 'mutual_friends'))
+
+        with mock.patch.object(Command, 'batch_size', 2):
+            self.suggest(processes=1)
+        self.assertEqual(expected, set(FriendSuggestion.objects.values_list(
+            'profile', 'suggested_profile', 'mutual_friends')))
+
+    def test_profiles_created_after_ids(self):
+        # user5 and user9 are left out of the ids, as if they were created
+        # after the ids were read, and so are their friendships
+        left_out = {self.users[3].profile.id, self.users[7].profile.id}
+        ids = np.array(sorted(set(Profile.objects.values_list(
+            'id', flat=True)) - left_out), dtype=np.int64)
+
+        graph = Command().load_graph(ids, Relationship.objects.filter(
+            status=1))
+
+        self.assertEqual(graph.node_count, len(ids))
+        user2, user4 = self.users[0].profile, self.users[2].profile
+        self.assertEqual(
+            set(ids[graph.neighbors(np.searchsorted(ids, user2.id))]),
+            {self.user1.profile.id, self.users[4].profile.id})
+        self.assertEqual(
+            set(ids[graph.neighbors(np.searchsorted(ids, user4.id))]),
+            {self.user1.profile.id, self.users[6].profile.id})
+
+    def test_computed_before_transaction(self):
+        # the write lock is only taken once every suggestion is computed
+        depths = []
+
+        def suggest(*args):
+            depths.append(len(connection.savepoint_ids))
+            return suggest_chunk(*args)
+
+        depth = len(connection.savepoint_ids)
+        with mock.patch('profiles.management.commands.suggest_friends.'
+                        'suggest_chunk', suggest):
+            self.suggest(processes=1, chunk_size=2)
+        self.assertTrue(depths)
+        self.assertEqual(set(depths), {depth})
+
+    def test_top(self):
+        self.suggest(processes=1, top=1)
+        response = self.get()
+
+        self.assertEqual([item['username'] for item in response.data],
+                         ['user5'])
+
+    def test_stale_suggestions(self):
+        self.suggest(processes=1)
+        profile1 = self.user1.profile
+        profile1.add_friend(self.users[3].profile)
+        profile1.send_request(self.users[4].profile)
+        self.users[7].profile.block(profile1)
+
+        response = self.get()
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(response.data, [])
+
+    def test_other_profile(self):
+        response = self.get('user2')
+
+        self.assertEqual(status.HTTP_403_FORBIDDEN, response.status_code)
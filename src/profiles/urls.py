@@ -2,8 +2,12 @@ from django.urls import path
 from .views import (
     ProfileView,
     FriendsView,
+    MutualFriendsView,
+    SuggestionsView,
+    BulkFriendsView,
     RequestsView,
     BlockingView,
+    BulkBlockingView,
 )
 
 
@@ -11,6 +15,14 @@ app_name = 'profiles'
 urlpatterns = [
     path('<str:username>/', ProfileView.as_view(), name='profile'),
     path('<str:username>/friends/', FriendsView.as_view(), name='friends'),
+    path('<str:username>/friends/mutual/', MutualFriendsView.as_view(),
+         name='friends-mutual'),
+    path('<str:username>/friends/bulk/', BulkFriendsView.as_view(),
+         name='friends-bulk'),
+    path('<str:username>/friends/suggestions/', SuggestionsView.as_view(),
+         name='friends-suggestions'),
     path('<str:username>/requests/', RequestsView.as_view(), name='requests'),
     path('<str:username>/blocking/', BlockingView.as_view(), name='blocking'),
+    path('<str:username>/blocking/bulk/', BulkBlockingView.as_view(),
+         name='blocking-bulk'),
 ]
@@ -1,17 +1,29 @@
 from django.core.exceptions import PermissionDenied
+from django.db.models import IntegerField, Value
 from django.http import Http404
+from django.utils.crypto import salted_hmac
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
 
-from .shortcuts import check_my_profile, get_other_profile
+from .shortcuts import (
+    check_my_profile,
+    get_other_profile,
+    get_other_profile_with_state,
+    get_other_profiles_with_state,
+)
 from .serializers import ProfileSerializer, RequestSerializer
+from .pagination import KeysetPagination
+from .models import Profile, FriendRequest
 from .exceptions import (
     UsersNotFriends,
     UsersAlreadyFriends,
     AlreadyPendingRequest,
+    OwnProfile,
     MissingRequestAccepted,
     RequestDoesNotExist,
     BlockingUser,
@@ -21,6 +33,32 @@ from .exceptions import (
 )
 
 
+def graph_etag(request, username=None, format=None):
+    # ETag of a relationship list, derived from the graph versions of the
+    # profile in the url and of the authenticated profile, which are read
+    # with a single query. Any write to either profile's relationships or
+    # requests changes it.
+    my_profile = request.user.profile
+    mine = Profile.objects.filter(id=my_profile.id).annotate(
+        is_mine=Value(1, output_field=IntegerField())
+    ).values_list('is_mine', 'graph_version')
+    theirs = Profile.objects.filter(user__username=username).annotate(
+        is_mine=Value(0, output_field=IntegerField())
+    ).values_list('is_mine', 'graph_version')
+
+    versions = dict(mine.union(theirs, all=True))
+    if len(versions) != 2:
+        return None
+
+    value = '|'.join(str(part) for part in (
+        request.get_full_path(),
+        request.META.get('HTTP_ACCEPT', ''),
+        my_profile.id, versions[1],
+        username, versions[0],
+    ))
+    return salted_hmac('profiles.views.graph_etag', value).hexdigest()
+
+
 # Getting profiles and updating your own
 
 class ProfileView(APIView):
@@ -39,13 +77,18 @@ class ProfileView(APIView):
         return Response(serializer.data)
 
     def patch(self, request, username=None, format=None):
-        my_profile = check_my_profile(self.request.user.profile, username)
+        my_profile = check_my_profile(self.request.user.profile, username,
+                                      write=True)
 
         serializer = ProfileSerializer(instance=my_profile,
                                        data=request.data,
                                        partial=True)
         if serializer.is_valid():
             serializer.save()
+            # the profile appears in its friends' lists and in the blocking
+            # lists of the profiles blocking it
+            Profile.bump_graph_versions(*my_profile.get_friend_ids(),
+                                        *my_profile.get_blocked_by_ids())
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -55,55 +98,166 @@ class ProfileView(APIView):
 class FriendsView(APIView):
     permission_classes = (IsAuthenticated,)
 
+    @method_decorator(condition(etag_func=graph_etag))
     def get(self, request, username=None, format=None):
         my_profile = self.request.user.profile
         requested_profile = get_other_profile(my_profile, username)
 
-        queryset = requested_profile.get_friends()
-        filtered_queryset = my_profile.filter_blockers(queryset)
+        # a query for each side of the friendships, merged into the page
+        querysets = [
+            ProfileSerializer.public_values(
+                my_profile.filter_blockers(queryset),
+                'rel_created', 'rel_id')
+            for queryset in requested_profile.get_friendships()
+        ]
 
-        serializer = ProfileSerializer(filtered_queryset, many=True,
-                                       fields=ProfileSerializer.PUBLIC_FIELDS)
+        paginator = KeysetPagination('rel_created', 'rel_id')
+        page = paginator.paginate_querysets(querysets, request, self)
 
-        return Response(serializer.data)
+        data = ProfileSerializer.public_data(page)
+
+        return paginator.get_paginated_response(data)
 
     def post(self, request, username=None, format=None):
         my_profile = check_my_profile(self.request.user.profile, username)
-        other_profile = \
-            get_other_profile(my_profile, request.data.get('username', None))
+        other_profile, state = get_other_profile_with_state(
+            my_profile, request.data.get('username', None))
 
-        if my_profile.is_blocking(other_profile):
+        if other_profile == my_profile:
+            raise OwnProfile
+
+        if state.blocking:
             raise BlockingUser
 
-        if my_profile.is_friends_with(other_profile):
+        if state.friends:
             raise UsersAlreadyFriends
 
-        if my_profile.has_pending_request_from(other_profile) \
-                or my_profile.has_pending_request_to(other_profile):
+        if state.has_pending_request:
+            raise AlreadyPendingRequest
+
+        request = my_profile.send_request(other_profile, state)
+        # a concurrent request between the two profiles was created first
+        if request is None:
             raise AlreadyPendingRequest
 
-        request = my_profile.send_request(other_profile)
         serializer = RequestSerializer(instance=request)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def delete(self, request, username=None, format=None):
         my_profile = check_my_profile(self.request.user.profile, username)
-        other_profile = \
-            get_other_profile(my_profile, request.data.get('username', None))
+        other_profile, state = get_other_profile_with_state(
+            my_profile, request.data.get('username', None))
 
-        if my_profile.is_friends_with(other_profile):
+        if state.friends:
             my_profile.remove_friend(other_profile)
             return Response(status=status.HTTP_204_NO_CONTENT)
         else:
             raise UsersNotFriends
 
 
+# Getting the friends you have in common with another user
+
+class MutualFriendsView(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    @method_decorator(condition(etag_func=graph_etag))
+    def get(self, request, username=None, format=None):
+        my_profile = self.request.user.profile
+        requested_profile = get_other_profile(my_profile, username)
+
+        count_param = request.query_params.get('count', '0')
+        if count_param not in ('0', '1'):
+            raise InvalidURL
+
+        if count_param == '1':
+            queryset = my_profile.filter_blockers(
+                my_profile.get_mutual_friends(requested_profile))
+            return Response({'count': queryset.count()})
+
+        # a query for each side of the friendships, merged into the page
+        querysets = [
+            ProfileSerializer.public_values(
+                my_profile.filter_blockers(queryset),
+                'rel_created', 'rel_id')
+            for queryset in my_profile.get_mutual_friendships(
+                requested_profile)
+        ]
+
+        paginator = KeysetPagination('rel_created', 'rel_id')
+        page = paginator.paginate_querysets(querysets, request, self)
+
+        data = ProfileSerializer.public_data(page)
+
+        return paginator.get_paginated_response(data)
+
+
+class SuggestionsView(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request, username=None, format=None):
+        my_profile = check_my_profile(self.request.user.profile, username)
+
+        rows = ProfileSerializer.public_values(
+            my_profile.get_suggestions(), 'mutual_friends')
+
+        data = ProfileSerializer.public_data(rows)
+        for item, row in zip(data, rows):
+            item['mutual_friends'] = row['mutual_friends']
+
+        return Response(data)
+
+
+# Sending friend requests to many users at once. Each user gets a status
+# in the response, using the error codes of the single-user endpoint.
+
+NOT_FOUND = 'not_found'
+
+
+class BulkFriendsView(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request, username=None, format=None):
+        my_profile = check_my_profile(self.request.user.profile, username)
+        others = get_other_profiles_with_state(
+            my_profile, request.data.get('usernames', None))
+
+        results = []
+        to_request = []
+        for other_username, other_profile, state in others:
+            if other_profile is None:
+                result = NOT_FOUND
+            elif other_profile == my_profile:
+                result = OwnProfile.default_code
+            elif state.blocking:
+                result = BlockingUser.default_code
+            elif state.friends:
+                result = UsersAlreadyFriends.default_code
+            elif state.has_pending_request:
+                result = AlreadyPendingRequest.default_code
+            else:
+                result = 'requested'
+                to_request.append(other_profile)
+            results.append({'username': other_username, 'status': result})
+
+        created = {request.to_profile_id for request
+                   in my_profile.bulk_send_requests(to_request)}
+        # concurrent requests between the pairs may have been created first
+        for result, other_profile in zip(
+                [result for result in results
+                 if result['status'] == 'requested'], to_request):
+            if other_profile.id not in created:
+                result['status'] = AlreadyPendingRequest.default_code
+
+        return Response(results, status=status.HTTP_200_OK)
+
+
 # Getting incoming and outgoing requests, responding to them, and canceling
 # outgoing requests
 
 class RequestsView(APIView):
     permission_classes = (IsAuthenticated,)
 
+    @method_decorator(condition(etag_func=graph_etag))
     def get(self, request, username=None, format=None):
         my_profile = check_my_profile(self.request.user.profile, username)
 
@@ -119,17 +273,23 @@ class RequestsView(APIView):
             queryset = my_profile.get_outgoing_pending()
         else:
             queryset = my_profile.get_incoming_pending()
+        # the serializer reads both usernames of every request
+        queryset = queryset.select_related('from_profile__user',
+                                           'to_profile__user')
 
-        serializer = RequestSerializer(queryset, many=True)
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(queryset, request, self)
 
-        return Response(serializer.data)
+        serializer = RequestSerializer(page, many=True)
+
+        return paginator.get_paginated_response(serializer.data)
 
     def post(self, request, username=None, format=None):
         my_profile = check_my_profile(self.request.user.profile, username)
-        other_profile = \
-            get_other_profile(my_profile, request.data.get('username', None))
+        other_profile, state = get_other_profile_with_state(
+            my_profile, request.data.get('username', None))
 
-        if my_profile.has_pending_request_from(other_profile):
+        if state.pending_from:
 
             # Get accepted field
             accepted = request.data.get('accepted', None)
@@ -138,14 +298,15 @@ class RequestsView(APIView):
 
             # Approve or deny the request
             if accepted:
-                request = my_profile.approve_request(other_profile)
+                updated = my_profile.approve_request(other_profile)
             else:
-                request = my_profile.deny_request(other_profile)
+                updated = my_profile.deny_request(other_profile)
 
-            # Send response
-            if request is None:
-                return Response(status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            # Send response, unless a concurrent call resolved it first
+            if not updated:
+                raise RequestDoesNotExist
 
+            request = FriendRequest.get_latest(other_profile, my_profile)
             serializer = RequestSerializer(request)
             return Response(serializer.data)
 
@@ -153,18 +314,19 @@ class RequestsView(APIView):
 
     def delete(self, request, username=None, format=None):
         my_profile = check_my_profile(self.request.user.profile, username)
-        other_profile = \
-            get_other_profile(my_profile, request.data.get('username', None))
+        other_profile, state = get_other_profile_with_state(
+            my_profile, request.data.get('username', None))
 
-        if my_profile.has_pending_request_to(other_profile):
+        if state.pending_to:
 
             # Cancel the request
-            request = my_profile.cancel_request(other_profile)
+            updated = my_profile.cancel_request(other_profile)
 
-            # Send response
-            if request is None:
-                return Response(status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            # Send response, unless a concurrent call resolved it first
+            if not updated:
+                raise RequestDoesNotExist
 
+            request = FriendRequest.get_latest(my_profile, other_profile)
             serializer = RequestSerializer(request)
             return Response(serializer.data)
 
@@ -174,37 +336,91 @@ class RequestsView(APIView):
 class BlockingView(APIView):
     permission_classes = (IsAuthenticated,)
 
+    @method_decorator(condition(etag_func=graph_etag))
     def get(self, request, username, format=None):
         my_profile = check_my_profile(self.request.user.profile, username)
 
         queryset = my_profile.filter_blockers(my_profile.get_blocking())
 
-        serializer = ProfileSerializer(queryset, many=True,
-                                       fields=ProfileSerializer.PUBLIC_FIELDS)
+        paginator = KeysetPagination('rel_created', 'rel_id')
+        page = paginator.paginate_queryset(
+            ProfileSerializer.public_values(
+                queryset, 'rel_created', 'rel_id'),
+            request, self)
 
-        return Response(serializer.data)
+        data = ProfileSerializer.public_data(page)
+
+        return paginator.get_paginated_response(data)
 
     def post(self, request, username, format=None):
         my_profile = check_my_profile(self.request.user.profile, username)
-        other_profile = \
-            get_other_profile(my_profile, request.data.get('username', None))
+        other_profile, state = get_other_profile_with_state(
+            my_profile, request.data.get('username', None))
 
-        if my_profile.is_blocking(other_profile):
+        if state.blocking:
             raise AlreadyBlocking
 
-        my_profile.block(other_profile)
+        my_profile.block(other_profile, state)
 
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     def delete(self, request, username, format=None):
 
         my_profile = check_my_profile(self.request.user.profile, username)
-        other_profile = \
-            get_other_profile(my_profile, request.data.get('username', None))
+        other_profile, state = get_other_profile_with_state(
+            my_profile, request.data.get('username', None))
 
-        if not my_profile.is_blocking(other_profile):
+        if not state.blocking:
             raise NotBlocking
 
         my_profile.unblock(other_profile)
 
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class BulkBlockingView(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request, username, format=None):
+        my_profile = check_my_profile(self.request.user.profile, username)
+        others = get_other_profiles_with_state(
+            my_profile, request.data.get('usernames', None))
+
+        results = []
+        to_block = []
+        for other_username, other_profile, state in others:
+            if other_profile is None:
+                result = NOT_FOUND
+            elif other_profile == my_profile:
+                result = OwnProfile.default_code
+            elif state.blocking:
+                result = AlreadyBlocking.default_code
+            else:
+                result = 'blocked'
+                to_block.append(other_profile)
+            results.append({'username': other_username, 'status': result})
+
+        my_profile.bulk_block(to_block)
+
+        return Response(results, status=status.HTTP_200_OK)
+
+    def delete(self, request, username, format=None):
+        my_profile = check_my_profile(self.request.user.profile, username)
+        others = get_other_profiles_with_state(
+            my_profile, request.data.get('usernames', None))
+
+        results = []
+        to_unblock = []
+        for other_username, other_profile, state in others:
+            if other_profile is None:
+                result = NOT_FOUND
+            elif not state.blocking:
+                result = NotBlocking.default_code
+            else:
+                result = 'unblocked'
+                to_unblock.append(other_profile)
+            results.append({'username': other_username, 'status': result})
+
+        my_profile.bulk_unblock(to_unblock)
+
+        return Response(results, status=status.HTTP_200_OK)